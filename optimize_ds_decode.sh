@@ -1,6 +1,9 @@
 #!/bin/bash
 export PYTHONPATH=$PYTHONPATH:.
 
+# Evaluations are cached here, so repeated sweeps skip already-evaluated points
+CACHE_PATH=metrics/eval_cache.sqlite
+
 echo "=========================================="
 echo "DeepSeek V3/R1 Decode Optimization"
 echo "=========================================="
@@ -14,7 +17,8 @@ python -m src.optimization.cli \
     --max_seqlen 4096 \
     --mode decode \
     --recommend throughput \
-    --output metrics/ds_decode_throughput_recommendation.json
+    --output metrics/ds_decode_throughput_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # 2. Quick recommendation for low latency in decode mode
 echo ""
@@ -25,7 +29,8 @@ python -m src.optimization.cli \
     --max_seqlen 4096 \
     --mode decode \
     --recommend latency \
-    --output metrics/ds_decode_latency_recommendation.json
+    --output metrics/ds_decode_latency_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # 3. Full grid search for decode with different batch sizes
 echo ""
@@ -41,7 +46,8 @@ python -m src.optimization.cli \
     --batch_range "8,16,32,64,128,256" \
     --world_size 32 \
     --objective maximize_tps \
-    --output metrics/ds_decode_optimization_ws32.json
+    --output metrics/ds_decode_optimization_ws32.json \
+    --cache_path $CACHE_PATH
 
 # 4. Decode optimization with minimize TTFT objective
 echo ""
@@ -57,7 +63,8 @@ python -m src.optimization.cli \
     --batch_range "1,4,8,16" \
     --world_size 16 \
     --objective minimize_ttft \
-    --output metrics/ds_decode_minimize_ttft.json
+    --output metrics/ds_decode_minimize_ttft.json \
+    --cache_path $CACHE_PATH
 
 echo ""
 echo "=========================================="
@@ -0,0 +1,43 @@
+#!/bin/bash
+export PYTHONPATH=$PYTHONPATH:.
+
+# Evaluations are cached here, so repeated sweeps skip already-evaluated points;
+# prefill passes cached by optimize_ds_prefill.sh (max_seqlen 4096) are reused
+CACHE_PATH=metrics/eval_cache.sqlite
+
+echo "=========================================="
+echo "DeepSeek V3/R1 Prefill/Decode Disaggregation"
+echo "=========================================="
+
+# 1. Joint prefill/decode search under TTFT and TPOT SLOs
+echo ""
+echo "1. Optimizing Prefill/Decode Instances and Ratio..."
+python -m src.optimization.cli disaggregate \
+    --model_path hf_config/deepseek_671b_r1_config.json \
+    --hardware klx_p800 \
+    --prompt_len 4096 \
+    --output_len 1024 \
+    --ttft_slo_ms 2000 \
+    --tpot_slo_ms 50 \
+    --output metrics/ds_pd_disaggregation.json \
+    --cache_path $CACHE_PATH
+
+# 2. Tighter TTFT SLO, deployment units of at most 256 GPUs
+echo ""
+echo "2. Optimizing with TTFT <= 1000 ms and at most 256 GPUs..."
+python -m src.optimization.cli disaggregate \
+    --model_path hf_config/deepseek_671b_r1_config.json \
+    --hardware klx_p800 \
+    --prompt_len 4096 \
+    --output_len 1024 \
+    --ttft_slo_ms 1000 \
+    --tpot_slo_ms 50 \
+    --max_gpus 256 \
+    --output metrics/ds_pd_disaggregation_ttft1000.json \
+    --cache_path $CACHE_PATH
+
+echo ""
+echo "=========================================="
+echo "Disaggregation Optimization Complete!"
+echo "Results saved to metrics/ directory"
+echo "=========================================="
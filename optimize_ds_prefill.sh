@@ -1,6 +1,9 @@
 #!/bin/bash
 export PYTHONPATH=$PYTHONPATH:.
 
+# Evaluations are cached here, so repeated sweeps skip already-evaluated points
+CACHE_PATH=metrics/eval_cache.sqlite
+
 echo "=========================================="
 echo "DeepSeek V3/R1 Prefill Optimization"
 echo "=========================================="
@@ -13,7 +16,8 @@ python -m src.optimization.cli \
     --hardware klx_p800 \
     --max_seqlen 4096 \
     --recommend throughput \
-    --output metrics/ds_prefill_throughput_recommendation.json
+    --output metrics/ds_prefill_throughput_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # 2. Quick recommendation for low latency (minimum TTFT)
 echo ""
@@ -23,7 +27,8 @@ python -m src.optimization.cli \
     --hardware klx_p800 \
     --max_seqlen 4096 \
     --recommend latency \
-    --output metrics/ds_prefill_latency_recommendation.json
+    --output metrics/ds_prefill_latency_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # 3. Full grid search with world_size=32 (e.g., 4 nodes x 8 GPUs)
 echo ""
@@ -38,7 +43,8 @@ python -m src.optimization.cli \
     --batch_range "1,4,8,16,32,64,128" \
     --world_size 32 \
     --objective maximize_tps \
-    --output metrics/ds_prefill_optimization_ws32.json
+    --output metrics/ds_prefill_optimization_ws32.json \
+    --cache_path $CACHE_PATH
 
 # 4. Full grid search with world_size=16 (e.g., 2 nodes x 8 GPUs)
 echo ""
@@ -53,7 +59,8 @@ python -m src.optimization.cli \
     --batch_range "1,4,8,16,32,64" \
     --world_size 16 \
     --objective maximize_tps \
-    --output metrics/ds_prefill_optimization_ws16.json
+    --output metrics/ds_prefill_optimization_ws16.json \
+    --cache_path $CACHE_PATH
 
 # 5. Balanced optimization with verbose output
 echo ""
@@ -69,7 +76,8 @@ python -m src.optimization.cli \
     --world_size 16 \
     --objective balanced \
     --verbose \
-    --output metrics/ds_prefill_balanced_optimization.json
+    --output metrics/ds_prefill_balanced_optimization.json \
+    --cache_path $CACHE_PATH
 
 echo ""
 echo "=========================================="
@@ -1,6 +1,9 @@
 #!/bin/bash
 export PYTHONPATH=$PYTHONPATH:.
 
+# Evaluations are cached here, so repeated sweeps skip already-evaluated points
+CACHE_PATH=metrics/eval_cache.sqlite
+
 echo "=========================================="
 echo "Qwen3 Model Optimization"
 echo "=========================================="
@@ -19,7 +22,8 @@ python -m src.optimization.cli \
     --hardware h800 \
     --max_seqlen 4096 \
     --recommend throughput \
-    --output metrics/qwen3_32b_throughput_recommendation.json
+    --output metrics/qwen3_32b_throughput_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # 2. Latency optimization
 echo ""
@@ -29,7 +33,8 @@ python -m src.optimization.cli \
     --hardware h800 \
     --max_seqlen 4096 \
     --recommend latency \
-    --output metrics/qwen3_32b_latency_recommendation.json
+    --output metrics/qwen3_32b_latency_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # 3. Full grid search for Qwen3-32B
 echo ""
@@ -43,7 +48,8 @@ python -m src.optimization.cli \
     --batch_range "1,4,8,16,32,64,128" \
     --world_size 16 \
     --objective maximize_tps \
-    --output metrics/qwen3_32b_optimization.json
+    --output metrics/qwen3_32b_optimization.json \
+    --cache_path $CACHE_PATH
 
 # Qwen3-8B Dense Model Optimization
 echo ""
@@ -58,7 +64,8 @@ python -m src.optimization.cli \
     --hardware h800 \
     --max_seqlen 4096 \
     --recommend balanced \
-    --output metrics/qwen3_8b_recommendation.json
+    --output metrics/qwen3_8b_recommendation.json \
+    --cache_path $CACHE_PATH
 
 # Qwen3-235B-A22B MoE Model Optimization
 echo ""
@@ -73,7 +80,8 @@ python -m src.optimization.cli \
     --hardware h800 \
     --max_seqlen 4096 \
     --recommend throughput \
-    --output metrics/qwen3_235b_recommendation.json
+    --output metrics/qwen3_235b_recommendation.json \
+    --cache_path $CACHE_PATH
 
 echo ""
 echo "6. Qwen3-235B-A22B Full Optimization..."
@@ -87,7 +95,8 @@ python -m src.optimization.cli \
     --batch_range "1,4,8,16,32" \
     --world_size 32 \
     --objective maximize_tps \
-    --output metrics/qwen3_235b_optimization.json
+    --output metrics/qwen3_235b_optimization.json \
+    --cache_path $CACHE_PATH
 
 # Qwen3-Next-80B-A3B MoE Model Optimization
 echo ""
@@ -102,7 +111,8 @@ python -m src.optimization.cli \
     --hardware h800 \
     --max_seqlen 4096 \
     --recommend balanced \
-    --output metrics/qwen3_next_80b_recommendation.json
+    --output metrics/qwen3_next_80b_recommendation.json \
+    --cache_path $CACHE_PATH
 
 echo ""
 echo "=========================================="
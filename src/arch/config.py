@@ -1,6 +1,8 @@
+import hashlib
 import json
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, fields, is_dataclass
+from enum import Enum
 from typing import Any, Dict
 
 from src.arch.model_type import AttentionType, ForwardMode
@@ -19,6 +21,11 @@ class ModelConfig:
     intermediate_size: int = 11008
     attention_type: AttentionType = AttentionType.MHA  # Default to MHA
 
+    def is_moe(self) -> bool:
+        """Check if the model uses Mixture of Experts"""
+        model_type = self.model_type.lower()
+        return "moe" in model_type or model_type == "deepseek_v3"
+
     # Load from JSON configuration file
     @staticmethod
     def from_json(config_path: str) -> "ModelConfig":
@@ -159,3 +166,35 @@ class ScheduleConfig:
     is_mtp: bool = True  # Multi-Token Prediction
     deepep: bool = True  # Deep Expert Parallel
     enable_moe_dense_fully_dp: bool = False
+
+
+def _to_jsonable(value):
+    """Convert configuration objects to JSON-serializable values"""
+    if isinstance(value, Enum):
+        return value.name
+    if is_dataclass(value) and not isinstance(value, type):
+        # vars() also covers attributes set dynamically by ModelConfig.from_dict
+        data = {f.name: getattr(value, f.name) for f in fields(value)}
+        data.update(vars(value))
+        return {key: _to_jsonable(item) for key, item in data.items()}
+    if isinstance(value, dict):
+        return {str(key): _to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_to_jsonable(item) for item in value]
+    return value
+
+
+def content_hash(*objects) -> str:
+    """
+    Compute a stable content hash of configuration objects
+
+    Args:
+        *objects: Dataclass instances, dicts or plain values
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        [_to_jsonable(obj) for obj in objects], sort_keys=True, default=str
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
@@ -13,7 +13,9 @@ def mha_gqa_kvcache(config: ModelConfig, kvcache_dtype: DataType):
     assert number_of_kv_heads <= getattr(
         config, "num_attention_heads"
     ), "number_of_kv_heads must be less than or equal to num_attention_heads"
-    head_dim = getattr(config, "hidden_size")
+    head_dim = getattr(config, "head_dim", None) or (
+        getattr(config, "hidden_size") // getattr(config, "num_attention_heads")
+    )
     assert head_dim > 0, "head_dim must be greater than 0"
     kv_cache_size = 2 * decoder_layers * number_of_kv_heads * head_dim
 
@@ -1,9 +1,95 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List
+from collections import OrderedDict
+from dataclasses import dataclass, fields
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
 
 from src.arch.config import ForwardMode, ModelConfig, ScheduleConfig
 from src.arch.op.operator_base import BaseOperator
 
+# Plain values allowed in a graph signature; traced or vectorized schedules (arrays,
+# symbols) are built without caching
+_SIGNATURE_TYPES = (bool, int, float, str, Enum)
+
+
+@dataclass
+class _OperatorGraph:
+    """Built operator lists of one (model, schedule) signature"""
+
+    model_config: ModelConfig
+    operators: List[BaseOperator]
+    attention_operators: Dict[str, List[BaseOperator]]
+    transfer_operators: List[BaseOperator]
+
+
+class OperatorGraphCache:
+    """
+    Bounded LRU cache of built operator graphs
+
+    Graphs are keyed by the architecture class, the model config object and every
+    ScheduleConfig field, so only rebuilds of the same configuration hit. Sweeps over
+    shapes reuse graphs per structural shape through the compiled cost model
+    (src.arch.perf.cost_model) instead. Operators are shared between architectures
+    built from the same signature and must be treated as immutable once built; model
+    configs are likewise assumed not to change after loading.
+    """
+
+    def __init__(self, maxsize: int = 1024):
+        """
+        Args:
+            maxsize: Maximum number of graphs kept (0 disables caching)
+        """
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._graphs: "OrderedDict[tuple, _OperatorGraph]" = OrderedDict()
+
+    def get(
+        self, signature: tuple, model_config: ModelConfig
+    ) -> Optional[_OperatorGraph]:
+        """Look up a graph, returning None on a miss"""
+        graph = self._graphs.get(signature)
+        # The model config is keyed by identity, so check it is still the same object
+        if graph is None or graph.model_config is not model_config:
+            self.misses += 1
+            return None
+        self._graphs.move_to_end(signature)
+        self.hits += 1
+        return graph
+
+    def put(self, signature: tuple, graph: _OperatorGraph) -> None:
+        """Store a graph, evicting the least recently used one when full"""
+        if self.maxsize <= 0:
+            return
+        self._graphs[signature] = graph
+        self._graphs.move_to_end(signature)
+        while len(self._graphs) > self.maxsize:
+            self._graphs.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._graphs)
+
+    def clear(self) -> None:
+        """Remove all graphs and reset statistics"""
+        self._graphs.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_stats(self) -> dict:
+        """Get hit/miss statistics"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._graphs),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+# Process-wide graph cache used by BaseModelArch.build_operators
+operator_graph_cache = OperatorGraphCache()
+
 
 class BaseModelArch(ABC):
     """Base class for model architecture"""
@@ -21,12 +107,77 @@ class BaseModelArch(ABC):
         self.operators: List[BaseOperator] = []
         self.attention_operators: Dict[str, List[BaseOperator]] = {}
         self.transfer_operators: List[BaseOperator] = []
+        self._built = False
 
-    @abstractmethod
     def build_operators(self) -> List[BaseOperator]:
-        """Build the operator graph for the model"""
+        """
+        Build the operator graph for the model
+
+        Idempotent: repeated calls return the graph that is already built. Graphs are
+        memoized per (architecture, model, schedule) signature in operator_graph_cache,
+        so building the same configuration again reuses the cached operators.
+
+        Returns:
+            Operator list (attention and transfer operators are set on the instance)
+        """
+        if self._built:
+            return self.operators
+
+        signature = self.get_graph_signature()
+        graph = None
+        if signature is not None:
+            graph = operator_graph_cache.get(signature, self.model_config)
+
+        if graph is None:
+            self.operators = []
+            self.attention_operators = {}
+            self.transfer_operators = []
+            self._build_operators()
+            if signature is not None:
+                operator_graph_cache.put(
+                    signature,
+                    _OperatorGraph(
+                        model_config=self.model_config,
+                        operators=list(self.operators),
+                        attention_operators={
+                            key: list(ops)
+                            for key, ops in self.attention_operators.items()
+                        },
+                        transfer_operators=list(self.transfer_operators),
+                    ),
+                )
+        else:
+            # Copy the containers so that the cached graph cannot be extended
+            self.operators = list(graph.operators)
+            self.attention_operators = {
+                key: list(ops) for key, ops in graph.attention_operators.items()
+            }
+            self.transfer_operators = list(graph.transfer_operators)
+
+        self._built = True
+        return self.operators
+
+    @abstractmethod
+    def _build_operators(self) -> None:
+        """Append the model's operators (called once per graph by build_operators)"""
         pass
 
+    def get_graph_signature(self) -> Optional[Tuple]:
+        """
+        Get the memoization key of the operator graph
+
+        Returns:
+            Hashable signature, or None if the schedule holds non-plain values
+            (e.g. the arrays of the batch engine), which disables caching
+        """
+        schedule_values = tuple(
+            getattr(self.schedule_config, f.name) for f in fields(ScheduleConfig)
+        )
+        for value in schedule_values:
+            if not isinstance(value, _SIGNATURE_TYPES):
+                return None
+        return (type(self), id(self.model_config), schedule_values)
+
     def get_seq_length(self) -> int:
         """Get sequence length based on mode"""
         if self.schedule_config.mode == ForwardMode.EXTEND:
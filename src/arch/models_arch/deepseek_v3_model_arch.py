@@ -8,7 +8,7 @@ from src.arch.op.operator_base import DataType, OperatorIO, OperatorMetadata, Te
 class DeepSeekV3Arch(BaseModelArch):
     """Mixture of Experts model architecture (e.g., DeepSeek V3)"""
 
-    def build_operators(self) -> None:
+    def _build_operators(self) -> None:
         """Build operators for MoE model"""
         mc = self.model_config
         sc = self.schedule_config
@@ -8,7 +8,7 @@ from src.arch.op.operator_base import DataType, OperatorIO, OperatorMetadata, Te
 class Qwen3MoEArch(BaseModelArch):
     """Qwen3 MoE Model Architecture (e.g., Qwen3-235B-A22B)"""
 
-    def build_operators(self) -> None:
+    def _build_operators(self) -> None:
         """Build operators for Qwen3 MoE model"""
         mc = self.model_config
         sc = self.schedule_config
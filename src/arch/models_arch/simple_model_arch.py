@@ -8,7 +8,7 @@ from src.arch.op.operator_base import DataType, OperatorIO, OperatorMetadata, Te
 class SimpleTransformerArch(BaseModelArch):
     """Simple Transformer model architecture (e.g., Qwen3)"""
 
-    def build_operators(self) -> None:
+    def _build_operators(self) -> None:
         """Build standard Transformer operators"""
         mc = self.model_config
         sc = self.schedule_config
@@ -5,7 +5,7 @@ Operator abstraction layer - Provides generic operator definitions and interface
 from abc import ABC, abstractmethod
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 
 from src.hardware.hardware_config import HardwareConfig
 
@@ -130,6 +130,45 @@ class BaseOperator(ABC):
             "store": output_size,
         }
 
+    def get_signature(self) -> Optional[Tuple]:
+        """
+        Get a hashable signature of everything that determines this operator's cost
+
+        Covers the operator class, the metadata (shapes, dtypes, batch size, layer count)
+        and a custom transfer bandwidth. Operators with equal signatures have identical
+        performance on the same hardware.
+
+        Returns:
+            Signature tuple, or None if the shapes hold non-scalar values
+            (grid columns or traced symbols)
+        """
+        metadata = self.metadata
+        io = metadata.io_config
+        dims = (
+            io.input_shape.m,
+            io.input_shape.n,
+            io.output_shape.m,
+            io.output_shape.n,
+            io.weight_shape.m,
+            io.weight_shape.n,
+            metadata.batch_size,
+            metadata.num_layers,
+        )
+        for dim in dims:
+            if not isinstance(dim, (int, float)):
+                return None
+        return (
+            type(self),
+            metadata.name,
+            metadata.op_type,
+            metadata.description,
+            metadata.parallelization_dim,
+            io.input_dtype,
+            io.output_dtype,
+            io.weight_dtype,
+            getattr(self, "_bandwidth_gb_s", None),
+        ) + dims
+
     @abstractmethod
     def get_hbm_time(self, hardware: HardwareConfig) -> float:
         pass
@@ -0,0 +1,674 @@
+"""
+Vectorized batch performance engine - Evaluates whole grids of schedule configurations with NumPy
+"""
+
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.arch.config import ModelConfig, ScheduleConfig
+from src.arch.model_type import ForwardMode
+from src.arch.models_arch.base_model_arch import BaseModelArch
+from src.arch.models_arch.model_arch import create_model_arch
+from src.arch.op.operator_base import BaseOperator
+from src.arch.perf.model_perf import ModelPerformance
+from src.arch.perf_calculator import PerformanceCalculator
+from src.hardware.hardware_config import HardwareConfig
+
+# Columns that change the structure of the operator graph (branches in build_operators).
+# Configurations sharing these values are evaluated together as one vectorized group.
+STRUCTURAL_COLUMNS = (
+    "tp_size",
+    "ep_size",
+    "mode",
+    "is_mtp",
+    "deepep",
+    "enable_moe_dense_fully_dp",
+)
+
+# Columns that only scale operator shapes and can be carried as arrays
+SHAPE_COLUMNS = ("batch_size", "max_seqlen", "dp_size")
+
+GRID_COLUMNS = SHAPE_COLUMNS + STRUCTURAL_COLUMNS
+
+# Per-operator fields reported by the batch engine
+OPERATOR_FIELDS = (
+    "compute_time",
+    "memory_time",
+    "transfer_time",
+    "op_time_single_layer",
+    "total_time",
+    "flops",
+    "io_volume",
+    "weight_mem_occupy",
+)
+
+
+# Active shape-guard masks, one per thread building a group
+_guard_state = threading.local()
+
+
+class _GridArray(np.ndarray):
+    """
+    Shape column of a configuration group
+
+    Model architectures guard shapes with ``assert`` statements. While a group's operator
+    graph is being built, the truth value of a grid condition is recorded as a per-point
+    validity mask and the guard passes, so points that the scalar path would reject are
+    marked invalid instead of failing the whole group. Anywhere else the truth value is
+    undefined and raises TypeError.
+
+    Branches in build_operators must therefore only depend on STRUCTURAL_COLUMNS; shape
+    columns may only appear in asserts.
+    """
+
+    def __bool__(self) -> bool:
+        condition = np.asarray(self, dtype=bool)
+        guard_mask = getattr(_guard_state, "mask", None)
+        if guard_mask is None or condition.shape != guard_mask.shape:
+            raise TypeError(
+                "The truth value of a grid shape column is only defined in the shape "
+                "asserts of build_operators"
+            )
+        guard_mask &= condition
+        return True
+
+
+@dataclass
+class BatchPerformance:
+    """Performance metrics for a grid of schedule configurations (one entry per point)"""
+
+    model_name: str = ""
+
+    # Input grid columns
+    columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    # False where the scalar path would fail (invalid shapes for the model)
+    valid: np.ndarray = field(default_factory=lambda: np.zeros(0, dtype=bool))
+
+    # Aggregated metrics (same units as ModelPerformance, NaN for invalid points)
+    total_compute_time: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    total_memory_time: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    total_transfer_time: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    total_time: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    ttft: np.ndarray = field(default_factory=lambda: np.zeros(0))
+    model_total_mem_occupy: np.ndarray = field(default_factory=lambda: np.zeros(0))
+
+    # Operator name -> field name -> values (0 where the operator is absent)
+    operators: Dict[str, Dict[str, np.ndarray]] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    @staticmethod
+    def concatenate(parts: Sequence["BatchPerformance"]) -> "BatchPerformance":
+        """Concatenate batch results evaluated on consecutive slices of a grid"""
+        if not parts:
+            return BatchPerformance()
+        sizes = [len(part) for part in parts]
+        operators: Dict[str, Dict[str, np.ndarray]] = {}
+        for part in parts:
+            for op_name in part.operators:
+                operators.setdefault(op_name, {})
+        for op_name, op_columns in operators.items():
+            for name in OPERATOR_FIELDS:
+                op_columns[name] = np.concatenate(
+                    [
+                        (
+                            part.operators[op_name][name]
+                            if op_name in part.operators
+                            else np.zeros(size)
+                        )
+                        for part, size in zip(parts, sizes)
+                    ]
+                )
+
+        def _join(name: str) -> np.ndarray:
+            return np.concatenate([getattr(part, name) for part in parts])
+
+        return BatchPerformance(
+            model_name=parts[0].model_name,
+            columns={
+                name: np.concatenate([part.columns[name] for part in parts])
+                for name in parts[0].columns
+            },
+            valid=_join("valid"),
+            total_compute_time=_join("total_compute_time"),
+            total_memory_time=_join("total_memory_time"),
+            total_transfer_time=_join("total_transfer_time"),
+            total_time=_join("total_time"),
+            ttft=_join("ttft"),
+            model_total_mem_occupy=_join("model_total_mem_occupy"),
+            operators=operators,
+        )
+
+    def get_ttft_or_tpot(self) -> np.ndarray:
+        """TTFT in ms, 0.02 is to account for framework overhead"""
+        return self.ttft * 1.02
+
+    def get_throughput(self) -> np.ndarray:
+        """Throughput TPS (tokens/second), same rules as ModelPerformance.get_throughput"""
+        is_extend = self.columns["mode"] == ForwardMode.EXTEND.value
+        batch_size = self.columns["batch_size"]
+        tokens = np.where(
+            is_extend, batch_size * self.columns["max_seqlen"], batch_size
+        )
+        seconds = self.get_ttft_or_tpot() / 1000.0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            throughput = np.where(seconds > 0, tokens / seconds, 0.0)
+        return np.where(self.valid, throughput, np.nan)
+
+    def get_throughput_single_gpu(self) -> np.ndarray:
+        return self.get_throughput() / (
+            self.columns["tp_size"] * self.columns["dp_size"]
+        )
+
+    def summaries(
+        self, schedule_configs: Sequence[ScheduleConfig]
+    ) -> List[Optional[ModelPerformance]]:
+        """
+        Aggregate-only ModelPerformance of every point (see ModelPerformance.summary)
+
+        Args:
+            schedule_configs: Schedule configuration of every point, in grid order
+
+        Returns:
+            One summary per point, None where the point is invalid
+        """
+        totals = {
+            name: getattr(self, name).tolist()
+            for name in (
+                "total_compute_time",
+                "total_memory_time",
+                "total_transfer_time",
+                "total_time",
+                "ttft",
+                "model_total_mem_occupy",
+            )
+        }
+        perfs: List[Optional[ModelPerformance]] = []
+        for index, (valid, schedule_config) in enumerate(
+            zip(self.valid.tolist(), schedule_configs)
+        ):
+            if not valid:
+                perfs.append(None)
+                continue
+            perf = ModelPerformance(
+                model_name=self.model_name,
+                forward_mode=schedule_config.mode.name,
+                schedule_config=schedule_config,
+                **{name: values[index] for name, values in totals.items()},
+            )
+            # Sum of the operators' full times in microseconds, as in finalize
+            perf._sum_full_time = perf.ttft * 1000.0
+            perfs.append(perf)
+        return perfs
+
+
+class BatchPerformanceCalculator:
+    """
+    Vectorized performance calculation engine
+
+    Builds the operator graph once per structural group with NumPy shape columns and
+    computes every operator's metrics as array expressions, reusing the formulas of
+    PerformanceCalculator so that results match the scalar path.
+    """
+
+    def __init__(self, hardware_config: HardwareConfig):
+        """
+        Initialize batch performance calculator
+
+        Args:
+            hardware_config: Hardware configuration
+        """
+        self.hardware = hardware_config
+        self.calculator = PerformanceCalculator(hardware_config)
+
+    def calculate_configs(
+        self,
+        model_config: ModelConfig,
+        schedule_configs: Sequence[ScheduleConfig],
+        breakdown: bool = True,
+    ) -> BatchPerformance:
+        """
+        Calculate performance for a list of schedule configurations
+
+        Args:
+            model_config: Model configuration
+            schedule_configs: Schedule configurations to evaluate
+            breakdown: Fill in the per-operator columns
+
+        Returns:
+            Batch performance metrics, in the order of schedule_configs
+        """
+        columns = {
+            name: [_column_value(getattr(sc, name)) for sc in schedule_configs]
+            for name in GRID_COLUMNS
+        }
+        return self.calculate_grid(model_config, breakdown=breakdown, **columns)
+
+    def calculate_grid(
+        self,
+        model_config: ModelConfig,
+        tp_size,
+        dp_size,
+        ep_size,
+        batch_size,
+        max_seqlen,
+        mode,
+        is_mtp=True,
+        deepep=True,
+        enable_moe_dense_fully_dp=False,
+        breakdown: bool = True,
+    ) -> BatchPerformance:
+        """
+        Calculate performance for a grid given as columns
+
+        Every argument may be a scalar or an array; all of them are broadcast together.
+        Mode values may be ForwardMode members, their integer values or "extend"/"decode".
+
+        Args:
+            model_config: Model configuration
+            breakdown: Fill in the per-operator columns (skipping them makes large
+                grids several times faster when only aggregates are needed)
+
+        Returns:
+            Batch performance metrics, one entry per grid point
+        """
+        columns = _grid_columns(
+            tp_size=tp_size,
+            dp_size=dp_size,
+            ep_size=ep_size,
+            batch_size=batch_size,
+            max_seqlen=max_seqlen,
+            mode=mode,
+            is_mtp=is_mtp,
+            deepep=deepep,
+            enable_moe_dense_fully_dp=enable_moe_dense_fully_dp,
+        )
+        size = len(columns["tp_size"])
+
+        result = BatchPerformance(
+            model_name=model_config.model_type,
+            columns=columns,
+            valid=np.zeros(size, dtype=bool),
+            total_compute_time=np.full(size, np.nan),
+            total_memory_time=np.full(size, np.nan),
+            total_transfer_time=np.full(size, np.nan),
+            total_time=np.full(size, np.nan),
+            ttft=np.full(size, np.nan),
+            model_total_mem_occupy=np.full(size, np.nan),
+        )
+        for key, indices in _iter_groups(columns):
+            self._calculate_group(model_config, key, indices, result, breakdown)
+
+        return result
+
+    def calculate_ttft_lower_bounds(
+        self, model_config: ModelConfig, **columns
+    ) -> np.ndarray:
+        """
+        Lower bounds on the TTFT of every grid point
+
+        Vectorized PerformanceCalculator.calculate_ttft_lower_bound: one operator graph
+        is built per structural group, as in calculate_grid, and only the bound of each
+        operator is evaluated instead of its full metrics.
+
+        Args:
+            model_config: Model configuration
+            **columns: Grid columns, as the arguments of calculate_grid
+
+        Returns:
+            Lower bound on ModelPerformance.ttft in milliseconds per grid point (NaN
+            where the configuration is invalid)
+        """
+        columns = _grid_columns(**columns)
+        bounds = np.full(len(columns["tp_size"]), np.nan)
+        for key, indices in _iter_groups(columns):
+            model_arch, guard_mask = self._build_group_arch(
+                model_config, key, indices, columns
+            )
+            if model_arch is None:
+                continue
+            bound_us = np.zeros(len(indices))
+            with np.errstate(all="ignore"):
+                for operator in _iter_operators(model_arch):
+                    bound_us += operator_lower_bound(self.calculator, operator)
+            bounds[indices[guard_mask]] = bound_us[guard_mask] / 1000.0
+        return bounds
+
+    def _calculate_group(
+        self,
+        model_config: ModelConfig,
+        key: List[int],
+        indices: np.ndarray,
+        result: BatchPerformance,
+        breakdown: bool = True,
+    ) -> None:
+        """Evaluate one structural group of grid points"""
+        size = len(indices)
+        model_arch, guard_mask = self._build_group_arch(
+            model_config, key, indices, result.columns
+        )
+        if model_arch is None:
+            return
+
+        operator_arrays = []
+        for operator in _iter_operators(model_arch):
+            with np.errstate(all="ignore"):
+                op_arrays = self.calculate_operator_arrays(operator, size)
+            operator_arrays.append((operator.metadata.name, op_arrays))
+        self._store_group(result, indices, guard_mask, operator_arrays, breakdown)
+
+    def _store_group(
+        self,
+        result: BatchPerformance,
+        indices: np.ndarray,
+        valid_mask: np.ndarray,
+        operator_arrays: List[Tuple[str, Dict[str, np.ndarray]]],
+        breakdown: bool = True,
+    ) -> None:
+        """
+        Aggregate the operator metrics of a group into the batch result
+
+        Args:
+            result: Batch result to fill
+            indices: Grid indices of the group
+            valid_mask: Per-point validity within the group
+            operator_arrays: (operator name, field arrays) in calculation order
+            breakdown: Also store the per-operator columns
+        """
+        size = len(indices)
+        totals = {
+            "total_compute_time": np.zeros(size),
+            "total_memory_time": np.zeros(size),
+            "total_transfer_time": np.zeros(size),
+            "total_time": np.zeros(size),
+            "ttft": np.zeros(size),
+            "model_total_mem_occupy": np.zeros(size),
+        }
+        sum_full_time = np.zeros(size)
+
+        # Same operator order as PerformanceCalculator.calculate_model_performance
+        for op_name, op_arrays in operator_arrays:
+            totals["total_compute_time"] += op_arrays["compute_time"]
+            totals["total_memory_time"] += op_arrays["memory_time"]
+            totals["total_transfer_time"] += op_arrays["transfer_time"]
+            totals["total_time"] += op_arrays["op_time_single_layer"]
+            totals["model_total_mem_occupy"] += op_arrays["weight_mem_occupy"]
+            sum_full_time += op_arrays["total_time"] * 1000.0
+            totals["ttft"] += op_arrays["total_time"]
+
+            if not breakdown:
+                continue
+            if op_name not in result.operators:
+                result.operators[op_name] = {
+                    name: np.zeros(len(result.valid)) for name in OPERATOR_FIELDS
+                }
+            op_columns = result.operators[op_name]
+            for name in OPERATOR_FIELDS:
+                op_columns[name][indices] = np.where(valid_mask, op_arrays[name], 0.0)
+
+        self._store_totals(result, indices, valid_mask, totals, sum_full_time)
+
+    def _store_totals(
+        self,
+        result: BatchPerformance,
+        indices: np.ndarray,
+        valid_mask: np.ndarray,
+        totals: Dict[str, np.ndarray],
+        sum_full_time: np.ndarray,
+    ) -> None:
+        """Store the aggregated metrics of a group, following ModelPerformance.finalize"""
+        totals["total_time"] = np.where(
+            totals["total_time"] == 0, sum_full_time / 1000.0, totals["total_time"]
+        )
+        valid_indices = indices[valid_mask]
+        for name, values in totals.items():
+            getattr(result, name)[valid_indices] = values[valid_mask]
+        result.valid[valid_indices] = True
+
+    def _build_group_arch(
+        self,
+        model_config: ModelConfig,
+        key: List[int],
+        indices: np.ndarray,
+        columns: Dict[str, np.ndarray],
+    ) -> Tuple[Optional[BaseModelArch], np.ndarray]:
+        """
+        Build the operator graph of a group
+
+        Returns:
+            Tuple of (model architecture or None if the whole group is invalid,
+            per-point mask of the shape guards that passed)
+        """
+        structural = dict(zip(STRUCTURAL_COLUMNS, key))
+        shapes = {
+            name: columns[name][indices].view(_GridArray) for name in SHAPE_COLUMNS
+        }
+        schedule_config = ScheduleConfig(
+            batch_size=shapes["batch_size"],
+            max_seqlen=shapes["max_seqlen"],
+            mode=ForwardMode(structural["mode"]),
+            tp_size=int(structural["tp_size"]),
+            dp_size=shapes["dp_size"],
+            ep_size=int(structural["ep_size"]),
+            is_mtp=bool(structural["is_mtp"]),
+            deepep=bool(structural["deepep"]),
+            enable_moe_dense_fully_dp=bool(structural["enable_moe_dense_fully_dp"]),
+        )
+        guard_mask = np.ones(len(indices), dtype=bool)
+        _guard_state.mask = guard_mask
+        try:
+            # Invalid points may divide by zero before their guard is reached
+            with np.errstate(all="ignore"):
+                model_arch = create_model_arch(
+                    model_config=model_config, schedule_config=schedule_config
+                )
+                model_arch.build_operators()
+        except Exception:
+            return None, np.zeros(len(indices), dtype=bool)
+        finally:
+            _guard_state.mask = None
+        return model_arch, guard_mask
+
+    def calculate_operator_arrays(
+        self, operator: BaseOperator, size: int
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate metrics of an operator whose shapes may hold grid columns
+
+        Args:
+            operator: Operator instance
+            size: Number of grid points in the group
+
+        Returns:
+            Field name -> values, following PerformanceCalculator.calculate_operator_performance
+        """
+        values = operator_metrics(self.calculator, operator)
+        return {name: _as_column(value, size) for name, value in values.items()}
+
+
+def operator_metrics(calculator: PerformanceCalculator, operator: BaseOperator) -> dict:
+    """
+    Metrics of one operator, following PerformanceCalculator.calculate_operator_performance
+
+    Only arithmetic and NumPy ufuncs are applied to the operator's shapes, so the shapes
+    may hold scalars, grid columns or traced symbols.
+
+    Args:
+        calculator: Scalar performance calculator providing the formulas
+        operator: Operator instance
+
+    Returns:
+        Field name -> value for every name in OPERATOR_FIELDS
+    """
+    metadata = operator.metadata
+
+    io_volume = operator.get_io_volume()
+
+    compute_time = 0.0
+    memory_time = 0.0
+    transfer_time = 0.0
+    if metadata.op_type == "transfer":
+        transfer_time = calculator.calculate_transfer_time(operator, io_volume)
+    elif metadata.op_type == "attention":
+        compute_time = operator.get_compute_complexity()
+        memory_time = operator.get_hbm_time(hardware=calculator.hardware)
+    elif metadata.op_type == "matmul":
+        compute_time = calculator.calculate_compute_time(operator)
+        memory_time = calculator.calculate_memory_time(operator, io_volume)
+
+    compute_time = 0.0 if compute_time is None else compute_time
+    memory_time = 0.0 if memory_time is None else memory_time
+    transfer_time = 0.0 if transfer_time is None else transfer_time
+
+    layer_count = metadata.num_layers
+    total_time = (
+        np.maximum(compute_time * layer_count, memory_time * layer_count)
+        + transfer_time * layer_count
+    )
+
+    return {
+        "compute_time": compute_time,
+        "memory_time": memory_time,
+        "transfer_time": transfer_time,
+        "op_time_single_layer": np.maximum(compute_time, memory_time) + transfer_time,
+        "total_time": total_time / 1000.0,
+        "flops": operator.get_compute_complexity() * layer_count,
+        "io_volume": io_volume.get("load", 0) + io_volume.get("store", 0),
+        "weight_mem_occupy": operator.get_weight_mem_occupy() * layer_count,
+    }
+
+
+def operator_lower_bound(calculator: PerformanceCalculator, operator: BaseOperator):
+    """
+    Lower bound on the time of one operator over all its layers, in microseconds
+
+    Follows PerformanceCalculator.calculate_ttft_lower_bound; like operator_metrics,
+    the operator's shapes may hold scalars or grid columns.
+
+    Args:
+        calculator: Scalar performance calculator providing the formulas
+        operator: Operator instance
+
+    Returns:
+        Bound (scalar or column)
+    """
+    metadata = operator.metadata
+    op_time = None
+    if metadata.op_type == "matmul":
+        weight_load_time = (
+            operator.get_weight_mem_occupy()
+            / calculator.hardware.bandwidth.hbm_bandwidth_gb_s
+            / 1e6
+        )
+        op_time = np.maximum(
+            calculator.calculate_compute_time(operator), weight_load_time
+        )
+    elif metadata.op_type == "attention":
+        op_time = operator.get_compute_complexity()
+    elif metadata.op_type == "transfer":
+        op_time = calculator.calculate_transfer_time(operator)
+    if op_time is None:
+        op_time = 0.0
+    return op_time * metadata.num_layers
+
+
+def _iter_operators(model_arch: BaseModelArch) -> List[BaseOperator]:
+    """Operators in the order used by PerformanceCalculator"""
+    operators = list(model_arch.operators)
+    for attn_operators in model_arch.attention_operators.values():
+        operators.extend(attn_operators)
+    operators.extend(model_arch.transfer_operators)
+    return operators
+
+
+def _as_column(value, size: int) -> np.ndarray:
+    """Convert a scalar or grid column into a plain float array of the group size"""
+    if value is None:
+        value = 0.0
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (size,)).copy()
+
+
+def _column_value(value):
+    """Convert a ScheduleConfig attribute into a grid column value"""
+    if isinstance(value, ForwardMode):
+        return value.value
+    return value
+
+
+def _mode_value(mode) -> int:
+    """Normalize a mode given as ForwardMode, integer value or "extend"/"decode" """
+    if isinstance(mode, str):
+        return ForwardMode[mode.upper()].value
+    if isinstance(mode, ForwardMode):
+        return mode.value
+    return int(mode)
+
+
+def _mode_column(mode) -> np.ndarray:
+    """Normalize mode values to ForwardMode integer values"""
+    values = np.asarray(mode)
+    if values.dtype.kind in "iub":
+        return values.astype(np.int64)
+    flat = values.reshape(-1).tolist()
+    lookup = {value: _mode_value(value) for value in set(flat)}
+    return np.asarray([lookup[value] for value in flat], dtype=np.int64).reshape(
+        values.shape
+    )
+
+
+def _grid_columns(
+    tp_size,
+    dp_size,
+    ep_size,
+    batch_size,
+    max_seqlen,
+    mode,
+    is_mtp=True,
+    deepep=True,
+    enable_moe_dense_fully_dp=False,
+) -> Dict[str, np.ndarray]:
+    """Grid columns with ScheduleConfig defaults, broadcast to flat int64 arrays"""
+    return _broadcast_columns(
+        tp_size=tp_size,
+        dp_size=dp_size,
+        ep_size=ep_size,
+        batch_size=batch_size,
+        max_seqlen=max_seqlen,
+        mode=_mode_column(mode),
+        is_mtp=is_mtp,
+        deepep=deepep,
+        enable_moe_dense_fully_dp=enable_moe_dense_fully_dp,
+    )
+
+
+def _iter_groups(
+    columns: Dict[str, np.ndarray]
+) -> Iterator[Tuple[List[int], np.ndarray]]:
+    """Yield (structural key, grid indices) of every structural group of a grid"""
+    if len(columns["tp_size"]) == 0:
+        return
+    # Encode the structural columns into one integer key per point
+    uniques, codes = zip(
+        *(np.unique(columns[name], return_inverse=True) for name in STRUCTURAL_COLUMNS)
+    )
+    group_codes = np.ravel_multi_index(
+        [code.reshape(-1) for code in codes], [len(u) for u in uniques]
+    )
+    order = np.argsort(group_codes, kind="stable")
+    group_starts = np.flatnonzero(np.diff(group_codes[order], prepend=-1))
+    for indices in np.split(order, group_starts[1:]):
+        yield [columns[name][indices[0]] for name in STRUCTURAL_COLUMNS], indices
+
+
+def _broadcast_columns(**columns) -> Dict[str, np.ndarray]:
+    """Broadcast all grid columns to one flat int64 array per column"""
+    arrays = np.broadcast_arrays(*[np.asarray(v) for v in columns.values()])
+    return {
+        name: np.ascontiguousarray(array, dtype=np.int64).reshape(-1)
+        for name, array in zip(columns.keys(), arrays)
+    }
@@ -0,0 +1,774 @@
+"""
+Compiled cost model - Piecewise closed-form performance functions traced from the operator graph
+"""
+
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field, replace
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.arch.config import ModelConfig, ScheduleConfig, content_hash
+from src.arch.model_type import ForwardMode
+from src.arch.models_arch.base_model_arch import BaseModelArch
+from src.arch.models_arch.model_arch import create_model_arch
+from src.arch.op.operator_base import OperatorIO, OperatorMetadata, Tensor
+from src.arch.perf.batch_perf import (
+    OPERATOR_FIELDS,
+    SHAPE_COLUMNS,
+    STRUCTURAL_COLUMNS,
+    BatchPerformance,
+    BatchPerformanceCalculator,
+    operator_metrics,
+)
+from src.arch.perf.layer_perf import LayerPerformance
+from src.arch.perf.model_perf import ModelPerformance
+from src.arch.perf.op_perf import OperatorPerformance
+from src.hardware.hardware_config import HardwareConfig
+
+# Bump when tracing or the generated code changes so that stale compiled models are rebuilt
+COST_MODEL_VERSION = 1
+
+# Per-operator values needed on top of OPERATOR_FIELDS to rebuild a full ModelPerformance
+DETAIL_FIELDS = (
+    "memory_volume",
+    "batch_size",
+    "input_m",
+    "input_n",
+    "output_m",
+    "output_n",
+    "weight_m",
+    "weight_n",
+)
+
+_OUTPUT_FIELDS = OPERATOR_FIELDS + DETAIL_FIELDS
+
+# Model-level sums, accumulated in PerformanceCalculator's operator order
+TOTAL_FIELDS = (
+    "total_compute_time",
+    "total_memory_time",
+    "total_transfer_time",
+    "total_time",
+    "ttft",
+    "model_total_mem_occupy",
+    "sum_full_time",
+)
+
+# Piece kinds
+VALID = "valid"  # compiled closed form
+INVALID = "invalid"  # a shape guard fails (the scalar path raises AssertionError)
+FALLBACK = "fallback"  # not traceable, evaluated by the batch engine instead
+
+
+class _Untraceable(TypeError):
+    """Raised when build code needs a concrete value of a traced symbol"""
+
+
+class _Tracer:
+    """Records arithmetic on symbols as a straight-line program"""
+
+    def __init__(self):
+        self.lines: List[Tuple[str, str, Tuple[str, ...]]] = []
+        self.guards: List[Tuple[str, bool]] = []
+        # Expression -> symbol, so repeated subexpressions are computed once
+        self._emitted: Dict[str, "_Sym"] = {}
+
+    def symbol(self, name: str, value) -> "_Sym":
+        """Create an input symbol with its value at the probe point"""
+        return _Sym(self, name, value)
+
+    def emit(self, expression: str, deps: Tuple[str, ...], value) -> "_Sym":
+        """Append one assignment and return the symbol holding its result"""
+        if expression in self._emitted:
+            return self._emitted[expression]
+        name = f"v{len(self.lines)}"
+        self.lines.append((name, expression, deps))
+        symbol = self._emitted[expression] = _Sym(self, name, value)
+        return symbol
+
+
+def _operand(value) -> Tuple[str, Tuple[str, ...], object]:
+    """Source text, dependencies and probe value of an operand"""
+    if isinstance(value, _Sym):
+        return value.name, (value.name,), value.value
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, bool):
+        return repr(value), (), value
+    if isinstance(value, (int, float)):
+        if value != value:
+            return "np.nan", (), value
+        if value in (float("inf"), float("-inf")):
+            return ("np.inf" if value > 0 else "-np.inf"), (), value
+        text = repr(value)
+        return (f"({text})" if value < 0 else text), (), value
+    raise _Untraceable(f"Cannot trace operand of type {type(value).__name__}")
+
+
+def _binary(symbol: str, function: Callable, reverse: bool = False):
+    """Build a traced binary operator method"""
+
+    def method(self, other):
+        try:
+            left = _operand(other if reverse else self)
+            right = _operand(self if reverse else other)
+        except _Untraceable:
+            return NotImplemented
+        value = function(left[2], right[2])
+        return self.tracer.emit(
+            f"{left[0]} {symbol} {right[0]}", left[1] + right[1], value
+        )
+
+    return method
+
+
+class _Sym:
+    """
+    Traced scalar
+
+    Carries the value at the probe point next to the name of the program variable that
+    computes it. Truth tests (asserts and branches) are recorded as guards: the traced
+    program is only valid for points where every guard takes the probed outcome.
+    """
+
+    __slots__ = ("tracer", "name", "value")
+
+    def __init__(self, tracer: _Tracer, name: str, value):
+        self.tracer = tracer
+        self.name = name
+        self.value = value
+
+    __add__ = _binary("+", lambda a, b: a + b)
+    __radd__ = _binary("+", lambda a, b: a + b, reverse=True)
+    __sub__ = _binary("-", lambda a, b: a - b)
+    __rsub__ = _binary("-", lambda a, b: a - b, reverse=True)
+    __mul__ = _binary("*", lambda a, b: a * b)
+    __rmul__ = _binary("*", lambda a, b: a * b, reverse=True)
+    __truediv__ = _binary("/", lambda a, b: a / b)
+    __rtruediv__ = _binary("/", lambda a, b: a / b, reverse=True)
+    __floordiv__ = _binary("//", lambda a, b: a // b)
+    __rfloordiv__ = _binary("//", lambda a, b: a // b, reverse=True)
+    __mod__ = _binary("%", lambda a, b: a % b)
+    __rmod__ = _binary("%", lambda a, b: a % b, reverse=True)
+    __pow__ = _binary("**", lambda a, b: a**b)
+    __rpow__ = _binary("**", lambda a, b: a**b, reverse=True)
+    __eq__ = _binary("==", lambda a, b: a == b)
+    __ne__ = _binary("!=", lambda a, b: a != b)
+    __lt__ = _binary("<", lambda a, b: a < b)
+    __le__ = _binary("<=", lambda a, b: a <= b)
+    __gt__ = _binary(">", lambda a, b: a > b)
+    __ge__ = _binary(">=", lambda a, b: a >= b)
+    __hash__ = object.__hash__
+
+    def __neg__(self) -> "_Sym":
+        return self.tracer.emit(f"-{self.name}", (self.name,), -self.value)
+
+    def __pos__(self) -> "_Sym":
+        return self
+
+    def __abs__(self) -> "_Sym":
+        return self.tracer.emit(f"np.abs({self.name})", (self.name,), abs(self.value))
+
+    def __bool__(self) -> bool:
+        outcome = bool(self.value)
+        self.tracer.guards.append((self.name, outcome))
+        return outcome
+
+    def __array_ufunc__(self, ufunc, method, *inputs, **kwargs):
+        if method != "__call__" or kwargs:
+            return NotImplemented
+        operands = [_operand(value) for value in inputs]
+        value = ufunc(*[operand[2] for operand in operands])
+        if isinstance(value, np.generic):
+            value = value.item()
+        return self.tracer.emit(
+            f"np.{ufunc.__name__}({', '.join(operand[0] for operand in operands)})",
+            sum((operand[1] for operand in operands), ()),
+            value,
+        )
+
+    def _concrete(self, *args):
+        raise _Untraceable(f"Concrete value of traced symbol {self.name} requested")
+
+    __int__ = __float__ = __index__ = __round__ = __trunc__ = _concrete
+    __floor__ = __ceil__ = _concrete
+
+
+class _ScalarNumPy:
+    """
+    NumPy stand-in for evaluating a piece on Python scalars
+
+    Builtin max/min are both faster on scalars and exactly what PerformanceCalculator uses.
+    """
+
+    maximum = staticmethod(max)
+    minimum = staticmethod(min)
+
+    def __getattr__(self, name: str):
+        return getattr(np, name)
+
+
+@dataclass
+class _OperatorTemplate:
+    """Shape-free description of one operator of a traced graph"""
+
+    layer_name: str
+    layer_type: str
+    metadata: OperatorMetadata
+
+
+@dataclass
+class CostPiece:
+    """
+    One piece of the piecewise cost function of a structural configuration
+
+    The generated function maps (batch_size, max_seqlen, dp_size) to (guard values,
+    outputs, totals), and a totals-only variant to (guard values, totals). Both are
+    compiled once for NumPy arrays and once for Python scalars. The piece applies where
+    every guard equals its expected outcome. Outputs hold _OUTPUT_FIELDS for each
+    operator template in order, totals hold TOTAL_FIELDS.
+    """
+
+    kind: str
+    source: str
+    expected: Tuple[bool, ...]
+    templates: List[_OperatorTemplate] = field(default_factory=list)
+    functions: Dict[Tuple[str, bool], Callable] = field(
+        default_factory=dict, repr=False, compare=False
+    )
+
+    def compile(self) -> None:
+        """Compile the source into functions keyed by (name, scalar)"""
+        code = compile(self.source, "<cost_model>", "exec")
+        for scalar, numpy_module in ((False, np), (True, _ScalarNumPy())):
+            namespace = {"np": numpy_module}
+            exec(code, namespace)
+            for name in ("piece", "piece_totals"):
+                self.functions[name, scalar] = namespace[name]
+
+    def matches(self, guard_values: Sequence, size: int) -> np.ndarray:
+        """Per-point mask of where this piece applies"""
+        mask = np.ones(size, dtype=bool)
+        for value, outcome in zip(guard_values, self.expected):
+            mask &= np.asarray(value).astype(bool) == outcome
+        return mask
+
+    def matches_scalar(self, guard_values: Sequence) -> bool:
+        """Whether this piece applies to a single point"""
+        return all(
+            bool(value) == outcome
+            for value, outcome in zip(guard_values, self.expected)
+        )
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state["functions"] = {}
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self.compile()
+
+
+def _generate_source(
+    tracer: _Tracer, guards: List[Tuple[str, bool]], outputs: List, totals: List
+) -> str:
+    """Generate the piece functions: the full one and a cheaper totals-only one"""
+    return "\n".join(
+        [
+            _function_source("piece", tracer, guards, [outputs, totals]),
+            _function_source("piece_totals", tracer, guards, [totals]),
+        ]
+    )
+
+
+def _function_source(
+    function_name: str,
+    tracer: _Tracer,
+    guards: List[Tuple[str, bool]],
+    results: List[List],
+) -> str:
+    """Generate one function returning guards and results, dropping dead assignments"""
+    live = {name for name, _ in guards}
+    for values in results:
+        live.update(value.name for value in values if isinstance(value, _Sym))
+    body = []
+    for name, expression, deps in reversed(tracer.lines):
+        if name in live:
+            body.append(f"    {name} = {expression}")
+            live.update(deps)
+    body.reverse()
+
+    tuples = ["".join(f"{name}, " for name, _ in guards)]
+    for values in results:
+        tuples.append("".join(f"{_operand(value)[0]}, " for value in values))
+    returned = ", ".join(f"({text})" for text in tuples)
+    return "\n".join(
+        [f"def {function_name}({', '.join(SHAPE_COLUMNS)}):"]
+        + body
+        + [f"    return {returned}", ""]
+    )
+
+
+def _iter_layers(model_arch: BaseModelArch):
+    """(layer name, layer type, operator) in the order of PerformanceCalculator"""
+    for operator in model_arch.operators:
+        yield operator.metadata.name, "compute", operator
+    for attn_key, operators in model_arch.attention_operators.items():
+        for operator in operators:
+            yield attn_key, "attention", operator
+    for operator in model_arch.transfer_operators:
+        yield operator.metadata.name, "transfer", operator
+
+
+class CostModel(BatchPerformanceCalculator):
+    """
+    Closed-form cost model of one model on one hardware
+
+    For every structural configuration (tp, ep, mode and feature flags) the operator graph
+    and the PerformanceCalculator formulas are traced once with symbolic batch size,
+    sequence length and dp size, and compiled into a NumPy function. Branches and shape
+    asserts split the function into pieces; a point that none of the known pieces covers
+    triggers one more trace. Results match PerformanceCalculator exactly.
+
+    Compiled pieces can be stored on disk, keyed by the model and hardware content and
+    COST_MODEL_VERSION. save() writes them; processes sharing a cache directory merge
+    their pieces.
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig,
+        hardware_config: HardwareConfig,
+        cache_dir: Optional[str] = None,
+    ):
+        """
+        Initialize cost model
+
+        Args:
+            model_config: Model configuration
+            hardware_config: Hardware configuration
+            cache_dir: Directory storing compiled models (None to keep them in memory)
+        """
+        super().__init__(hardware_config)
+        self.model_config = model_config
+        self.fingerprint = content_hash(
+            COST_MODEL_VERSION, model_config, hardware_config
+        )
+        self.cache_path = (
+            os.path.join(
+                cache_dir,
+                f"cost_model_v{COST_MODEL_VERSION}_{self.fingerprint[:16]}.pkl",
+            )
+            if cache_dir is not None
+            else None
+        )
+        self._pieces: Dict[tuple, List[CostPiece]] = {}
+        self._lock = threading.Lock()
+        self._dirty = False
+        if self.cache_path is not None:
+            self._pieces = self._read()
+
+    @property
+    def num_pieces(self) -> int:
+        """Number of compiled pieces"""
+        return sum(len(pieces) for pieces in self._pieces.values())
+
+    def evaluate_grid(self, breakdown: bool = True, **columns) -> BatchPerformance:
+        """
+        Evaluate a grid given as columns (see BatchPerformanceCalculator.calculate_grid)
+
+        Args:
+            breakdown: Fill in the per-operator columns
+
+        Returns:
+            Batch performance metrics, one entry per grid point
+        """
+        return self.calculate_grid(self.model_config, breakdown=breakdown, **columns)
+
+    def evaluate_configs(
+        self, schedule_configs: Sequence[ScheduleConfig], breakdown: bool = True
+    ) -> BatchPerformance:
+        """Evaluate a list of schedule configurations"""
+        return self.calculate_configs(
+            self.model_config, schedule_configs, breakdown=breakdown
+        )
+
+    def evaluate(
+        self, schedule_config: ScheduleConfig, breakdown: bool = True
+    ) -> Optional[ModelPerformance]:
+        """
+        Evaluate one configuration
+
+        Args:
+            schedule_config: Schedule configuration
+            breakdown: Include the per-layer operator breakdown; without it only the
+                aggregated metrics are filled in (see ModelPerformance.summary)
+
+        Returns:
+            ModelPerformance equal to PerformanceCalculator's, or None if the
+            configuration is invalid for the model
+        """
+        key = _structural_key(schedule_config)
+        shapes = {name: getattr(schedule_config, name) for name in SHAPE_COLUMNS}
+        pieces = self._get_pieces(key)
+        index = 0
+        while True:
+            traced = index == len(pieces)
+            if traced:
+                self._trace(key, shapes)
+            piece = pieces[index]
+            index += 1
+            try:
+                if breakdown:
+                    guard_values, outputs, totals = piece.functions["piece", True](
+                        **shapes
+                    )
+                else:
+                    guard_values, totals = piece.functions["piece_totals", True](
+                        **shapes
+                    )
+            except ArithmeticError:
+                # Python scalars raise where NumPy only warns; such a point is off-piece
+                continue
+            if not piece.matches_scalar(guard_values):
+                if traced:
+                    # A piece always covers its own probe point; never retrace forever
+                    return self._evaluate_scalar(schedule_config)
+                continue
+            if piece.kind == INVALID:
+                return None
+            if piece.kind == FALLBACK:
+                perf = self._evaluate_scalar(schedule_config)
+                return perf if breakdown or perf is None else perf.summary()
+            if breakdown:
+                return self._build_model_performance(schedule_config, piece, outputs)
+            return self._build_summary(schedule_config, totals)
+
+    def save(self) -> None:
+        """Write the compiled pieces to the cache directory (if any were added)"""
+        if self.cache_path is None or not self._dirty:
+            return
+        with self._lock:
+            pieces = {key: list(pieces) for key, pieces in self._pieces.items()}
+            self._dirty = False
+        # Keep the structural shapes traced by other processes since loading
+        for key, stored in self._read().items():
+            pieces.setdefault(key, stored)
+        state = {"fingerprint": self.fingerprint, "pieces": pieces}
+        os.makedirs(os.path.dirname(os.path.abspath(self.cache_path)), exist_ok=True)
+        temp_path = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, self.cache_path)
+
+    def _read(self) -> Dict[tuple, List[CostPiece]]:
+        """Read compiled pieces from the cache directory (ignoring stale files)"""
+        if not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as e:
+            print(
+                f"Warning: Ignoring unreadable cost model cache {self.cache_path}: {e}"
+            )
+            return {}
+        if state.get("fingerprint") != self.fingerprint:
+            return {}
+        return state["pieces"]
+
+    def _get_pieces(self, key: tuple) -> List[CostPiece]:
+        with self._lock:
+            return self._pieces.setdefault(key, [])
+
+    def _calculate_group(
+        self,
+        model_config: ModelConfig,
+        key: List[int],
+        indices: np.ndarray,
+        result: BatchPerformance,
+        breakdown: bool = True,
+    ) -> None:
+        """Evaluate one structural group of grid points with the compiled pieces"""
+        if model_config is not self.model_config:
+            super()._calculate_group(model_config, key, indices, result, breakdown)
+            return
+
+        key = tuple(int(value) for value in key)
+        pieces = self._get_pieces(key)
+        remaining = indices
+        index = 0
+        while len(remaining):
+            traced = index == len(pieces)
+            if traced:
+                probe = {
+                    name: int(result.columns[name][remaining[0]])
+                    for name in SHAPE_COLUMNS
+                }
+                self._trace(key, probe)
+            piece = pieces[index]
+            index += 1
+
+            size = len(remaining)
+            shapes = {name: result.columns[name][remaining] for name in SHAPE_COLUMNS}
+            with np.errstate(all="ignore"):
+                if breakdown:
+                    guard_values, outputs, totals = piece.functions["piece", False](
+                        **shapes
+                    )
+                else:
+                    guard_values, totals = piece.functions["piece_totals", False](
+                        **shapes
+                    )
+            matched = piece.matches(guard_values, size)
+            if traced and not matched[0]:
+                # A piece always covers its own probe point; never retrace forever
+                matched[0] = True
+                piece = CostPiece(kind=FALLBACK, source="", expected=())
+
+            selected = remaining[matched]
+            if not len(selected):
+                continue
+            if piece.kind == VALID and not breakdown:
+                values = {
+                    name: _select(value, size, matched)
+                    for name, value in zip(TOTAL_FIELDS, totals)
+                }
+                sum_full_time = values.pop("sum_full_time")
+                self._store_totals(
+                    result,
+                    selected,
+                    np.ones(len(selected), dtype=bool),
+                    values,
+                    sum_full_time,
+                )
+            elif piece.kind == VALID:
+                operator_arrays = []
+                for position, template in enumerate(piece.templates):
+                    base = position * len(_OUTPUT_FIELDS)
+                    operator_arrays.append(
+                        (
+                            template.metadata.name,
+                            {
+                                name: _select(outputs[base + offset], size, matched)
+                                for offset, name in enumerate(OPERATOR_FIELDS)
+                            },
+                        )
+                    )
+                self._store_group(
+                    result,
+                    selected,
+                    np.ones(len(selected), dtype=bool),
+                    operator_arrays,
+                    breakdown,
+                )
+            elif piece.kind == FALLBACK:
+                super()._calculate_group(
+                    model_config, list(key), selected, result, breakdown
+                )
+            remaining = remaining[~matched]
+
+    def _trace(self, key: tuple, probe: Dict[str, int]) -> CostPiece:
+        """Trace the operator graph around a probe point and compile a new piece"""
+        tracer = _Tracer()
+        structural = dict(zip(STRUCTURAL_COLUMNS, key))
+        schedule_config = ScheduleConfig(
+            mode=ForwardMode(structural["mode"]),
+            tp_size=structural["tp_size"],
+            ep_size=structural["ep_size"],
+            is_mtp=bool(structural["is_mtp"]),
+            deepep=bool(structural["deepep"]),
+            enable_moe_dense_fully_dp=bool(structural["enable_moe_dense_fully_dp"]),
+            **{name: tracer.symbol(name, probe[name]) for name in SHAPE_COLUMNS},
+        )
+
+        templates = []
+        outputs = []
+        totals = dict.fromkeys(TOTAL_FIELDS, 0.0)
+        kind = VALID
+        try:
+            model_arch = create_model_arch(
+                model_config=self.model_config, schedule_config=schedule_config
+            )
+            model_arch.build_operators()
+            for layer_name, layer_type, operator in _iter_layers(model_arch):
+                operator_outputs = self._operator_outputs(operator)
+                outputs.extend(operator_outputs)
+                _accumulate_totals(totals, operator_outputs)
+                templates.append(
+                    _OperatorTemplate(
+                        layer_name=layer_name,
+                        layer_type=layer_type,
+                        metadata=_shape_free(operator.metadata),
+                    )
+                )
+        except AssertionError:
+            kind = INVALID
+        except Exception:
+            kind = FALLBACK
+
+        if kind != VALID:
+            templates, outputs, totals = [], [], {}
+        piece = CostPiece(
+            kind=kind,
+            source=_generate_source(
+                tracer, tracer.guards, outputs, list(totals.values())
+            ),
+            expected=tuple(outcome for _, outcome in tracer.guards),
+            templates=templates,
+        )
+        piece.compile()
+        with self._lock:
+            self._pieces.setdefault(key, []).append(piece)
+            self._dirty = True
+        return piece
+
+    def _operator_outputs(self, operator) -> list:
+        """Traced values of one operator, in _OUTPUT_FIELDS order"""
+        metrics = operator_metrics(self.calculator, operator)
+        metadata = operator.metadata
+        io = metadata.io_config
+        details = {
+            "memory_volume": operator.get_memory_requirement().get("weight", 0),
+            "batch_size": metadata.batch_size,
+            "input_m": io.input_shape.m,
+            "input_n": io.input_shape.n,
+            "output_m": io.output_shape.m,
+            "output_n": io.output_shape.n,
+            "weight_m": io.weight_shape.m,
+            "weight_n": io.weight_shape.n,
+        }
+        return [metrics[name] for name in OPERATOR_FIELDS] + [
+            details[name] for name in DETAIL_FIELDS
+        ]
+
+    def _build_model_performance(
+        self, schedule_config: ScheduleConfig, piece: CostPiece, outputs: Sequence
+    ) -> ModelPerformance:
+        """Assemble a ModelPerformance from the scalar outputs of a piece"""
+        model_perf = ModelPerformance(
+            model_name=self.model_config.model_type,
+            forward_mode=schedule_config.mode.name,
+            schedule_config=schedule_config,
+        )
+        width = len(_OUTPUT_FIELDS)
+        for position, template in enumerate(piece.templates):
+            values = dict(
+                zip(_OUTPUT_FIELDS, outputs[position * width : (position + 1) * width])
+            )
+            metadata = _with_shapes(template.metadata, values)
+            op_perf = OperatorPerformance(
+                name=metadata.name,
+                op_type=metadata.op_type,
+                compute_time=values["compute_time"],
+                memory_time=values["memory_time"],
+                transfer_time=values["transfer_time"],
+                op_time_single_layer=values["op_time_single_layer"],
+                total_time=values["total_time"],
+                flops=values["flops"],
+                memory_volume=values["memory_volume"],
+                io_volume=values["io_volume"],
+                metadata=metadata,
+                weight_mem_occupy=values["weight_mem_occupy"],
+            )
+            layer_perf = LayerPerformance(
+                layer_name=template.layer_name, layer_type=template.layer_type
+            )
+            layer_perf.add_operator(op_perf)
+            model_perf.add_layer(layer_perf)
+        model_perf.finalize()
+        return model_perf
+
+    def _build_summary(
+        self, schedule_config: ScheduleConfig, totals: Sequence
+    ) -> ModelPerformance:
+        """Aggregate-only ModelPerformance from the scalar totals of a piece"""
+        values = dict(zip(TOTAL_FIELDS, totals))
+        sum_full_time = values.pop("sum_full_time")
+        # Same fallback as ModelPerformance.finalize
+        if values["total_time"] == 0:
+            values["total_time"] = sum_full_time / 1000.0
+        summary = ModelPerformance(
+            model_name=self.model_config.model_type,
+            forward_mode=schedule_config.mode.name,
+            schedule_config=schedule_config,
+            **values,
+        )
+        summary._sum_full_time = sum_full_time
+        return summary
+
+    def _evaluate_scalar(
+        self, schedule_config: ScheduleConfig
+    ) -> Optional[ModelPerformance]:
+        """Evaluate a configuration the tracer could not compile"""
+        try:
+            model_arch = create_model_arch(
+                model_config=self.model_config, schedule_config=schedule_config
+            )
+            return self.calculator.calculate_model_performance(model_arch)
+        except Exception:
+            return None
+
+
+def _accumulate_totals(totals: Dict[str, object], operator_outputs: list) -> None:
+    """Add one operator to the model sums (ModelPerformance.finalize order)"""
+    values = dict(zip(_OUTPUT_FIELDS, operator_outputs))
+    totals["total_compute_time"] = totals["total_compute_time"] + values["compute_time"]
+    totals["total_memory_time"] = totals["total_memory_time"] + values["memory_time"]
+    totals["total_transfer_time"] = (
+        totals["total_transfer_time"] + values["transfer_time"]
+    )
+    totals["total_time"] = totals["total_time"] + values["op_time_single_layer"]
+    totals["model_total_mem_occupy"] = (
+        totals["model_total_mem_occupy"] + values["weight_mem_occupy"]
+    )
+    totals["sum_full_time"] = totals["sum_full_time"] + values["total_time"] * 1000.0
+    totals["ttft"] = totals["ttft"] + values["total_time"]
+
+
+def _structural_key(schedule_config: ScheduleConfig) -> tuple:
+    """Structural key of a schedule configuration, in STRUCTURAL_COLUMNS order"""
+    values = []
+    for name in STRUCTURAL_COLUMNS:
+        value = getattr(schedule_config, name)
+        values.append(value.value if isinstance(value, ForwardMode) else int(value))
+    return tuple(values)
+
+
+def _shape_free(metadata: OperatorMetadata) -> OperatorMetadata:
+    """Copy of operator metadata with the traced shapes cleared"""
+    return replace(
+        metadata,
+        batch_size=0,
+        io_config=replace(
+            metadata.io_config,
+            input_shape=Tensor(),
+            output_shape=Tensor(),
+            weight_shape=Tensor(),
+        ),
+    )
+
+
+def _with_shapes(metadata: OperatorMetadata, values: dict) -> OperatorMetadata:
+    """Copy of shape-free operator metadata with evaluated shapes filled in"""
+    # Filling __dict__ directly is much cheaper than dataclasses.replace per operator
+    io_config = object.__new__(OperatorIO)
+    io_config.__dict__.update(
+        metadata.io_config.__dict__,
+        input_shape=Tensor(values["input_m"], values["input_n"]),
+        output_shape=Tensor(values["output_m"], values["output_n"]),
+        weight_shape=Tensor(values["weight_m"], values["weight_n"]),
+    )
+    shaped = object.__new__(OperatorMetadata)
+    shaped.__dict__.update(
+        metadata.__dict__, io_config=io_config, batch_size=values["batch_size"]
+    )
+    return shaped
+
+
+def _select(value, size: int, mask: np.ndarray) -> np.ndarray:
+    """Values of an output at the masked points (outputs may be constants)"""
+    return np.broadcast_to(np.asarray(value, dtype=np.float64), (size,))[mask]
@@ -1,4 +1,4 @@
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from typing import List
 
 from src.arch.config import ScheduleConfig
@@ -66,6 +66,12 @@ class ModelPerformance:
         # Save sum_full_time for percentage calculation (microseconds)
         self._sum_full_time = sum_full_time
 
+    def summary(self) -> "ModelPerformance":
+        """Copy holding only the aggregated metrics (no layer breakdown), cheap to pickle"""
+        summary = replace(self, layer_performances=[])
+        summary._sum_full_time = getattr(self, "_sum_full_time", self.total_time)
+        return summary
+
     def get_bottleneck_op(self) -> tuple:
         """Get performance bottleneck operator"""
         max_time = 0.0
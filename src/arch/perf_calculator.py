@@ -2,6 +2,9 @@
 Performance calculation engine - Unified performance computation and analysis module
 """
 
+from collections import OrderedDict
+from typing import Dict, Optional
+
 from src.arch.models_arch.model_arch import BaseModelArch
 from src.arch.op.operator_base import BaseOperator
 from src.arch.perf.layer_perf import LayerPerformance
@@ -14,14 +17,24 @@ from src.hardware.hardware_config import HardwareConfig
 class PerformanceCalculator:
     """Performance calculation engine"""
 
-    def __init__(self, hardware_config: HardwareConfig):
+    def __init__(
+        self, hardware_config: HardwareConfig, operator_cache_size: int = 4096
+    ):
         """
         Initialize performance calculator
 
         Args:
             hardware_config: Hardware configuration
+            operator_cache_size: Maximum number of OperatorPerformance results kept in
+                the LRU cache (0 disables caching)
         """
         self.hardware = hardware_config
+        # Results are keyed by BaseOperator.get_signature(); the cache belongs to this
+        # calculator, so the hardware is fixed for all of its entries
+        self.operator_cache_size = operator_cache_size
+        self._operator_cache: "OrderedDict[tuple, OperatorPerformance]" = OrderedDict()
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def calculate_compute_time(self, operator: BaseOperator) -> float:
         """
@@ -33,11 +46,10 @@ class PerformanceCalculator:
         Returns:
             Computation time (microseconds)
         """
+        # No shortcut for zero FLOPs: the formula is also evaluated on whole grid
+        # columns (see src.arch.perf.batch_perf), where a branch on them is undefined
         flops = operator.get_compute_complexity()
 
-        if flops == 0:
-            return 0.0
-
         # Select appropriate MAC performance based on data type
         io_config = operator.metadata.io_config
         dtype_bytes = io_config.weight_dtype.value
@@ -67,17 +79,21 @@ class PerformanceCalculator:
         """
         return (load_count * load_dtype + store_count * store_dtype) / dma / 1000000.0
 
-    def calculate_memory_time(self, operator: BaseOperator) -> float:
+    def calculate_memory_time(
+        self, operator: BaseOperator, io_volume: Optional[Dict[str, int]] = None
+    ) -> float:
         """
         Calculate operator memory access time
 
         Args:
             operator: Operator instance
+            io_volume: Precomputed operator.get_io_volume() (computed if None)
 
         Returns:
             Memory time (microseconds)
         """
-        io_volume = operator.get_io_volume()
+        if io_volume is None:
+            io_volume = operator.get_io_volume()
 
         load_bytes = io_volume.get("load", 0)
         store_bytes = io_volume.get("store", 0)
@@ -88,13 +104,15 @@ class PerformanceCalculator:
         )
         return memory_time_us
 
-    def calculate_transfer_time(self, operator: BaseOperator) -> float:
+    def calculate_transfer_time(
+        self, operator: BaseOperator, io_volume: Optional[Dict[str, int]] = None
+    ) -> float:
         """
         Calculate transfer operator transmission time
 
         Args:
             operator: Operator instance
-            bandwidth_gb_s: Bandwidth (GB/s), if None use default network bandwidth
+            io_volume: Precomputed operator.get_io_volume() (computed if None)
 
         Returns:
             Transfer time (microseconds)
@@ -112,7 +130,8 @@ class PerformanceCalculator:
             else:
                 bandwidth_gb_s = self.hardware.bandwidth.link_bandwidth_gb_s
 
-        io_volume = operator.get_io_volume()
+        if io_volume is None:
+            io_volume = operator.get_io_volume()
         transfer_bytes = io_volume.get("transfer", io_volume.get("load", 0))
 
         # data.transfer = m * n * batch * dtype / nb / 1000.0
@@ -128,13 +147,38 @@ class PerformanceCalculator:
         """
         Calculate performance metrics for a single operator
 
+        Results are memoized by operator signature, so identical operators across
+        configurations share one OperatorPerformance. Treat it as immutable.
+
         Args:
             operator: Operator instance
 
         Returns:
             Operator performance metrics
         """
+        signature = operator.get_signature() if self.operator_cache_size > 0 else None
+        if signature is not None:
+            op_perf = self._operator_cache.get(signature)
+            if op_perf is not None:
+                self._operator_cache.move_to_end(signature)
+                self.cache_hits += 1
+                return op_perf
+            self.cache_misses += 1
+
+        op_perf = self._calculate_operator_performance(operator)
+
+        if signature is not None:
+            self._operator_cache[signature] = op_perf
+            if len(self._operator_cache) > self.operator_cache_size:
+                self._operator_cache.popitem(last=False)
+        return op_perf
+
+    def _calculate_operator_performance(
+        self, operator: BaseOperator
+    ) -> OperatorPerformance:
+        """Calculate operator performance without the cache"""
         metadata = operator.metadata
+        io_volume = operator.get_io_volume()
 
         # Calculate different types of time
         compute_time = 0.0
@@ -142,13 +186,13 @@ class PerformanceCalculator:
         transfer_time = 0.0
 
         if metadata.op_type == "transfer":
-            transfer_time = self.calculate_transfer_time(operator)
+            transfer_time = self.calculate_transfer_time(operator, io_volume)
         elif metadata.op_type == "attention":
             compute_time = operator.get_compute_complexity()
             memory_time = operator.get_hbm_time(hardware=self.hardware)
         elif metadata.op_type == "matmul":
             compute_time = self.calculate_compute_time(operator)
-            memory_time = self.calculate_memory_time(operator)
+            memory_time = self.calculate_memory_time(operator, io_volume)
             # print(f'name = {operator.metadata.name}, compute_time = {compute_time}, memory_time={memory_time}')
         else:
             # Unknown operator type, log warning but continue execution
@@ -196,14 +240,70 @@ class PerformanceCalculator:
             total_time=total_time / 1000.0,  # Convert to milliseconds
             flops=operator.get_compute_complexity() * layer_count,
             memory_volume=operator.get_memory_requirement().get("weight", 0),
-            io_volume=operator.get_io_volume().get("load", 0)
-            + operator.get_io_volume().get("store", 0),
+            io_volume=io_volume.get("load", 0) + io_volume.get("store", 0),
             metadata=metadata,
             weight_mem_occupy=op_weight_mem,
         )
 
         return op_perf
 
+    def calculate_ttft_lower_bound(self, model_arch: BaseModelArch) -> float:
+        """
+        Cheap lower bound on the model's TTFT (before framework overhead)
+
+        Each matmul is bounded by the larger of its compute-only time and the time to
+        load its weights from HBM, which never exceeds max(compute, memory). Attention
+        operators use their compute time only; transfers are exact.
+
+        Args:
+            model_arch: Model architecture instance
+
+        Returns:
+            Lower bound on ModelPerformance.ttft in milliseconds
+        """
+        model_arch.build_operators()
+        operators = list(model_arch.operators)
+        for attention_operators in model_arch.attention_operators.values():
+            operators.extend(attention_operators)
+        operators.extend(model_arch.transfer_operators)
+
+        bound_us = 0.0
+        for operator in operators:
+            metadata = operator.metadata
+            if metadata.op_type == "matmul":
+                weight_load_time = (
+                    operator.get_weight_mem_occupy()
+                    / self.hardware.bandwidth.hbm_bandwidth_gb_s
+                    / 1e6
+                )
+                op_time = max(self.calculate_compute_time(operator), weight_load_time)
+            elif metadata.op_type == "attention":
+                op_time = operator.get_compute_complexity() or 0.0
+            elif metadata.op_type == "transfer":
+                op_time = self.calculate_transfer_time(operator) or 0.0
+            else:
+                op_time = 0.0
+            bound_us += op_time * metadata.num_layers
+
+        return bound_us / 1000.0
+
+    def clear_cache(self) -> None:
+        """Clear the operator performance cache and its statistics"""
+        self._operator_cache.clear()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    def get_cache_stats(self) -> dict:
+        """Get operator performance cache statistics"""
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "size": len(self._operator_cache),
+            "maxsize": self.operator_cache_size,
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+        }
+
     def calculate_model_performance(
         self, model_arch: BaseModelArch
     ) -> ModelPerformance:
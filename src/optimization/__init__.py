@@ -26,6 +26,8 @@ Example usage:
     print(f"Best TPS: {result.best_metrics['throughput_tps']:.2f}")
 """
 
+from src.optimization.checkpoint import Checkpoint
+
 # Core classes
 from src.optimization.config import SearchSpaceConfig
 from src.optimization.constraints import (
@@ -36,7 +38,9 @@ from src.optimization.constraints import (
     ProductConstraint,
     RangeConstraint,
 )
+from src.optimization.disaggregation import run_disaggregation_search
 from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.history import ColumnarHistory
 from src.optimization.objective import (
     BalancedObjective,
     BaseObjective,
@@ -45,18 +49,33 @@ from src.optimization.objective import (
     MultiObjective,
     create_objective,
 )
-from src.optimization.optimizers import BaseOptimizer, GridSearchOptimizer
+from src.optimization.optimizers import (
+    BaseOptimizer,
+    BayesianOptimizer,
+    BranchAndBoundOptimizer,
+    CoarseToFineOptimizer,
+    EvolutionaryOptimizer,
+    GridSearchOptimizer,
+    ParetoOptimizer,
+)
+from src.optimization.pareto import ParetoArchive
+from src.optimization.progress import ProgressReporter
 from src.optimization.results import (
+    DisaggregatedDeployment,
+    DisaggregationResult,
     OptimizationResult,
     OptimizationStep,
     RecommendedConfig,
     SensitivityAnalysisResult,
+    SensitivityGrid,
 )
-from src.optimization.search_space import SearchSpace
+from src.optimization.results_store import ResultsStore
+from src.optimization.search_space import SearchDimension, SearchSpace
 from src.optimization.service import (
     OptimizationService,
     get_recommended_config,
 )
+from src.optimization.sharding import ShardQueue
 
 __all__ = [
     # Core service
@@ -65,6 +84,7 @@ __all__ = [
     # Configuration
     "SearchSpaceConfig",
     "SearchSpace",
+    "SearchDimension",
     # Objectives
     "BaseObjective",
     "MinimizeTTFT",
@@ -75,8 +95,16 @@ __all__ = [
     # Optimizers
     "BaseOptimizer",
     "GridSearchOptimizer",
+    "BayesianOptimizer",
+    "BranchAndBoundOptimizer",
+    "CoarseToFineOptimizer",
+    "EvolutionaryOptimizer",
+    "ParetoOptimizer",
+    "ParetoArchive",
     # Evaluator
     "PerformanceEvaluator",
+    # Prefill/decode disaggregation
+    "run_disaggregation_search",
     # Constraints
     "Constraint",
     "DivisibilityConstraint",
@@ -89,4 +117,12 @@ __all__ = [
     "OptimizationStep",
     "RecommendedConfig",
     "SensitivityAnalysisResult",
+    "SensitivityGrid",
+    "DisaggregationResult",
+    "DisaggregatedDeployment",
+    "ColumnarHistory",
+    "ResultsStore",
+    "Checkpoint",
+    "ShardQueue",
+    "ProgressReporter",
 ]
@@ -0,0 +1,92 @@
+"""
+Optimization checkpoints - periodic snapshots of a run, for resuming after interruption
+"""
+
+import os
+import pickle
+import time
+from typing import Any, Dict, Optional
+
+from src.arch.config import content_hash
+
+# Bump when the checkpoint state layout changes
+CHECKPOINT_VERSION = 1
+
+
+def make_run_key(*objects) -> str:
+    """
+    Identify a run by the content of everything that determines its results
+
+    Args:
+        *objects: Model config, hardware config, search space config, objective, ...
+
+    Returns:
+        Hex digest used as checkpoint name and checked on resume
+    """
+    return content_hash(CHECKPOINT_VERSION, *objects)
+
+
+class Checkpoint:
+    """
+    Checkpoint file of one optimization run
+
+    The file is named after the run key, so every distinct combination of model,
+    hardware, search space and objective gets its own checkpoint; the key is also
+    stored inside and verified on load. Writes go to a temporary file that replaces
+    the previous checkpoint atomically, so an interrupted write never corrupts it.
+    """
+
+    def __init__(self, directory: str, run_key: str, interval_seconds: float = 60.0):
+        """
+        Args:
+            directory: Directory holding checkpoint files (created if missing)
+            run_key: Run identity (see make_run_key)
+            interval_seconds: Minimum time between two periodic saves
+        """
+        self.directory = directory
+        self.run_key = run_key
+        self.interval_seconds = interval_seconds
+        self.path = os.path.join(directory, f"{run_key}.ckpt")
+        self._last_save = time.time()
+
+    def exists(self) -> bool:
+        """Check whether a checkpoint was written for this run"""
+        return os.path.exists(self.path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Read the saved optimizer state
+
+        Returns:
+            State dictionary, or None if there is no checkpoint
+
+        Raises:
+            ValueError: If the file belongs to another run or checkpoint version
+        """
+        if not self.exists():
+            return None
+        with open(self.path, "rb") as f:
+            payload = pickle.load(f)
+        if payload.get("run_key") != self.run_key:
+            raise ValueError(
+                f"Checkpoint {self.path} was written for a different run "
+                "(model, hardware, search space or objective changed)"
+            )
+        return payload["state"]
+
+    def save(self, state: Dict[str, Any]) -> None:
+        """Write the optimizer state atomically"""
+        os.makedirs(self.directory, exist_ok=True)
+        temporary_path = f"{self.path}.tmp"
+        with open(temporary_path, "wb") as f:
+            pickle.dump(
+                {"run_key": self.run_key, "state": state},
+                f,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(temporary_path, self.path)
+        self._last_save = time.time()
+
+    def is_due(self) -> bool:
+        """Check whether the periodic save interval has elapsed"""
+        return time.time() - self._last_save >= self.interval_seconds
@@ -11,18 +11,54 @@ Usage:
         --batch_range "1-128" \
         --objective maximize_tps \
         --output result.json
+
+    # Re-score a stored sweep (see --results_path) under another objective
+    python -m src.optimization.cli rescore sweep.jsonl --objective balanced
+
+    # Combine the results of a sharded sweep (see --shard and --work_queue)
+    python -m src.optimization.cli merge shards/
+
+    # Sensitivity of one or two parameters around a base configuration
+    python -m src.optimization.cli sensitivity \
+        --model_path hf_config/qwen3-32B_config.json --max_seqlen 4096 \
+        --tp_size 4 --dp_size 2 --vary tp_size=1,2,4,8 --vary batch_size=1-256
+
+    # Prefill/decode disaggregation: prefill and decode instances and their ratio
+    python -m src.optimization.cli disaggregate \
+        --model_path hf_config/deepseek_671b_r1_config.json --hardware klx_p800 \
+        --prompt_len 4096 --output_len 1024 --ttft_slo_ms 2000 --tpot_slo_ms 50
 """
 
 import argparse
+import glob
 import json
+import os
 import sys
-from typing import List, Union
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
 
-from src.arch.config import ModelConfig
+from src.arch.config import ModelConfig, ScheduleConfig
+from src.arch.model_type import ForwardMode
 from src.hardware.hardware_config import get_hardware_config
-from src.optimization.config import SearchSpaceConfig
-from src.optimization.results import OptimizationResult
+from src.optimization.config import FLAG_NAMES, SearchSpaceConfig
+from src.optimization.constraints import (
+    Constraint,
+    ProductConstraint,
+    RangeConstraint,
+)
+from src.optimization.history import ColumnarHistory
+from src.optimization.optimizers.base import STOP_REASONS
+from src.optimization.results import (
+    DisaggregationResult,
+    OptimizationResult,
+    SensitivityGrid,
+)
+from src.optimization.results_store import config_to_dict
+from src.optimization.sensitivity import SENSITIVITY_METRICS
 from src.optimization.service import OptimizationService
+from src.optimization.sharding import ShardQueue, parse_shard
+from src.visual.sensitivity_report import SensitivityExcelFormatter
 
 
 def parse_range(value: str) -> Union[List[int], tuple]:
@@ -100,8 +136,9 @@ Examples:
     parser.add_argument(
         "--max_seqlen",
         type=int,
-        required=True,
-        help="Maximum sequence length (fixed parameter)",
+        default=None,
+        help="Maximum sequence length (fixed parameter; required unless "
+        "--seqlen_range is given)",
     )
     parser.add_argument(
         "--mode",
@@ -136,6 +173,19 @@ Examples:
         default="1-128",
         help="Batch size range (e.g., '1,2,4,8' or '1-128')",
     )
+    parser.add_argument(
+        "--seqlen_range",
+        type=parse_range,
+        default=None,
+        help="Also search the maximum sequence length over this range (e.g., "
+        "'1024,4096' or '1024-16384'), instead of the fixed --max_seqlen; "
+        "coarse_to_fine refines it to integer resolution",
+    )
+    parser.add_argument(
+        "--search_flags",
+        action="store_true",
+        help="Also search the is_mtp, deepep and enable_moe_dense_fully_dp flags",
+    )
     parser.add_argument(
         "--world_size",
         type=int,
@@ -155,8 +205,31 @@ Examples:
         "--optimizer",
         type=str,
         default="grid_search",
-        choices=["grid_search"],
-        help="Optimization algorithm",
+        choices=[
+            "grid_search",
+            "branch_and_bound",
+            "coarse_to_fine",
+            "evolutionary",
+            "bayesian",
+            "pareto",
+        ],
+        help=(
+            "Optimization algorithm (branch_and_bound: grid search in order of a "
+            "TTFT lower bound, skipping configurations whose bound cannot beat the "
+            "best; "
+            "coarse_to_fine: refines the batch size (and the sequence length with "
+            "--seqlen_range) to integer resolution around the best lattice points; "
+            "evolutionary: genetic search within --max_evaluations, default 400; "
+            "bayesian: TPE search within --max_evaluations, "
+            "default 200; pareto: grid search reporting the TTFT / throughput per GPU "
+            "/ GPU count frontier)"
+        ),
+    )
+    parser.add_argument(
+        "--parallel_workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to evaluate configurations",
     )
     parser.add_argument(
         "--max_evaluations",
@@ -164,6 +237,86 @@ Examples:
         default=None,
         help="Maximum number of configurations to evaluate",
     )
+    parser.add_argument(
+        "--time_budget",
+        type=float,
+        default=None,
+        help="Stop after this many seconds and report the best configuration so far "
+        "(if any)",
+    )
+    parser.add_argument(
+        "--patience",
+        type=int,
+        default=None,
+        help="Stop once the best configuration (or the --stable_top_k best) did not "
+        "change for this many evaluations",
+    )
+    parser.add_argument(
+        "--stable_top_k",
+        type=int,
+        default=1,
+        help="Number of best configurations that must stay unchanged for --patience "
+        "evaluations",
+    )
+    parser.add_argument(
+        "--cache_path",
+        type=str,
+        default=None,
+        help="SQLite file caching evaluations across runs and processes",
+    )
+    parser.add_argument(
+        "--cost_model_dir",
+        type=str,
+        default=None,
+        help="Directory storing the compiled cost model of the model and hardware, so "
+        "that later runs skip tracing the operator graph",
+    )
+    parser.add_argument(
+        "--results_path",
+        type=str,
+        default=None,
+        help="JSON Lines file storing the raw metrics of every evaluated "
+        "configuration (re-score it with the rescore command)",
+    )
+    parser.add_argument(
+        "--checkpoint_dir",
+        type=str,
+        default=None,
+        help="Directory receiving periodic checkpoints of the run, keyed by a hash "
+        "of model, hardware, search space, objective and optimizer "
+        "(grid_search and pareto only)",
+    )
+    parser.add_argument(
+        "--checkpoint_interval",
+        type=float,
+        default=60.0,
+        help="Minimum seconds between two checkpoints",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from its checkpoint in --checkpoint_dir",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Evaluate only shard i/N (0-based) of the search space enumeration "
+        "into --results_path; combine the shards with the merge command",
+    )
+    parser.add_argument(
+        "--work_queue",
+        type=str,
+        default=None,
+        help="Shared directory of a sharded sweep: claim and evaluate shards until "
+        "none is left (run the same command on every host, then merge the directory)",
+    )
+    parser.add_argument(
+        "--num_shards",
+        type=int,
+        default=16,
+        help="Number of shards of a --work_queue sweep",
+    )
 
     # Quick recommendation mode
     parser.add_argument(
@@ -178,7 +331,32 @@ Examples:
     parser.add_argument(
         "--output", type=str, default=None, help="Output file path (JSON format)"
     )
-    parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    parser.add_argument(
+        "--history_path",
+        type=str,
+        default=None,
+        help="Write the optimization history column-wise to this .npz (or .parquet, "
+        "requires pyarrow) file instead of embedding it in the JSON output",
+    )
+    parser.add_argument(
+        "--history_spill_dir",
+        type=str,
+        default=None,
+        help="Write the optimization history to this directory in chunks as it "
+        "grows instead of keeping it in memory (for very large sweeps)",
+    )
+    parser.add_argument(
+        "--progress_events",
+        type=str,
+        default=None,
+        help="Append machine-readable progress events (JSON Lines) to this file",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Verbose output: print every evaluated configuration and failure "
+        "instead of a periodic progress summary",
+    )
 
     return parser
 
@@ -211,7 +389,7 @@ def format_result(result: OptimizationResult, verbose: bool = False) -> str:
     lines.append("OPTIMIZATION RESULTS")
     lines.append("=" * 60)
 
-    if result.best_config:
+    if result.best_config and result.optimization_history:
         config = result.best_config
         lines.append("\nBest Configuration:")
         lines.append(f"  Tensor Parallel (TP): {config.tp_size}")
@@ -219,6 +397,10 @@ def format_result(result: OptimizationResult, verbose: bool = False) -> str:
         lines.append(f"  Expert Parallel (EP): {config.ep_size}")
         lines.append(f"  Batch Size: {config.batch_size}")
         lines.append(f"  Mode: {config.mode.name}")
+        lines.append(
+            f"  Features: MTP={config.is_mtp}, DeepEP={config.deepep}, "
+            f"MoE dense fully DP={config.enable_moe_dense_fully_dp}"
+        )
 
         if result.best_metrics:
             lines.append("\nPerformance Metrics:")
@@ -230,15 +412,38 @@ def format_result(result: OptimizationResult, verbose: bool = False) -> str:
     else:
         lines.append("\nNo valid configuration found!")
 
+    if result.pareto_front:
+        lines.append(f"\nPareto Front ({len(result.pareto_front)} configurations):")
+        for i, step in enumerate(result.pareto_front):
+            config = step.config
+            marker = "  <-- knee" if i == result.knee_index else ""
+            lines.append(
+                f"  TP={config.tp_size} DP={config.dp_size} EP={config.ep_size} "
+                f"BS={config.batch_size} GPUs={step.metrics['num_gpus']} "
+                f"TTFT={step.metrics['ttft_ms']:.2f}ms "
+                f"TPS/GPU={step.metrics['throughput_per_gpu']:.2f}{marker}"
+            )
+
     lines.append("\nOptimization Statistics:")
     lines.append(f"  Total evaluations: {result.total_evaluations}")
     lines.append(f"  Search space size: {result.search_space_size}")
+    if result.pruned_evaluations:
+        lines.append(f"  Pruned configurations: {result.pruned_evaluations}")
+    if result.unbuildable_configurations:
+        lines.append(
+            "  Skipped configurations that cannot be built: "
+            f"{result.unbuildable_configurations}"
+        )
     lines.append(f"  Total time: {result.total_time_seconds:.2f}s")
+    if result.stop_reason is not None:
+        lines.append(
+            f"  Stopped by: {result.stop_reason} "
+            f"({STOP_REASONS.get(result.stop_reason, 'unknown')})"
+        )
 
     if verbose and result.optimization_history:
         lines.append("\nTop 10 Configurations:")
-        sorted_history = sorted(result.optimization_history, key=lambda x: x.score)
-        for i, step in enumerate(sorted_history[:10], 1):
+        for i, step in enumerate(result.get_top_k(10), 1):
             config = step.config
             lines.append(
                 f"  {i}. TP={config.tp_size} DP={config.dp_size} EP={config.ep_size} "
@@ -248,47 +453,805 @@ def format_result(result: OptimizationResult, verbose: bool = False) -> str:
     return "\n".join(lines)
 
 
-def save_result(result: OptimizationResult, output_path: str):
-    """Save result to JSON file"""
+def save_history(result: OptimizationResult, history_path: str):
+    """Save the optimization history column-wise (.npz, or .parquet with pyarrow)"""
+    history = result.optimization_history
+    if not isinstance(history, ColumnarHistory):
+        columnar = ColumnarHistory()
+        for step in history:
+            columnar.append(step)
+        history = columnar
+    history.save(history_path)
+    print(f"History saved to: {history_path} ({len(history)} steps)")
+
+
+def save_result(
+    result: OptimizationResult, output_path: str, history_path: Optional[str] = None
+):
+    """
+    Save result to JSON file
+
+    Args:
+        result: Optimization result
+        output_path: JSON file path
+        history_path: Columnar file already holding the history; it is referenced
+            instead of being embedded in the JSON
+    """
     data = {
-        "best_config": {
-            "tp_size": result.best_config.tp_size,
-            "dp_size": result.best_config.dp_size,
-            "ep_size": result.best_config.ep_size,
-            "batch_size": result.best_config.batch_size,
-            "max_seqlen": result.best_config.max_seqlen,
-            "mode": result.best_config.mode.name,
-        },
+        "best_config": config_to_dict(result.best_config),
         "best_metrics": result.best_metrics,
         "statistics": {
             "total_evaluations": result.total_evaluations,
             "search_space_size": result.search_space_size,
+            "pruned_evaluations": result.pruned_evaluations,
+            "unbuildable_configurations": result.unbuildable_configurations,
             "total_time_seconds": result.total_time_seconds,
+            "stop_reason": result.stop_reason,
         },
         "optimization_history": [
             {
                 "iteration": step.iteration,
-                "tp_size": step.config.tp_size,
-                "dp_size": step.config.dp_size,
-                "ep_size": step.config.ep_size,
-                "batch_size": step.config.batch_size,
+                **config_to_dict(step.config),
                 "score": step.score,
                 "metrics": step.metrics,
             }
             for step in result.optimization_history
         ],
     }
+    if history_path is not None:
+        data["optimization_history"] = []
+        data["optimization_history_path"] = history_path
+    if result.pareto_front:
+        data["pareto_front"] = [
+            {
+                **config_to_dict(step.config),
+                "is_knee": i == result.knee_index,
+                "metrics": step.metrics,
+            }
+            for i, step in enumerate(result.pareto_front)
+        ]
+
+    with open(output_path, "w") as f:
+        json.dump(data, f, indent=2)
+
+    print(f"\nResults saved to: {output_path}")
+
+
+def add_filter_arguments(parser: argparse.ArgumentParser):
+    """Add the configuration and SLA filters of stored-sweep commands"""
+    parser.add_argument(
+        "--world_size",
+        type=int,
+        default=None,
+        help="Only keep configurations with TP * DP = world_size",
+    )
+    parser.add_argument(
+        "--max_gpus",
+        type=int,
+        default=None,
+        help="Only keep configurations using at most this many GPUs",
+    )
+    parser.add_argument(
+        "--max_ttft_ms",
+        type=float,
+        default=None,
+        help="SLA: maximum TTFT (extend) or TPOT (decode) in milliseconds",
+    )
+    parser.add_argument(
+        "--min_throughput_tps",
+        type=float,
+        default=None,
+        help="SLA: minimum total throughput in tokens/s",
+    )
+    parser.add_argument(
+        "--min_throughput_per_gpu",
+        type=float,
+        default=None,
+        help="SLA: minimum throughput per GPU in tokens/s",
+    )
+    parser.add_argument(
+        "--max_weight_memory_gb",
+        type=float,
+        default=None,
+        help="Only keep configurations whose weights fit in this many GB per GPU",
+    )
+
+
+def get_filter_constraints(args: argparse.Namespace) -> List[Constraint]:
+    """Build the constraints selected by add_filter_arguments options"""
+    constraints = []
+    if args.world_size is not None:
+        constraints.append(
+            ProductConstraint(
+                factor_attrs=["tp_size", "dp_size"],
+                target_attr=f"={args.world_size}",
+                description=f"tp_size * dp_size = {args.world_size}",
+            )
+        )
+    limits = [
+        ("num_gpus", None, args.max_gpus),
+        ("ttft_ms", None, args.max_ttft_ms),
+        ("throughput_tps", args.min_throughput_tps, None),
+        ("throughput_per_gpu", args.min_throughput_per_gpu, None),
+        ("weight_memory_gb", None, args.max_weight_memory_gb),
+    ]
+    for metric, min_value, max_value in limits:
+        if min_value is not None or max_value is not None:
+            constraints.append(RangeConstraint(metric, min_value, max_value))
+    return constraints
+
+
+def create_rescore_parser() -> argparse.ArgumentParser:
+    """Create argument parser of the rescore command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.optimization.cli rescore",
+        description="Re-score a stored sweep under another objective, constraint "
+        "or SLA without re-evaluating it",
+    )
+    parser.add_argument(
+        "results_path",
+        type=str,
+        help="File written by a previous run with --results_path",
+    )
+    parser.add_argument(
+        "--objective",
+        type=str,
+        default="maximize_tps",
+        choices=["minimize_ttft", "maximize_tps", "balanced", "latency", "throughput"],
+        help="Optimization objective",
+    )
+    add_filter_arguments(parser)
+    parser.add_argument(
+        "--output", type=str, default=None, help="Output file path (JSON format)"
+    )
+    parser.add_argument(
+        "--history_path",
+        type=str,
+        default=None,
+        help="Write the re-scored history column-wise to this .npz or .parquet file",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    return parser
+
+
+def rescore_main(argv: List[str]):
+    """Entry point of the rescore command"""
+    args = create_rescore_parser().parse_args(argv)
+
+    constraints = get_filter_constraints(args)
+
+    service = OptimizationService()
+    result = service.rescore(
+        results_path=args.results_path,
+        objective_type=args.objective,
+        constraints=constraints,
+    )
+    print(
+        f"Re-scored {result.search_space_size} stored configurations with objective "
+        f"{args.objective}: {result.total_evaluations} pass all filters"
+    )
+    if not result.optimization_history:
+        print("No stored configuration passes all filters")
+        return
+    print(format_result(result, verbose=args.verbose))
+
+    if args.history_path:
+        save_history(result, args.history_path)
+    if args.output:
+        save_result(result, args.output, history_path=args.history_path)
+
+
+def create_merge_parser() -> argparse.ArgumentParser:
+    """Create argument parser of the merge command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.optimization.cli merge",
+        description="Combine the results of a sharded sweep into one result with a "
+        "global best and Pareto front",
+    )
+    parser.add_argument(
+        "results_paths",
+        type=str,
+        nargs="+",
+        help="Shard results files (--shard runs) or --work_queue directories",
+    )
+    parser.add_argument(
+        "--objective",
+        type=str,
+        default="maximize_tps",
+        choices=["minimize_ttft", "maximize_tps", "balanced", "latency", "throughput"],
+        help="Objective selecting the global best",
+    )
+    add_filter_arguments(parser)
+    parser.add_argument(
+        "--output", type=str, default=None, help="Output file path (JSON format)"
+    )
+    parser.add_argument(
+        "--history_path",
+        type=str,
+        default=None,
+        help="Write the merged history column-wise to this .npz or .parquet file",
+    )
+    parser.add_argument("--verbose", action="store_true", help="Verbose output")
+    return parser
+
+
+def merge_main(argv: List[str]):
+    """Entry point of the merge command"""
+    parser = create_merge_parser()
+    args = parser.parse_args(argv)
+
+    results_paths = []
+    for path in args.results_paths:
+        if os.path.isdir(path):
+            # Completed shards only, not the partial files of running ones
+            results_paths.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))))
+        else:
+            results_paths.append(path)
+    if not results_paths:
+        parser.error("no results files found")
+
+    service = OptimizationService()
+    result = service.merge(
+        results_paths=results_paths,
+        objective_type=args.objective,
+        constraints=get_filter_constraints(args),
+    )
+    print(
+        f"Merged {len(results_paths)} results files: {result.search_space_size} "
+        f"configurations, {result.total_evaluations} pass all filters"
+    )
+    if not result.optimization_history:
+        print("No stored configuration passes all filters")
+        return
+    print(format_result(result, verbose=args.verbose))
+
+    if args.history_path:
+        save_history(result, args.history_path)
+    if args.output:
+        save_result(result, args.output, history_path=args.history_path)
+
+
+def run_work_queue(
+    service: OptimizationService, queue: ShardQueue, optimize_args: dict
+):
+    """Claim and evaluate shards of a work queue until none is left"""
+    while True:
+        index = queue.claim()
+        if index is None:
+            break
+        print(f"\nClaimed shard {index}/{queue.num_shards}")
+        try:
+            result = service.optimize(
+                **optimize_args,
+                shard=(index, queue.num_shards),
+                results_path=queue.get_partial_path(index),
+            )
+        except BaseException:
+            queue.release(index)
+            raise
+        queue.complete(index)
+        print(
+            f"Shard {index}/{queue.num_shards} done: {result.total_evaluations} "
+            f"configurations, best score {result.get_best_score():.4f}"
+        )
+
+    completed = queue.get_completed_paths()
+    print(
+        f"\nNo unclaimed shards left in {queue.directory} "
+        f"({len(completed)}/{queue.num_shards} completed). Combine them with:"
+    )
+    print(f"  python -m src.optimization.cli merge {queue.directory}")
+
+
+def parse_sweep(value: str) -> Tuple[str, list]:
+    """Parse a NAME=VALUES sensitivity sweep"""
+    name, separator, values = value.partition("=")
+    name = name.strip()
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"Sweep must be given as NAME=VALUES: {value}")
+    if name == "mode":
+        return name, [item.strip() for item in values.split(",")]
+    if name in FLAG_NAMES:
+        return name, [
+            item.strip().lower() in ("1", "true", "yes") for item in values.split(",")
+        ]
+    parsed = parse_range(values)
+    if isinstance(parsed, tuple):
+        # Same power-of-two expansion as the search ranges
+        parsed = SearchSpaceConfig._normalize_to_list(parsed)
+    return name, parsed
+
 
+def create_sensitivity_parser() -> argparse.ArgumentParser:
+    """Create argument parser of the sensitivity command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.optimization.cli sensitivity",
+        description="Sweep one or two parameters around a base configuration "
+        "(all other fields, including feature flags, stay fixed)",
+    )
+    parser.add_argument(
+        "--model_path",
+        type=str,
+        required=True,
+        help="Path to model configuration JSON file",
+    )
+    parser.add_argument(
+        "--hardware",
+        type=str,
+        default="h800",
+        help="Hardware configuration name (h20, h800, gb200, klx_p800) or path to JSON",
+    )
+    parser.add_argument(
+        "--max_seqlen",
+        type=int,
+        required=True,
+        help="Maximum sequence length of the base configuration",
+    )
+    parser.add_argument(
+        "--mode",
+        type=str,
+        default="extend",
+        choices=["extend", "decode"],
+        help="Forward mode of the base configuration",
+    )
+    parser.add_argument("--tp_size", type=int, default=1, help="Base TP size")
+    parser.add_argument("--dp_size", type=int, default=1, help="Base DP size")
+    parser.add_argument("--ep_size", type=int, default=1, help="Base EP size")
+    parser.add_argument("--batch_size", type=int, default=64, help="Base batch size")
+    for name in FLAG_NAMES:
+        parser.add_argument(
+            f"--{name}",
+            action=argparse.BooleanOptionalAction,
+            default=getattr(ScheduleConfig, name),
+            help=f"Base {name} feature flag",
+        )
+    parser.add_argument(
+        "--vary",
+        type=parse_sweep,
+        action="append",
+        required=True,
+        metavar="NAME=VALUES",
+        help="Parameter to sweep, e.g. tp_size=1,2,4,8 or batch_size=1-512 "
+        "(powers of two); give it twice for a 2-D grid",
+    )
+    parser.add_argument(
+        "--objective",
+        type=str,
+        default="balanced",
+        choices=["minimize_ttft", "maximize_tps", "balanced", "latency", "throughput"],
+        help="Objective providing the score metric",
+    )
+    parser.add_argument(
+        "--metric",
+        type=str,
+        default="throughput_tps",
+        choices=list(SENSITIVITY_METRICS),
+        help="Metric printed as a table",
+    )
+    parser.add_argument(
+        "--parallel_workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to evaluate configurations",
+    )
+    parser.add_argument(
+        "--cache_path",
+        type=str,
+        default=None,
+        help="SQLite file caching evaluations across runs and processes",
+    )
+    parser.add_argument(
+        "--cost_model_dir",
+        type=str,
+        default=None,
+        help="Directory storing the compiled cost model of the model and hardware, so "
+        "that later runs skip tracing the operator graph",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write all metric grids to this .npz (arrays) or .csv (one row per "
+        "grid point) file",
+    )
+    parser.add_argument(
+        "--excel",
+        type=str,
+        default=None,
+        help="Write an Excel report with one heatmap sheet per metric "
+        "(requires openpyxl)",
+    )
+    return parser
+
+
+def format_sensitivity(grid: SensitivityGrid, metric: str) -> str:
+    """Format one metric of a sensitivity grid as a table"""
+
+    def label(value) -> str:
+        return value.name if isinstance(value, ForwardMode) else str(value)
+
+    def number(value: float) -> str:
+        return "failed" if np.isnan(value) else f"{value:.3f}"
+
+    values = grid.metrics[metric]
+    lines = [f"\n{metric}:"]
+    if len(grid.param_names) == 1:
+        lines.append(f"  {grid.param_names[0]:>14} {metric:>16}")
+        for value, cell in zip(grid.param_values[0], values):
+            lines.append(f"  {label(value):>14} {number(cell):>16}")
+    else:
+        corner = f"{grid.param_names[0]} \\ {grid.param_names[1]}"
+        header = "".join(f"{label(value):>12}" for value in grid.param_values[1])
+        lines.append(f"  {corner:>24}{header}")
+        for value, row in zip(grid.param_values[0], values):
+            cells = "".join(f"{number(cell):>12}" for cell in row)
+            lines.append(f"  {label(value):>24}{cells}")
+
+    best = grid.get_best()
+    if best is None:
+        lines.append("\nAll configurations failed")
+    else:
+        point = ", ".join(
+            f"{name}={label(value)}" for name, value in zip(grid.param_names, best[0])
+        )
+        lines.append(f"\nBest grid point: {point} (score {best[1]:.4f})")
+    return "\n".join(lines)
+
+
+def sensitivity_main(argv: List[str]):
+    """Entry point of the sensitivity command"""
+    parser = create_sensitivity_parser()
+    args = parser.parse_args(argv)
+    params = dict(args.vary)
+    if len(params) != len(args.vary) or len(params) > 2:
+        parser.error("--vary takes one or two distinct parameters")
+
+    print(f"Loading model configuration from: {args.model_path}")
+    model_config = load_model_config(args.model_path)
+    print(f"Loading hardware configuration: {args.hardware}")
+    hardware_config = load_hardware_config(args.hardware)
+
+    base_config = ScheduleConfig(
+        batch_size=args.batch_size,
+        max_seqlen=args.max_seqlen,
+        mode=ForwardMode[args.mode.upper()],
+        tp_size=args.tp_size,
+        dp_size=args.dp_size,
+        ep_size=args.ep_size,
+        **{name: getattr(args, name) for name in FLAG_NAMES},
+    )
+
+    service = OptimizationService()
+    try:
+        grid = service.analyze_sensitivity_grid(
+            model_config=model_config,
+            hardware_config=hardware_config,
+            base_config=base_config,
+            params=params,
+            objective_type=args.objective,
+            parallel_workers=args.parallel_workers,
+            cache_path=args.cache_path,
+            cost_model_dir=args.cost_model_dir,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(format_sensitivity(grid, args.metric))
+
+    if args.output:
+        grid.save(args.output)
+        print(f"\nSensitivity grid saved to: {args.output}")
+    if args.excel:
+        SensitivityExcelFormatter().save(grid, args.excel)
+
+
+def create_disaggregate_parser() -> argparse.ArgumentParser:
+    """Create argument parser of the disaggregate command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.optimization.cli disaggregate",
+        description="Jointly choose the prefill instance, the decode instance and "
+        "the P:D instance ratio maximizing goodput per GPU under TTFT/TPOT SLOs, "
+        "including the KV cache transfer from prefill to decode over RDMA",
+    )
+    parser.add_argument(
+        "--model_path",
+        type=str,
+        required=True,
+        help="Path to model configuration JSON file",
+    )
+    parser.add_argument(
+        "--hardware",
+        type=str,
+        default="h800",
+        help="Hardware configuration name (h20, h800, gb200, klx_p800) or path to JSON",
+    )
+    parser.add_argument(
+        "--prompt_len", type=int, required=True, help="Prompt length of a request"
+    )
+    parser.add_argument(
+        "--output_len", type=int, required=True, help="Output length of a request"
+    )
+    parser.add_argument(
+        "--ttft_slo_ms",
+        type=float,
+        default=None,
+        help="TTFT objective in ms, including the KV cache transfer",
+    )
+    parser.add_argument(
+        "--tpot_slo_ms", type=float, default=None, help="TPOT objective in ms"
+    )
+    for role in ("prefill", "decode"):
+        parser.add_argument(
+            f"--{role}_tp_range",
+            type=parse_range,
+            default="1,2,4,8",
+            help=f"Tensor Parallel range of {role} instances",
+        )
+        parser.add_argument(
+            f"--{role}_dp_range",
+            type=parse_range,
+            default="1,2,4,8,16",
+            help=f"Data Parallel range of {role} instances",
+        )
+        parser.add_argument(
+            f"--{role}_ep_range",
+            type=parse_range,
+            default=None,
+            help=f"Expert Parallel range of {role} instances. "
+            "Auto-detected for MoE models.",
+        )
+    parser.add_argument(
+        "--decode_batch_range",
+        type=parse_range,
+        default="8,16,32,64,128,256",
+        help="Batch size range of decode instances (per DP rank)",
+    )
+    parser.add_argument(
+        "--max_instances",
+        type=int,
+        default=8,
+        help="Largest number of instances of each role in a deployment unit",
+    )
+    parser.add_argument(
+        "--max_gpus",
+        type=int,
+        default=None,
+        help="Largest number of GPUs in a deployment unit",
+    )
+    parser.add_argument(
+        "--gpu_memory_utilization",
+        type=float,
+        default=0.9,
+        help="Fraction of HBM usable for weights and KV cache",
+    )
+    parser.add_argument(
+        "--top_k",
+        type=int,
+        default=10,
+        help="Number of (prefill, decode) configuration pairs reported",
+    )
+    parser.add_argument(
+        "--parallel_workers",
+        type=int,
+        default=1,
+        help="Number of worker processes used to evaluate configurations",
+    )
+    parser.add_argument(
+        "--cache_path",
+        type=str,
+        default=None,
+        help="SQLite file caching evaluations across runs and processes (share it "
+        "with prefill and decode sweeps to reuse their evaluations)",
+    )
+    parser.add_argument(
+        "--cost_model_dir",
+        type=str,
+        default=None,
+        help="Directory storing the compiled cost model of the model and hardware, so "
+        "that later runs skip tracing the operator graph",
+    )
+    parser.add_argument(
+        "--output", type=str, default=None, help="Output file path (JSON format)"
+    )
+    return parser
+
+
+def format_disaggregation(result: DisaggregationResult) -> str:
+    """Format a disaggregation result"""
+    slos = []
+    if result.ttft_slo_ms is not None:
+        slos.append(f"TTFT <= {result.ttft_slo_ms:g} ms")
+    if result.tpot_slo_ms is not None:
+        slos.append(f"TPOT <= {result.tpot_slo_ms:g} ms")
+    lines = [
+        "\n" + "=" * 96,
+        "PREFILL/DECODE DISAGGREGATION",
+        "=" * 96,
+        f"Requests: {result.prompt_len} prompt + {result.output_len} output tokens"
+        + (f" ({', '.join(slos)})" if slos else ""),
+        f"Prefill configurations: {result.prefill_feasible}/"
+        f"{result.prefill_candidates} feasible",
+        f"Decode configurations: {result.decode_feasible}/"
+        f"{result.decode_candidates} feasible",
+        f"Combinations scored: {result.combinations}",
+        f"Total time: {result.total_time_seconds:.2f}s",
+    ]
+    if not result.deployments:
+        lines.append("\nNo deployment meets the SLOs")
+        return "\n".join(lines)
+
+    lines.append(
+        f"\n{'Rank':<5} {'Prefill (TP/DP/EP)':<19} {'Decode (TP/DP/EP/batch)':<24} "
+        f"{'P:D':>7} {'GPUs':>5} {'TTFT ms':>9} {'KV ms':>7} {'TPOT ms':>8} "
+        f"{'req/s/GPU':>10}"
+    )
+    for rank, deployment in enumerate(result.deployments, 1):
+        p = deployment.prefill_config
+        d = deployment.decode_config
+        ratio = f"{deployment.num_prefill}:{deployment.num_decode}"
+        lines.append(
+            f"{rank:<5} {f'{p.tp_size}/{p.dp_size}/{p.ep_size}':<19} "
+            f"{f'{d.tp_size}/{d.dp_size}/{d.ep_size}/{d.batch_size}':<24} "
+            f"{ratio:>7} {deployment.total_gpus:>5} {deployment.ttft_ms:>9.1f} "
+            f"{deployment.kv_transfer_ms:>7.2f} {deployment.tpot_ms:>8.2f} "
+            f"{deployment.goodput_per_gpu:>10.4f}"
+        )
+
+    best = result.get_best()
+    lines.append(
+        f"\nBest: {best.num_prefill} prefill x {best.prefill_gpus} GPUs + "
+        f"{best.num_decode} decode x {best.decode_gpus} GPUs = "
+        f"{best.total_gpus} GPUs serving {best.goodput_rps:.2f} requests/s "
+        f"({best.goodput_per_gpu:.4f} requests/s per GPU)"
+    )
+    return "\n".join(lines)
+
+
+def save_disaggregation(result: DisaggregationResult, output_path: str):
+    """Save a disaggregation result to a JSON file"""
+
+    def instance(config: ScheduleConfig) -> dict:
+        return {
+            "tp_size": config.tp_size,
+            "dp_size": config.dp_size,
+            "ep_size": config.ep_size,
+            "batch_size": config.batch_size,
+            "max_seqlen": config.max_seqlen,
+            "mode": config.mode.name,
+        }
+
+    data = {
+        "workload": {
+            "prompt_len": result.prompt_len,
+            "output_len": result.output_len,
+            "ttft_slo_ms": result.ttft_slo_ms,
+            "tpot_slo_ms": result.tpot_slo_ms,
+        },
+        "deployments": [
+            {
+                "prefill_config": instance(deployment.prefill_config),
+                "decode_config": instance(deployment.decode_config),
+                "num_prefill": deployment.num_prefill,
+                "num_decode": deployment.num_decode,
+                "total_gpus": deployment.total_gpus,
+                "prefill_ms": deployment.prefill_ms,
+                "kv_transfer_ms": deployment.kv_transfer_ms,
+                "ttft_ms": deployment.ttft_ms,
+                "tpot_ms": deployment.tpot_ms,
+                "prefill_rps": deployment.prefill_rps,
+                "decode_rps": deployment.decode_rps,
+                "goodput_rps": deployment.goodput_rps,
+                "goodput_per_gpu": deployment.goodput_per_gpu,
+            }
+            for deployment in result.deployments
+        ],
+        "statistics": {
+            "prefill_candidates": result.prefill_candidates,
+            "prefill_feasible": result.prefill_feasible,
+            "decode_candidates": result.decode_candidates,
+            "decode_feasible": result.decode_feasible,
+            "combinations": result.combinations,
+            "total_time_seconds": result.total_time_seconds,
+        },
+    }
     with open(output_path, "w") as f:
         json.dump(data, f, indent=2)
 
     print(f"\nResults saved to: {output_path}")
 
 
-def main():
+def disaggregate_main(argv: List[str]):
+    """Entry point of the disaggregate command"""
+    parser = create_disaggregate_parser()
+    args = parser.parse_args(argv)
+
+    print(f"Loading model configuration from: {args.model_path}")
+    model_config = load_model_config(args.model_path)
+    print(f"Loading hardware configuration: {args.hardware}")
+    hardware_config = load_hardware_config(args.hardware)
+
+    # Auto-detect EP for MoE models
+    if model_config.is_moe():
+        default_ep_range = [1, 2, 4, 8, 16]
+    else:
+        default_ep_range = [1]
+    prefill_config = SearchSpaceConfig(
+        tp_size=args.prefill_tp_range,
+        dp_size=args.prefill_dp_range,
+        ep_size=args.prefill_ep_range or default_ep_range,
+        batch_size=[8],
+        mode="extend",
+    )
+    decode_config = SearchSpaceConfig(
+        tp_size=args.decode_tp_range,
+        dp_size=args.decode_dp_range,
+        ep_size=args.decode_ep_range or default_ep_range,
+        batch_size=args.decode_batch_range,
+        mode="decode",
+    )
+
+    service = OptimizationService()
+    try:
+        result = service.optimize_disaggregation(
+            model_config=model_config,
+            hardware_config=hardware_config,
+            prompt_len=args.prompt_len,
+            output_len=args.output_len,
+            ttft_slo_ms=args.ttft_slo_ms,
+            tpot_slo_ms=args.tpot_slo_ms,
+            prefill_search_space_config=prefill_config,
+            decode_search_space_config=decode_config,
+            max_instances=args.max_instances,
+            max_gpus=args.max_gpus,
+            gpu_memory_utilization=args.gpu_memory_utilization,
+            top_k=args.top_k,
+            parallel_workers=args.parallel_workers,
+            cache_path=args.cache_path,
+            cost_model_dir=args.cost_model_dir,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(format_disaggregation(result))
+
+    if args.output:
+        save_disaggregation(result, args.output)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main entry point"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["rescore"]:
+        rescore_main(argv[1:])
+        return
+    if argv[:1] == ["merge"]:
+        merge_main(argv[1:])
+        return
+    if argv[:1] == ["sensitivity"]:
+        sensitivity_main(argv[1:])
+        return
+    if argv[:1] == ["disaggregate"]:
+        disaggregate_main(argv[1:])
+        return
+
     parser = create_parser()
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    if args.resume and args.checkpoint_dir is None:
+        parser.error("--resume requires --checkpoint_dir")
+    if args.stable_top_k < 1:
+        parser.error("--stable_top_k must be at least 1")
+    if args.stable_top_k > 1 and args.patience is None:
+        parser.error("--stable_top_k requires --patience")
+    if args.shard is not None and args.work_queue is not None:
+        parser.error("--shard and --work_queue are mutually exclusive")
+    if args.shard is not None and args.results_path is None:
+        parser.error("--shard requires --results_path to store the shard's results")
+    if args.work_queue is not None and args.results_path is not None:
+        parser.error("--work_queue stores shard results itself, drop --results_path")
+    if args.max_seqlen is None:
+        if args.seqlen_range is None or args.recommend:
+            parser.error("--max_seqlen is required unless --seqlen_range is given")
+        # Only the fixed value of a sweep that searches max_seqlen: the longest one
+        args.max_seqlen = max(SearchSpaceConfig._normalize_to_list(args.seqlen_range))
 
     # Load configurations
     print(f"Loading model configuration from: {args.model_path}")
@@ -309,6 +1272,8 @@ def main():
             max_seqlen=args.max_seqlen,
             priority=args.recommend,
             world_size=args.world_size,
+            cache_path=args.cache_path,
+            cost_model_dir=args.cost_model_dir,
         )
 
         print("\n" + "=" * 60)
@@ -341,8 +1306,7 @@ def main():
         ep_range = args.ep_range
         if ep_range is None:
             # Auto-detect for MoE models
-            model_type = getattr(model_config, "model_type", "")
-            if "moe" in model_type.lower() or model_type == "deepseek_v3":
+            if model_config.is_moe():
                 ep_range = [1, 2, 4, 8, 16]
             else:
                 ep_range = [1]
@@ -354,7 +1318,11 @@ def main():
             batch_size=args.batch_range,
             mode=args.mode,
             world_size=args.world_size,
+            max_seqlen=args.seqlen_range,
         )
+        if args.search_flags:
+            for name in FLAG_NAMES:
+                setattr(search_config, name, [False, True])
 
         print("\nSearch space:")
         print(f"  TP: {search_config.get_tp_values()}")
@@ -362,27 +1330,54 @@ def main():
         print(f"  EP: {search_config.get_ep_values()}")
         print(f"  Batch: {search_config.get_batch_size_values()}")
         print(f"  Mode: {search_config.get_mode_values()}")
+        if args.seqlen_range is not None:
+            print(f"  Max seqlen: {search_config.get_seqlen_values()}")
+        for name, values in search_config.get_flag_values().items():
+            print(f"  {name}: {values}")
         print(f"  Total combinations: {search_config.get_search_space_size()}")
 
         print(f"\nRunning optimization with objective: {args.objective}")
 
-        # Run optimization
-        result = service.optimize(
+        optimize_args = dict(
             model_config=model_config,
             hardware_config=hardware_config,
             max_seqlen=args.max_seqlen,
             search_space_config=search_config,
             objective_type=args.objective,
             optimizer_type=args.optimizer,
+            parallel_workers=args.parallel_workers,
             max_evaluations=args.max_evaluations,
+            cache_path=args.cache_path,
+            cost_model_dir=args.cost_model_dir,
+            history_spill_dir=args.history_spill_dir,
+            checkpoint_dir=args.checkpoint_dir,
+            checkpoint_interval=args.checkpoint_interval,
+            resume=args.resume,
+            verbose=args.verbose,
+            progress_events_path=args.progress_events,
+            time_budget=args.time_budget,
+            patience=args.patience,
+            stable_top_k=args.stable_top_k,
+        )
+        if args.work_queue is not None:
+            run_work_queue(
+                service, ShardQueue(args.work_queue, args.num_shards), optimize_args
+            )
+            return
+
+        # Run optimization
+        result = service.optimize(
+            **optimize_args, results_path=args.results_path, shard=args.shard
         )
 
         # Display results
         print(format_result(result, verbose=args.verbose))
 
         # Save results if requested
+        if args.history_path:
+            save_history(result, args.history_path)
         if args.output:
-            save_result(result, args.output)
+            save_result(result, args.output, history_path=args.history_path)
 
 
 if __name__ == "__main__":
@@ -3,7 +3,10 @@ Search space configuration for optimization
 """
 
 from dataclasses import dataclass, field
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
+
+# ScheduleConfig feature flags that can be searched
+FLAG_NAMES = ("is_mtp", "deepep", "enable_moe_dense_fully_dp")
 
 
 @dataclass
@@ -11,8 +14,9 @@ class SearchSpaceConfig:
     """
     Search space configuration for parameter optimization
 
-    Note: max_seqlen is a fixed input parameter, not an optimization parameter.
-    It is used for constraint checking (e.g., max_seqlen % tp_size == 0).
+    Note: max_seqlen is normally a fixed input parameter, not an optimization
+    parameter. It is used for constraint checking (e.g., max_seqlen % tp_size == 0).
+    Setting max_seqlen here searches it instead, overriding the fixed value.
     """
 
     # Tensor Parallel size: single value, range (min, max), or list of values
@@ -35,6 +39,16 @@ class SearchSpaceConfig:
     # Fixed world size (total GPU count): if set, constrains tp_size * dp_size = world_size
     world_size: Optional[int] = None
 
+    # Feature flags: single value or list of values to search, or None to keep the
+    # ScheduleConfig default
+    is_mtp: Union[bool, List[bool], None] = None
+    deepep: Union[bool, List[bool], None] = None
+    enable_moe_dense_fully_dp: Union[bool, List[bool], None] = None
+
+    # Maximum sequence length: single value, range (min, max), list of values, or None
+    # to keep the fixed max_seqlen of the run
+    max_seqlen: Union[int, tuple, List[int], None] = None
+
     @staticmethod
     def from_dict(data: dict) -> "SearchSpaceConfig":
         """Create SearchSpaceConfig from a dictionary"""
@@ -52,6 +66,11 @@ class SearchSpaceConfig:
             config.mode = data["mode"]
         if "world_size" in data:
             config.world_size = data["world_size"]
+        for name in FLAG_NAMES:
+            if name in data:
+                setattr(config, name, data[name])
+        if "max_seqlen" in data:
+            config.max_seqlen = data["max_seqlen"]
 
         return config
 
@@ -73,12 +92,28 @@ class SearchSpaceConfig:
         """Get list of batch size values to search"""
         return self._normalize_to_list(self.batch_size)
 
+    def get_seqlen_values(self) -> List[int]:
+        """Get list of max_seqlen values to search (empty if it is fixed)"""
+        if self.max_seqlen is None:
+            return []
+        return self._normalize_to_list(self.max_seqlen)
+
     def get_mode_values(self) -> List[str]:
         """Get list of mode values to search"""
         if isinstance(self.mode, str):
             return [self.mode]
         return self.mode
 
+    def get_flag_values(self) -> Dict[str, List[bool]]:
+        """Get the values to search for each feature flag that is set"""
+        values = {}
+        for name in FLAG_NAMES:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            values[name] = [value] if isinstance(value, bool) else list(value)
+        return values
+
     @staticmethod
     def _normalize_to_list(value: Union[int, tuple, List[int]]) -> List[int]:
         """Normalize a value specification to a list of integers"""
@@ -101,21 +136,31 @@ class SearchSpaceConfig:
 
     def get_search_space_size(self) -> int:
         """Calculate the total size of the search space"""
-        return (
+        size = (
             len(self.get_tp_values())
             * len(self.get_dp_values())
             * len(self.get_ep_values())
             * len(self.get_batch_size_values())
             * len(self.get_mode_values())
         )
+        for values in self.get_flag_values().values():
+            size *= len(values)
+        return size * max(1, len(self.get_seqlen_values()))
 
     def to_dict(self) -> dict:
         """Convert to dictionary"""
-        return {
+        data = {
             "tp_size": self.tp_size,
             "dp_size": self.dp_size,
             "ep_size": self.ep_size,
             "batch_size": self.batch_size,
             "mode": self.mode,
             "world_size": self.world_size,
+            "is_mtp": self.is_mtp,
+            "deepep": self.deepep,
+            "enable_moe_dense_fully_dp": self.enable_moe_dense_fully_dp,
         }
+        # Only when searched, so the run keys of fixed-length sweeps are unchanged
+        if self.max_seqlen is not None:
+            data["max_seqlen"] = self.max_seqlen
+        return data
@@ -3,7 +3,10 @@ Constraint classes for parameter validation
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from types import SimpleNamespace
+from typing import Dict, List, Optional, Set
+
+import numpy as np
 
 from src.arch.config import ScheduleConfig
 
@@ -21,6 +24,45 @@ class Constraint(ABC):
         """Get a human-readable message explaining the violation"""
         pass
 
+    def get_attributes(self) -> Optional[Set[str]]:
+        """
+        Get the attribute names this constraint reads
+
+        Used by SearchSpace to check the constraint as soon as all of them are fixed.
+
+        Returns:
+            Set of attribute names, or None if the constraint needs the full config
+        """
+        return None
+
+    def mask(self, arrays: Dict[str, np.ndarray], **context) -> np.ndarray:
+        """
+        Check the constraint for a whole grid at once
+
+        The default implementation calls check() per point; subclasses override it
+        with array expressions.
+
+        Args:
+            arrays: Attribute name -> 1-D array, one entry per grid point
+            **context: Fixed values for attributes missing from arrays
+
+        Returns:
+            Boolean array, True where the constraint is satisfied
+        """
+        size = _grid_size(arrays)
+        names = list(arrays.keys())
+        rows = zip(*(arrays[name].tolist() for name in names))
+        return np.fromiter(
+            (
+                self.check(
+                    SimpleNamespace(**{**context, **dict(zip(names, row))}), **context
+                )
+                for row in rows
+            ),
+            dtype=bool,
+            count=size,
+        )
+
 
 class DivisibilityConstraint(Constraint):
     """Constraint that checks if one value is divisible by another"""
@@ -66,6 +108,21 @@ class DivisibilityConstraint(Constraint):
 
         return f"{self.dividend_attr} ({dividend}) must be divisible by {self.divisor_attr} ({divisor})"
 
+    def get_attributes(self) -> Optional[Set[str]]:
+        return {self.dividend_attr, self.divisor_attr}
+
+    def mask(self, arrays: Dict[str, np.ndarray], **context) -> np.ndarray:
+        size = _grid_size(arrays)
+        dividend = _lookup(arrays, context, self.dividend_attr)
+        divisor = _lookup(arrays, context, self.divisor_attr)
+        if dividend is None or divisor is None:
+            return np.ones(size, dtype=bool)
+
+        divisor = np.asarray(divisor)
+        safe_divisor = np.where(divisor == 0, 1, divisor)
+        result = (divisor != 0) & (np.asarray(dividend) % safe_divisor == 0)
+        return np.broadcast_to(result, (size,)).copy()
+
 
 class ProductConstraint(Constraint):
     """Constraint that checks if the product of factors equals a target value"""
@@ -128,6 +185,28 @@ class ProductConstraint(Constraint):
         factors_str = " * ".join(factor_values)
         return f"Product constraint violated: {factors_str} = {product}, expected {target_str}"
 
+    def get_attributes(self) -> Optional[Set[str]]:
+        attributes = set(self.factor_attrs)
+        if not self.target_attr.startswith("="):
+            attributes.add(self.target_attr)
+        return attributes
+
+    def mask(self, arrays: Dict[str, np.ndarray], **context) -> np.ndarray:
+        size = _grid_size(arrays)
+        product = np.ones(size, dtype=np.int64)
+        for attr in self.factor_attrs:
+            value = _lookup(arrays, context, attr)
+            product = product * (1 if value is None else np.asarray(value))
+
+        if self.target_attr.startswith("="):
+            target = int(self.target_attr[1:])
+        else:
+            target = _lookup(arrays, context, self.target_attr)
+        if target is None:
+            return np.ones(size, dtype=bool)
+
+        return np.broadcast_to(product == target, (size,)).copy()
+
 
 class LessThanOrEqualConstraint(Constraint):
     """Constraint that checks if one value is less than or equal to another"""
@@ -170,6 +249,18 @@ class LessThanOrEqualConstraint(Constraint):
 
         return f"{self.left_attr} ({left}) must be <= {self.right_attr} ({right})"
 
+    def get_attributes(self) -> Optional[Set[str]]:
+        return {self.left_attr, self.right_attr}
+
+    def mask(self, arrays: Dict[str, np.ndarray], **context) -> np.ndarray:
+        size = _grid_size(arrays)
+        left = _lookup(arrays, context, self.left_attr)
+        right = _lookup(arrays, context, self.right_attr)
+        if left is None or right is None:
+            return np.ones(size, dtype=bool)
+
+        return np.broadcast_to(np.asarray(left) <= right, (size,)).copy()
+
 
 class MemoryConstraint(Constraint):
     """Constraint that checks if model fits in GPU memory"""
@@ -198,6 +289,13 @@ class MemoryConstraint(Constraint):
         available = self.max_memory_gb * self.num_gpus * self.safety_factor
         return f"Model memory ({model_memory_gb} GB) exceeds available memory ({available:.1f} GB)"
 
+    def get_attributes(self) -> Optional[Set[str]]:
+        # Only reads the context, so it can be checked before any dimension is fixed
+        return set()
+
+    def mask(self, arrays: Dict[str, np.ndarray], **context) -> np.ndarray:
+        return np.full(_grid_size(arrays), self.check(None, **context), dtype=bool)
+
 
 class RangeConstraint(Constraint):
     """Constraint that checks if a value is within a range"""
@@ -242,3 +340,34 @@ class RangeConstraint(Constraint):
             return f"{self.attr} ({value}) must be >= {self.min_value}"
         else:
             return f"{self.attr} ({value}) must be <= {self.max_value}"
+
+    def get_attributes(self) -> Optional[Set[str]]:
+        return {self.attr}
+
+    def mask(self, arrays: Dict[str, np.ndarray], **context) -> np.ndarray:
+        size = _grid_size(arrays)
+        value = _lookup(arrays, context, self.attr)
+        result = np.ones(size, dtype=bool)
+        if value is None:
+            return result
+
+        value = np.asarray(value)
+        if self.min_value is not None:
+            result &= value >= self.min_value
+        if self.max_value is not None:
+            result &= value <= self.max_value
+        return result
+
+
+def _grid_size(arrays: Dict[str, np.ndarray]) -> int:
+    """Number of grid points described by a dict of equal-length arrays"""
+    for array in arrays.values():
+        return len(array)
+    return 1
+
+
+def _lookup(arrays: Dict[str, np.ndarray], context: dict, attr: str):
+    """Get an attribute's array, falling back to a fixed context value"""
+    if attr in arrays:
+        return arrays[attr]
+    return context.get(attr)
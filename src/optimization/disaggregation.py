@@ -0,0 +1,245 @@
+"""
+Prefill/decode disaggregation - joint choice of prefill and decode instances and their ratio
+"""
+
+import dataclasses
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from src.arch.config import ScheduleConfig
+from src.arch.model_type import ForwardMode
+from src.arch.models_arch.model_arch import create_model_arch
+from src.arch.perf.model_perf import ModelPerformance
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.results import DisaggregatedDeployment, DisaggregationResult
+from src.optimization.search_space import SearchSpace
+
+# Relative tolerance under which two goodputs per GPU are considered equal, so that
+# multiples of the same P:D ratio resolve to the smallest deployment unit
+_TIE_TOLERANCE = 1e-9
+
+
+def _get_kv_bytes_per_token(
+    evaluator: PerformanceEvaluator, config: ScheduleConfig
+) -> float:
+    """KV cache bytes of one token on one GPU of an instance"""
+    return create_model_arch(evaluator.model_config, config).get_kv_cache_per_gpu()
+
+
+def _evaluate_role(
+    evaluator: PerformanceEvaluator,
+    configs: List[ScheduleConfig],
+    parallel_workers: int,
+) -> List[Tuple[ScheduleConfig, ModelPerformance, float]]:
+    """Evaluate the configurations of one role, dropping failed evaluations"""
+    perfs = evaluator.evaluate_batch(configs, parallel_workers=parallel_workers)
+    return [
+        (config, perf, _get_kv_bytes_per_token(evaluator, config))
+        for config, perf in zip(configs, perfs)
+        if perf is not None
+    ]
+
+
+def run_disaggregation_search(
+    evaluator: PerformanceEvaluator,
+    prefill_search_space: SearchSpace,
+    decode_search_space: SearchSpace,
+    prompt_len: int,
+    output_len: int,
+    ttft_slo_ms: Optional[float] = None,
+    tpot_slo_ms: Optional[float] = None,
+    max_instances: int = 8,
+    max_gpus: Optional[int] = None,
+    gpu_memory_utilization: float = 0.9,
+    top_k: int = 10,
+    parallel_workers: int = 1,
+) -> DisaggregationResult:
+    """
+    Jointly choose the prefill instance, the decode instance and the P:D ratio
+
+    Every prefill configuration is evaluated once as an EXTEND pass over one prompt
+    per DP rank, and every decode configuration once as a DECODE step at the mean
+    context length (prompt plus half the output). Both go through the evaluator's
+    caches, so evaluations stored by earlier prefill or decode sweeps with the same
+    cache_path are reused. The joint search is then pure arithmetic on these
+    per-role figures over all (prefill, decode, P:D ratio) combinations.
+
+    A prefill instance ships the KV cache of each prompt to a decode instance over
+    RDMA, every GPU sending its shard on its own link. The transfer of one request
+    overlaps the forward pass of the next, so a prefill DP rank serves a request per
+    max(prefill, transfer) time, and the TTFT of a request is the prefill pass plus
+    the transfer (bounded by the slower of the sending and receiving GPU). A decode
+    DP rank keeps batch_size sequences in flight, one token per sequence per step.
+    A unit of x prefill and y decode instances serves the smaller of the two roles'
+    request rates; goodput per GPU is that rate over the unit's GPUs. The model is
+    steady-state: queueing is not simulated (see src.serving for that).
+
+    Args:
+        evaluator: Performance evaluator
+        prefill_search_space: Prefill instance configurations (mode is set to EXTEND
+            and max_seqlen to prompt_len)
+        decode_search_space: Decode instance configurations (mode is set to DECODE
+            and max_seqlen to the mean context length)
+        prompt_len: Prompt length of a request
+        output_len: Output length of a request
+        ttft_slo_ms: TTFT objective including the KV cache transfer (None for no limit)
+        tpot_slo_ms: TPOT objective (None for no limit)
+        max_instances: Largest number of instances of each role in a unit
+        max_gpus: Largest number of GPUs in a unit (None for no limit)
+        gpu_memory_utilization: Fraction of HBM usable for weights and KV cache
+        top_k: Number of (prefill, decode) configuration pairs kept
+        parallel_workers: Number of parallel evaluation workers
+
+    Returns:
+        Disaggregation result with the best deployment of each of the top_k pairs
+
+    Raises:
+        ValueError: If the lengths or bounds are invalid
+    """
+    if prompt_len < 1 or output_len < 1:
+        raise ValueError(
+            f"Prompt and output lengths must be positive: {prompt_len}, {output_len}"
+        )
+    if max_instances < 1:
+        raise ValueError(f"max_instances must be positive: {max_instances}")
+    if not 0 < gpu_memory_utilization <= 1:
+        raise ValueError(
+            f"GPU memory utilization must be in (0, 1]: {gpu_memory_utilization}"
+        )
+
+    start_time = time.time()
+    hardware_config = evaluator.hardware_config
+    usable_bytes = hardware_config.memory.hbm_size_gb * gpu_memory_utilization * 1024**3
+    # GB/s as in the transfer operators (1e9 bytes), so bytes / bandwidth / 1e6 is ms
+    bandwidth_gb_s = hardware_config.bandwidth.rdma_bandwidth_gb_s
+    context_len = prompt_len + output_len // 2
+    # The first output token comes from the prefill instance
+    decode_steps = max(output_len - 1, 1)
+
+    prefill_configs = [
+        dataclasses.replace(config, mode=ForwardMode.EXTEND, max_seqlen=prompt_len)
+        for config in prefill_search_space.iterate_all()
+    ]
+    decode_configs = [
+        dataclasses.replace(config, mode=ForwardMode.DECODE, max_seqlen=context_len)
+        for config in decode_search_space.iterate_all()
+    ]
+    result = DisaggregationResult(
+        prompt_len=prompt_len,
+        output_len=output_len,
+        ttft_slo_ms=ttft_slo_ms,
+        tpot_slo_ms=tpot_slo_ms,
+        prefill_candidates=len(prefill_configs),
+        decode_candidates=len(decode_configs),
+    )
+    print(
+        f"Evaluating {len(prefill_configs)} prefill and {len(decode_configs)} "
+        "decode configurations..."
+    )
+
+    # Prefill instances fitting one prompt's KV cache, with a pass meeting the TTFT
+    # SLO on its own
+    prefill = []
+    for config, perf, kv_bytes in _evaluate_role(
+        evaluator, prefill_configs, parallel_workers
+    ):
+        prefill_ms = perf.get_ttft_or_tpot()
+        send_ms = prompt_len * kv_bytes / bandwidth_gb_s / 1e6
+        if perf.model_total_mem_occupy + prompt_len * kv_bytes > usable_bytes:
+            continue
+        if ttft_slo_ms is not None and prefill_ms + send_ms > ttft_slo_ms:
+            continue
+        rps = config.dp_size * 1000.0 / max(prefill_ms, send_ms)
+        prefill.append((config, prefill_ms, send_ms, rps))
+
+    # Decode instances holding the KV cache of a full batch of finished requests,
+    # with a step meeting the TPOT SLO
+    decode = []
+    for config, perf, kv_bytes in _evaluate_role(
+        evaluator, decode_configs, parallel_workers
+    ):
+        tpot_ms = perf.get_ttft_or_tpot()
+        kv_total = config.batch_size * (prompt_len + output_len) * kv_bytes
+        if perf.model_total_mem_occupy + kv_total > usable_bytes:
+            continue
+        if tpot_slo_ms is not None and tpot_ms > tpot_slo_ms:
+            continue
+        receive_ms = prompt_len * kv_bytes / bandwidth_gb_s / 1e6
+        rps = config.dp_size * config.batch_size * 1000.0 / (tpot_ms * decode_steps)
+        decode.append((config, tpot_ms, receive_ms, rps))
+
+    result.prefill_feasible = len(prefill)
+    result.decode_feasible = len(decode)
+    if not prefill or not decode:
+        result.total_time_seconds = time.time() - start_time
+        return result
+
+    decode_gpus = np.array([c.tp_size * c.dp_size for c, _, _, _ in decode], float)
+    decode_receive_ms = np.array([receive_ms for _, _, receive_ms, _ in decode])
+    decode_rps = np.array([rps for _, _, _, rps in decode])
+    # Instance counts of the two roles, as (x, 1) and (1, y) grids
+    counts = np.arange(1, max_instances + 1, dtype=float)
+    num_prefill = counts[:, None]
+    num_decode = counts[None, :]
+    result.combinations = len(prefill) * len(decode) * max_instances**2
+
+    # Best P:D ratio of every (prefill, decode) pair: goodput per GPU, index of the
+    # ratio in the flattened (x, y) grid and GPUs of the unit
+    best_per_gpu = np.full((len(prefill), len(decode)), -np.inf)
+    best_ratio = np.zeros((len(prefill), len(decode)), dtype=np.int64)
+    best_gpus = np.zeros((len(prefill), len(decode)))
+    for i, (config, prefill_ms, send_ms, rps) in enumerate(prefill):
+        gpus = config.tp_size * config.dp_size
+        # (decode, x, y) grids
+        goodput = np.minimum(num_prefill * rps, num_decode * decode_rps[:, None, None])
+        unit_gpus = num_prefill * gpus + num_decode * decode_gpus[:, None, None]
+        per_gpu = goodput / unit_gpus
+        if max_gpus is not None:
+            per_gpu = np.where(unit_gpus <= max_gpus, per_gpu, -np.inf)
+        if ttft_slo_ms is not None:
+            ttft_ms = prefill_ms + np.maximum(send_ms, decode_receive_ms)
+            per_gpu[ttft_ms > ttft_slo_ms] = -np.inf
+        per_gpu = per_gpu.reshape(len(decode), -1)
+        unit_gpus = unit_gpus.reshape(len(decode), -1)
+        best = per_gpu.max(axis=1)
+        # Fewest GPUs among the ratios tying the best goodput per GPU
+        tied = per_gpu >= best[:, None] * (1 - _TIE_TOLERANCE)
+        best_per_gpu[i] = best
+        best_ratio[i] = np.argmin(np.where(tied, unit_gpus, np.inf), axis=1)
+        best_gpus[i] = np.take_along_axis(unit_gpus, best_ratio[i][:, None], 1)[:, 0]
+
+    pairs = np.flatnonzero(np.isfinite(best_per_gpu))
+    if len(pairs):
+        per_gpu = best_per_gpu.ravel()[pairs]
+        # Highest goodput per GPU (equal to 9 digits), then the smallest unit;
+        # lexsort is stable, so equal pairs keep the search space order
+        rank = np.round(per_gpu / per_gpu.max(), 9)
+        pairs = pairs[np.lexsort((best_gpus.ravel()[pairs], -rank))][:top_k]
+    for pair in pairs:
+        i, j = np.unravel_index(pair, best_per_gpu.shape)
+        x, y = np.unravel_index(best_ratio[i, j], (max_instances, max_instances))
+        prefill_config, prefill_ms, send_ms, prefill_rps = prefill[i]
+        decode_config, tpot_ms, receive_ms, rps = decode[j]
+        transfer_ms = max(send_ms, receive_ms)
+        result.deployments.append(
+            DisaggregatedDeployment(
+                prefill_config=prefill_config,
+                decode_config=decode_config,
+                num_prefill=int(x) + 1,
+                num_decode=int(y) + 1,
+                prefill_gpus=prefill_config.tp_size * prefill_config.dp_size,
+                decode_gpus=decode_config.tp_size * decode_config.dp_size,
+                prefill_ms=prefill_ms,
+                kv_transfer_ms=transfer_ms,
+                ttft_ms=prefill_ms + transfer_ms,
+                tpot_ms=tpot_ms,
+                prefill_rps=prefill_rps,
+                decode_rps=rps,
+                goodput_rps=float(min((x + 1) * prefill_rps, (y + 1) * rps)),
+            )
+        )
+
+    result.total_time_seconds = time.time() - start_time
+    return result
@@ -0,0 +1,161 @@
+"""
+Persistent evaluation cache - SQLite-backed store shared across runs and processes
+"""
+
+import hashlib
+import os
+import pickle
+import sqlite3
+from typing import Dict, Iterable, List, Optional
+
+from src.arch.perf.model_perf import ModelPerformance
+
+# Bump when the cost model changes so that stale entries are no longer hit
+CACHE_VERSION = 1
+
+# Number of buffered writes before they are flushed in one transaction
+_FLUSH_THRESHOLD = 256
+
+
+class EvaluationCache:
+    """
+    On-disk cache of ModelPerformance results
+
+    Entries are keyed by a content hash of the model config, hardware config and the
+    full ScheduleConfig, and store aggregate-only summaries (see ModelPerformance.summary).
+    The database runs in WAL mode with a busy timeout, so several processes can read
+    and write the same file concurrently. Each process opens its own connection.
+    """
+
+    def __init__(self, path: str, timeout: float = 30.0):
+        """
+        Args:
+            path: SQLite database file path (created if missing)
+            timeout: Seconds to wait for a lock held by another writer
+        """
+        self.path = path
+        self.timeout = timeout
+        self.hits = 0
+        self.misses = 0
+        self._pending: Dict[str, bytes] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid: Optional[int] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        """Get this process's connection (connections must not cross a fork)"""
+        if self._connection is None or self._pid != os.getpid():
+            directory = os.path.dirname(os.path.abspath(self.path))
+            os.makedirs(directory, exist_ok=True)
+            connection = sqlite3.connect(self.path, timeout=self.timeout)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS evaluations "
+                "(key TEXT PRIMARY KEY, perf BLOB NOT NULL)"
+            )
+            connection.commit()
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key: str) -> Optional[ModelPerformance]:
+        """Look up one entry, returning None on a miss"""
+        return self.get_many([key]).get(key)
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, ModelPerformance]:
+        """
+        Look up several entries at once
+
+        Args:
+            keys: Cache keys
+
+        Returns:
+            Dictionary of key -> ModelPerformance for the keys that were found
+        """
+        keys = list(dict.fromkeys(keys))
+        found: Dict[str, ModelPerformance] = {}
+        for key in keys:
+            if key in self._pending:
+                found[key] = pickle.loads(self._pending[key])
+
+        remaining = [key for key in keys if key not in found]
+        connection = self._connect()
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(remaining), 500):
+            batch = remaining[start : start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = connection.execute(
+                f"SELECT key, perf FROM evaluations WHERE key IN ({placeholders})",
+                batch,
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = pickle.loads(blob)
+
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put(self, key: str, perf: ModelPerformance) -> None:
+        """Store an entry (buffered until flush)"""
+        self._pending[key] = pickle.dumps(
+            perf.summary(), protocol=pickle.HIGHEST_PROTOCOL
+        )
+        if len(self._pending) >= _FLUSH_THRESHOLD:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write buffered entries in a single transaction"""
+        if not self._pending:
+            return
+        connection = self._connect()
+        with connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO evaluations (key, perf) VALUES (?, ?)",
+                list(self._pending.items()),
+            )
+        self._pending.clear()
+
+    def __len__(self) -> int:
+        self.flush()
+        return self._connect().execute("SELECT COUNT(*) FROM evaluations").fetchone()[0]
+
+    def clear(self) -> None:
+        """Remove all entries"""
+        self._pending.clear()
+        connection = self._connect()
+        with connection:
+            connection.execute("DELETE FROM evaluations")
+
+    def close(self) -> None:
+        """Flush buffered entries and close the connection"""
+        self.flush()
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def get_stats(self) -> dict:
+        """Get hit/miss statistics of this process"""
+        lookups = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __getstate__(self) -> dict:
+        # Connections and buffered writes stay with the owning process
+        state = self.__dict__.copy()
+        state["_connection"] = None
+        state["_pid"] = None
+        state["_pending"] = {}
+        return state
+
+
+def make_cache_keys(namespace: str, schedule_keys: List[str]) -> List[str]:
+    """Combine a model/hardware namespace hash with per-schedule keys"""
+    return [
+        hashlib.sha256(f"{namespace}:{key}".encode("utf-8")).hexdigest()
+        for key in schedule_keys
+    ]
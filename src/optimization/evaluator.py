@@ -2,13 +2,19 @@
 Performance evaluator - bridges optimizer with performance calculator
 """
 
-from typing import List, Optional
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+from typing import Dict, List, Optional, Sequence
 
-from src.arch.config import ModelConfig, ScheduleConfig
+import numpy as np
+
+from src.arch.config import ModelConfig, ScheduleConfig, content_hash
 from src.arch.models_arch.model_arch import create_model_arch
+from src.arch.perf.batch_perf import GRID_COLUMNS, BatchPerformance
+from src.arch.perf.cost_model import CostModel
 from src.arch.perf.model_perf import ModelPerformance
-from src.arch.perf_calculator import PerformanceCalculator
 from src.hardware.hardware_config import HardwareConfig
+from src.optimization.eval_cache import CACHE_VERSION, EvaluationCache, make_cache_keys
 
 
 class PerformanceEvaluator:
@@ -23,6 +29,9 @@ class PerformanceEvaluator:
         self,
         model_config: ModelConfig,
         hardware_config: HardwareConfig,
+        cache_path: Optional[str] = None,
+        cost_model_dir: Optional[str] = None,
+        verbose: bool = False,
     ):
         """
         Initialize evaluator
@@ -30,11 +39,37 @@ class PerformanceEvaluator:
         Args:
             model_config: Model configuration (fixed)
             hardware_config: Hardware configuration (fixed)
+            cache_path: SQLite file for a persistent cache shared across runs and
+                processes (None to cache in memory only)
+            cost_model_dir: Directory storing the compiled cost model, so that later
+                runs skip tracing the operator graph (None to keep it in memory)
+            verbose: Print a warning for every failed evaluation
         """
         self.model_config = model_config
         self.hardware_config = hardware_config
-        self.calculator = PerformanceCalculator(hardware_config)
-        self._cache: dict = {}  # Simple cache for performance results
+        # Batch engine: operator graphs traced once per structural shape and compiled
+        self.cost_model = CostModel(
+            model_config, hardware_config, cache_dir=cost_model_dir
+        )
+        self.cost_model_dir = cost_model_dir
+        self._cache: dict = {}  # Full results (with the layer breakdown)
+        # Aggregate-only results (see ModelPerformance.summary) from the worker pool and
+        # the persistent cache; they answer evaluate_batch but not evaluate
+        self._summaries: Dict[str, ModelPerformance] = {}
+        self.persistent_cache = (
+            EvaluationCache(cache_path) if cache_path is not None else None
+        )
+        # Persistent keys are namespaced by the model and hardware content
+        self._cache_namespace = content_hash(
+            CACHE_VERSION, model_config, hardware_config
+        )
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_workers: int = 0
+        self.verbose = verbose
+        # Lookups answered by either cache / computed, and failed computations
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.failures = 0
 
     def _get_cache_key(self, schedule_config: ScheduleConfig) -> str:
         """Generate cache key for a configuration"""
@@ -44,13 +79,47 @@ class PerformanceEvaluator:
             f"ep{schedule_config.ep_size}_"
             f"bs{schedule_config.batch_size}_"
             f"seq{schedule_config.max_seqlen}_"
-            f"mode{schedule_config.mode.name}"
+            f"mode{schedule_config.mode.name}_"
+            f"mtp{int(schedule_config.is_mtp)}_"
+            f"deepep{int(schedule_config.deepep)}_"
+            f"fdp{int(schedule_config.enable_moe_dense_fully_dp)}_"
+            f"nodes{schedule_config.num_nodes}_"
+            f"ws{schedule_config.world_size}"
         )
 
+    def _lookup_persistent(
+        self, cache_keys: List[str]
+    ) -> List[Optional[ModelPerformance]]:
+        """Look up keys in the persistent cache, promoting hits to the summaries"""
+        if self.persistent_cache is None or not cache_keys:
+            return [None] * len(cache_keys)
+        persistent_keys = make_cache_keys(self._cache_namespace, cache_keys)
+        found = self.persistent_cache.get_many(persistent_keys)
+        perfs = []
+        for cache_key, persistent_key in zip(cache_keys, persistent_keys):
+            perf = found.get(persistent_key)
+            if perf is not None:
+                self._summaries[cache_key] = perf
+            perfs.append(perf)
+        return perfs
+
+    def _store(self, cache_key: str, perf: ModelPerformance) -> None:
+        """Store a freshly computed result in the memory and persistent caches"""
+        self._cache[cache_key] = perf
+        if self.persistent_cache is not None:
+            (persistent_key,) = make_cache_keys(self._cache_namespace, [cache_key])
+            self.persistent_cache.put(persistent_key, perf)
+
     def evaluate(self, schedule_config: ScheduleConfig) -> Optional[ModelPerformance]:
         """
         Evaluate performance for a schedule configuration
 
+        The result always holds the per-layer breakdown. Summaries cached by
+        evaluate_batch or the persistent cache lack it, so they are not used here.
+        The operators come from the cost model's templates of the configuration's
+        structural shape (tp, ep, mode and flags), shared with evaluate_batch, so
+        configurations differing only in batch size, sequence length or dp reuse them.
+
         Args:
             schedule_config: Schedule configuration to evaluate
 
@@ -61,48 +130,264 @@ class PerformanceEvaluator:
 
         # Check cache
         if cache_key in self._cache:
+            self.cache_hits += 1
             return self._cache[cache_key]
 
+        self.cache_misses += 1
+        return self._compute(cache_key, schedule_config)
+
+    def _compute(
+        self, cache_key: str, schedule_config: ScheduleConfig
+    ) -> Optional[ModelPerformance]:
+        """Evaluate a configuration that missed both caches"""
         try:
-            # Create model architecture
-            model_arch = create_model_arch(
-                model_config=self.model_config, schedule_config=schedule_config
-            )
+            # Instantiate the operator templates of the configuration's structural
+            # shape, traced once by the cost model, instead of building its graph
+            perf = self.cost_model.evaluate(schedule_config)
+        except Exception as e:
+            # Count (and optionally log) the error and return None to indicate
+            # failure. This allows optimizer to handle gracefully
+            self.failures += 1
+            if self.verbose:
+                print(f"Warning: Evaluation failed for config {cache_key}: {e}")
+            return None
 
-            # Calculate performance
-            perf = self.calculator.calculate_model_performance(model_arch)
+        if perf is None:
+            self.failures += 1
+            if self.verbose:
+                print(
+                    f"Warning: Evaluation failed for config {cache_key}: "
+                    "invalid shapes for the model"
+                )
+            return None
 
-            # Cache result
-            self._cache[cache_key] = perf
+        # Cache result
+        self._store(cache_key, perf)
+        return perf
 
-            return perf
+    def get_ttft_lower_bounds(self, arrays: Dict[str, np.ndarray]) -> np.ndarray:
+        """
+        Cheap lower bounds on the TTFT/TPOT of configurations (see get_ttft_or_tpot)
 
-        except Exception as e:
-            # Log error and return None to indicate failure
-            # This allows optimizer to handle gracefully
-            print(f"Warning: Evaluation failed for config {cache_key}: {e}")
-            return None
+        Args:
+            arrays: Configurations as column arrays (see SearchSpace.get_grid_arrays)
+
+        Returns:
+            Lower bound in milliseconds per configuration (NaN where the configuration
+            cannot be built)
+        """
+        bounds = self.cost_model.calculate_ttft_lower_bounds(
+            self.model_config,
+            **{name: column for name, column in arrays.items() if name in GRID_COLUMNS},
+        )
+        # Same framework overhead factor as ModelPerformance.get_ttft_or_tpot
+        return bounds * 1.02
 
     def evaluate_batch(
-        self, schedule_configs: List[ScheduleConfig], parallel_workers: int = 1
+        self,
+        schedule_configs: List[ScheduleConfig],
+        parallel_workers: int = 1,
+        arrays: Optional[Dict[str, np.ndarray]] = None,
     ) -> List[Optional[ModelPerformance]]:
         """
         Evaluate multiple configurations
 
+        Configurations missing from the caches are evaluated together by the compiled
+        cost model (see evaluate_vectorized), which traces one operator graph per
+        structural shape and reuses it across calls. With parallel_workers > 1,
+        the engine runs on chunks in a process pool. Results are returned in input
+        order, so parallel runs are reproducible. Results of the batch engine and the
+        persistent cache are aggregate-only summaries (see ModelPerformance.summary);
+        evaluate() returns the full breakdown.
+
         Args:
             schedule_configs: List of schedule configurations
-            parallel_workers: Number of parallel workers (currently unused)
+            parallel_workers: Number of worker processes
+            arrays: The same configurations as column arrays (see
+                SearchSpace.get_grid_arrays), so that misses go to evaluate_grid
+                without converting the configurations back to columns
 
         Returns:
             List of ModelPerformance (or None for failed evaluations)
         """
-        # Currently sequential; could be parallelized in the future
-        results = []
-        for config in schedule_configs:
-            perf = self.evaluate(config)
-            results.append(perf)
+        results: List[Optional[ModelPerformance]] = [None] * len(schedule_configs)
+        cache_keys = [self._get_cache_key(config) for config in schedule_configs]
+        missing = []
+        for index, cache_key in enumerate(cache_keys):
+            perf = self._cache.get(cache_key) or self._summaries.get(cache_key)
+            if perf is not None:
+                results[index] = perf
+            else:
+                missing.append(index)
+
+        # One query for all memory misses instead of one per configuration
+        pending = []
+        found = self._lookup_persistent([cache_keys[index] for index in missing])
+        for index, perf in zip(missing, found):
+            if perf is not None:
+                results[index] = perf
+            else:
+                pending.append(index)
+        self.cache_hits += len(schedule_configs) - len(pending)
+        self.cache_misses += len(pending)
+        if not pending:
+            return results
+
+        configs = [schedule_configs[index] for index in pending]
+        try:
+            if arrays is not None:
+                # Columns the batch engine ignores do not affect performance
+                batch = self.evaluate_grid(
+                    {
+                        name: column[pending]
+                        for name, column in arrays.items()
+                        if name in GRID_COLUMNS
+                    },
+                    parallel_workers=parallel_workers,
+                    breakdown=False,
+                )
+            else:
+                batch = self.evaluate_vectorized(
+                    configs, parallel_workers=parallel_workers, breakdown=False
+                )
+            perfs = batch.summaries(configs)
+        except Exception as e:
+            # Fall back to the scalar path, which isolates the failing configurations
+            print(f"Warning: Batch evaluation failed, evaluating one by one: {e}")
+            for index in pending:
+                results[index] = self._compute(
+                    cache_keys[index], schedule_configs[index]
+                )
+            return results
+
+        computed = []
+        for index, perf in zip(pending, perfs):
+            results[index] = perf
+            if perf is not None:
+                self._summaries[cache_keys[index]] = perf
+                computed.append(index)
+                continue
+            self.failures += 1
+            if self.verbose:
+                print(
+                    f"Warning: Evaluation failed for config {cache_keys[index]}: "
+                    "invalid shapes for the model"
+                )
+        if self.persistent_cache is not None:
+            persistent_keys = make_cache_keys(
+                self._cache_namespace, [cache_keys[index] for index in computed]
+            )
+            for index, persistent_key in zip(computed, persistent_keys):
+                self.persistent_cache.put(persistent_key, results[index])
+
         return results
 
+    def evaluate_vectorized(
+        self,
+        schedule_configs: List[ScheduleConfig],
+        parallel_workers: int = 1,
+        breakdown: bool = True,
+    ) -> BatchPerformance:
+        """
+        Evaluate multiple configurations in one vectorized pass
+
+        Produces the same numbers as evaluate(), but computes them as NumPy array
+        expressions instead of building one model architecture per configuration.
+        With parallel_workers > 1, contiguous chunks are evaluated in the process pool
+        (tracing the operator graphs is Python work that holds the GIL). Every worker
+        keeps its own cost model and stores its traces in cost_model_dir on exit.
+
+        Args:
+            schedule_configs: List of schedule configurations
+            parallel_workers: Number of worker processes
+            breakdown: Fill in the per-operator columns
+
+        Returns:
+            BatchPerformance with one entry per configuration (invalid entries are NaN)
+        """
+        if parallel_workers <= 1 or len(schedule_configs) <= 1:
+            return self.cost_model.evaluate_configs(
+                schedule_configs, breakdown=breakdown
+            )
+
+        chunks = _split_chunks(schedule_configs, parallel_workers)
+        executor = self._get_executor(parallel_workers)
+        parts = executor.map(
+            _evaluate_configs_in_worker, chunks, [breakdown] * len(chunks)
+        )
+        return BatchPerformance.concatenate(list(parts))
+
+    def evaluate_grid(
+        self,
+        arrays: Dict[str, np.ndarray],
+        parallel_workers: int = 1,
+        breakdown: bool = True,
+    ) -> BatchPerformance:
+        """
+        Evaluate a grid given as column arrays (see SearchSpace.get_grid_arrays)
+
+        Like evaluate_vectorized, but skips building ScheduleConfig objects.
+
+        Args:
+            arrays: ScheduleConfig field name -> 1-D array of equal length
+            parallel_workers: Number of worker processes
+            breakdown: Fill in the per-operator columns
+
+        Returns:
+            BatchPerformance with one entry per grid point (invalid entries are NaN)
+        """
+        unsupported = sorted(set(arrays) - set(GRID_COLUMNS))
+        if unsupported:
+            raise ValueError(
+                f"Columns not supported by the batch evaluator: {unsupported}"
+            )
+
+        size = len(next(iter(arrays.values()))) if arrays else 0
+        if parallel_workers <= 1 or size <= 1:
+            return self.cost_model.evaluate_grid(breakdown=breakdown, **arrays)
+
+        chunks = [
+            {name: array[chunk[0] : chunk[-1] + 1] for name, array in arrays.items()}
+            for chunk in _split_chunks(range(size), parallel_workers)
+        ]
+        executor = self._get_executor(parallel_workers)
+        parts = executor.map(
+            _evaluate_grid_in_worker, chunks, [breakdown] * len(chunks)
+        )
+        return BatchPerformance.concatenate(list(parts))
+
+    def _get_executor(self, parallel_workers: int) -> ProcessPoolExecutor:
+        """Get the process pool, (re)creating it for a new worker count"""
+        if self._executor is None or self._executor_workers != parallel_workers:
+            self.close()
+            self._executor = ProcessPoolExecutor(
+                max_workers=parallel_workers,
+                initializer=_init_worker,
+                initargs=(
+                    self.model_config,
+                    self.hardware_config,
+                    self.cost_model_dir,
+                ),
+            )
+            self._executor_workers = parallel_workers
+        return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool (if any) and flush the persistent caches"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+            self._executor_workers = 0
+        self.cost_model.save()
+        if self.persistent_cache is not None:
+            self.persistent_cache.close()
+
+    def __enter__(self) -> "PerformanceEvaluator":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
     def get_model_memory_estimate(self, schedule_config: ScheduleConfig) -> float:
         """
         Estimate model memory usage in GB
@@ -136,9 +421,66 @@ class PerformanceEvaluator:
             return float("inf")
 
     def clear_cache(self) -> None:
-        """Clear the evaluation cache"""
+        """Clear the in-memory evaluation caches (the persistent cache is kept)"""
         self._cache.clear()
+        self._summaries.clear()
 
     def get_cache_stats(self) -> dict:
         """Get cache statistics"""
-        return {"cache_size": len(self._cache), "cache_keys": list(self._cache.keys())}
+        stats = {"cache_size": len(self._cache), "cache_keys": list(self._cache.keys())}
+        stats["summary_cache_size"] = len(self._summaries)
+        stats["hits"] = self.cache_hits
+        stats["misses"] = self.cache_misses
+        stats["failures"] = self.failures
+        if self.persistent_cache is not None:
+            stats["persistent"] = self.persistent_cache.get_stats()
+        return stats
+
+
+# Evaluator owned by a pool worker process, created once by _init_worker
+_worker_evaluator: Optional[PerformanceEvaluator] = None
+
+
+def _init_worker(
+    model_config: ModelConfig,
+    hardware_config: HardwareConfig,
+    cost_model_dir: Optional[str],
+) -> None:
+    """Process pool initializer: receives the fixed configs once per worker"""
+    global _worker_evaluator
+    _worker_evaluator = PerformanceEvaluator(
+        model_config=model_config,
+        hardware_config=hardware_config,
+        cost_model_dir=cost_model_dir,
+    )
+    # Pool workers exit without close(), so store their traces on process exit
+    Finalize(_worker_evaluator, _worker_evaluator.cost_model.save, exitpriority=10)
+
+
+def _evaluate_configs_in_worker(
+    schedule_configs: List[ScheduleConfig], breakdown: bool
+) -> BatchPerformance:
+    """Evaluate a chunk of configurations with the batch engine inside a pool worker"""
+    return _worker_evaluator.cost_model.evaluate_configs(
+        schedule_configs, breakdown=breakdown
+    )
+
+
+def _evaluate_grid_in_worker(
+    arrays: Dict[str, np.ndarray], breakdown: bool
+) -> BatchPerformance:
+    """Evaluate a slice of a grid with the batch engine inside a pool worker"""
+    return _worker_evaluator.cost_model.evaluate_grid(breakdown=breakdown, **arrays)
+
+
+def _split_chunks(items: Sequence, num_chunks: int) -> List[list]:
+    """Split items into at most num_chunks contiguous, non-empty chunks"""
+    num_chunks = max(1, min(num_chunks, len(items)))
+    size, remainder = divmod(len(items), num_chunks)
+    chunks = []
+    start = 0
+    for i in range(num_chunks):
+        end = start + size + (1 if i < remainder else 0)
+        chunks.append(list(items[start:end]))
+        start = end
+    return [chunk for chunk in chunks if chunk]
@@ -0,0 +1,330 @@
+"""
+Columnar optimization history - NumPy-backed storage of optimization steps
+"""
+
+import os
+from dataclasses import fields
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+
+from src.arch.config import ScheduleConfig
+from src.arch.model_type import ForwardMode
+from src.optimization.results import OptimizationStep
+
+# ScheduleConfig fields stored as columns, with their dtypes
+CONFIG_COLUMNS = {
+    field.name: (
+        np.int8
+        if field.name == "mode"
+        else np.bool_ if field.type in (bool, "bool") else np.int64
+    )
+    for field in fields(ScheduleConfig)
+}
+
+
+class ColumnarHistory:
+    """
+    Optimization history stored column-wise
+
+    Steps are buffered and converted to one NumPy array per column every chunk_size
+    appends: iteration, score, every ScheduleConfig field (mode as its integer
+    value) and every metric (float, NaN where a step lacks it). With spill_dir set,
+    finished chunks are written to .npz files instead of being kept in memory.
+
+    It behaves like a read-only list of OptimizationStep (len, iteration, indexing,
+    slicing), so it can replace the plain list in OptimizationResult; steps are
+    rebuilt on access. Best and top-k queries are vectorized over the score column.
+    """
+
+    def __init__(self, chunk_size: int = 4096, spill_dir: Optional[str] = None):
+        """
+        Args:
+            chunk_size: Steps buffered before they are converted to columns
+            spill_dir: Directory receiving finished chunks (None keeps them in memory)
+        """
+        self.chunk_size = chunk_size
+        self.spill_dir = spill_dir
+        self._metric_names: List[str] = []
+        self._chunks: List[Dict[str, np.ndarray]] = []
+        self._chunk_files: List[str] = []
+        self._chunk_lengths: List[int] = []
+        self._buffer: List[OptimizationStep] = []
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def append(self, step: OptimizationStep) -> None:
+        """Add a step (the most recent step stays a live object until the next append)"""
+        if len(self._buffer) >= self.chunk_size:
+            self._flush()
+        for name in step.metrics:
+            if name not in self._metric_names:
+                self._metric_names.append(name)
+        self._buffer.append(step)
+
+    def _flush(self) -> None:
+        """Convert the buffered steps to a chunk of columns"""
+        if not self._buffer:
+            return
+        columns = _steps_to_columns(self._buffer, self._metric_names)
+        if self.spill_dir is not None:
+            path = os.path.join(
+                self.spill_dir, f"history_{len(self._chunk_lengths):05d}.npz"
+            )
+            np.savez(path, **columns)
+            self._chunk_files.append(path)
+        else:
+            self._chunks.append(columns)
+        self._chunk_lengths.append(len(self._buffer))
+        self._buffer = []
+
+    def _iter_chunks(self) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield every chunk's columns, the buffer last"""
+        if self.spill_dir is not None:
+            for path in self._chunk_files:
+                with np.load(path) as data:
+                    yield {name: data[name] for name in data.files}
+        else:
+            yield from self._chunks
+        if self._buffer:
+            yield _steps_to_columns(self._buffer, self._metric_names)
+
+    def __len__(self) -> int:
+        return sum(self._chunk_lengths) + len(self._buffer)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __iter__(self) -> Iterator[OptimizationStep]:
+        for columns in self._iter_chunks():
+            yield from _columns_to_steps(columns, self._metric_names)
+
+    def __getitem__(
+        self, index: Union[int, slice]
+    ) -> Union[OptimizationStep, List[OptimizationStep]]:
+        if isinstance(index, slice):
+            return self.take(np.arange(len(self))[index])
+        length = len(self)
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history index out of range")
+        flushed = length - len(self._buffer)
+        if index >= flushed:
+            return self._buffer[index - flushed]
+        return self.take([index])[0]
+
+    def get_metric_names(self) -> List[str]:
+        """Get the metric names in order of first appearance"""
+        return list(self._metric_names)
+
+    def columns(self, names: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+        """
+        Get whole columns
+
+        Args:
+            names: Columns to load (default: all)
+
+        Returns:
+            Column name -> 1-D array over all steps
+        """
+        all_names = self._column_names()
+        names = all_names if names is None else list(names)
+        for name in names:
+            if name not in all_names:
+                raise KeyError(f"Unknown history column: {name}")
+
+        parts: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        for columns in self._iter_chunks():
+            size = len(columns["score"])
+            for name in names:
+                # Metrics first seen in a later chunk are missing from earlier ones
+                parts[name].append(columns.get(name, np.full(size, np.nan)))
+        return {
+            name: (
+                np.concatenate(arrays)
+                if arrays
+                else np.zeros(0, dtype=_column_dtype(name))
+            )
+            for name, arrays in parts.items()
+        }
+
+    def _column_names(self) -> List[str]:
+        return ["iteration", "score"] + list(CONFIG_COLUMNS) + self._metric_names
+
+    def get_scores(self) -> np.ndarray:
+        """Get the score column"""
+        return self.columns(["score"])["score"]
+
+    def take(self, indices: Sequence[int]) -> List[OptimizationStep]:
+        """Rebuild the steps at the given positions, in the given order"""
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return []
+        selected = {}
+        offset = 0
+        for columns in self._iter_chunks():
+            size = len(columns["score"])
+            local = indices[(indices >= offset) & (indices < offset + size)]
+            for index in local.tolist():
+                selected[index] = {
+                    name: column[index - offset : index - offset + 1]
+                    for name, column in columns.items()
+                }
+            offset += size
+        return [
+            _columns_to_steps(selected[index], self._metric_names)[0]
+            for index in indices.tolist()
+        ]
+
+    def best(self) -> Optional[OptimizationStep]:
+        """Get the step with the lowest score (the first one on ties)"""
+        scores = self.get_scores()
+        if len(scores) == 0:
+            return None
+        return self.take([int(np.argmin(scores))])[0]
+
+    def top_k(self, k: int) -> List[OptimizationStep]:
+        """Get the k steps with the lowest scores, best first (earliest on ties)"""
+        scores = self.get_scores()
+        k = min(k, len(scores))
+        if k <= 0:
+            return []
+        # Keep every step tied with the k-th score, then order stably
+        threshold = np.partition(scores, k - 1)[k - 1]
+        candidates = np.flatnonzero(scores <= threshold)
+        order = candidates[np.argsort(scores[candidates], kind="stable")][:k]
+        return self.take(order)
+
+    def to_dataframe(self):
+        """
+        Get the history as a pandas DataFrame (one row per step)
+
+        Returns:
+            pandas.DataFrame
+        """
+        try:
+            import pandas as pd
+        except ImportError:
+            raise ImportError(
+                "pandas library is required for DataFrame output. "
+                "Please run: pip install pandas"
+            )
+        return pd.DataFrame(self.columns())
+
+    def save(self, path: str) -> None:
+        """
+        Write all columns to a .npz file, or a .parquet file (requires pyarrow)
+
+        Args:
+            path: Output file path
+        """
+        columns = self.columns()
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(
+                    "pyarrow library is required for Parquet output. "
+                    "Please run: pip install pyarrow"
+                )
+            pq.write_table(pa.table(columns), path)
+        else:
+            np.savez(path, **columns)
+
+    @classmethod
+    def load(cls, path: str, chunk_size: int = 4096) -> "ColumnarHistory":
+        """
+        Read a history written by save()
+
+        Args:
+            path: .npz or .parquet file path
+            chunk_size: Chunk size of the returned history
+
+        Returns:
+            ColumnarHistory holding the file's steps as one chunk
+        """
+        if path.endswith(".parquet"):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise ImportError(
+                    "pyarrow library is required for Parquet input. "
+                    "Please run: pip install pyarrow"
+                )
+            table = pq.read_table(path)
+            columns = {
+                name: table.column(name).to_numpy() for name in table.column_names
+            }
+        else:
+            with np.load(path) as data:
+                columns = {name: data[name] for name in data.files}
+
+        history = cls(chunk_size=chunk_size)
+        fixed = {"iteration", "score"} | set(CONFIG_COLUMNS)
+        history._metric_names = [name for name in columns if name not in fixed]
+        if len(columns.get("score", ())):
+            history._chunks.append(columns)
+            history._chunk_lengths.append(len(columns["score"]))
+        return history
+
+
+def _column_dtype(name: str):
+    """Storage dtype of a column"""
+    if name == "iteration":
+        return np.int64
+    return CONFIG_COLUMNS.get(name, np.float64)
+
+
+def _steps_to_columns(
+    steps: List[OptimizationStep], metric_names: List[str]
+) -> Dict[str, np.ndarray]:
+    """Convert steps to columns"""
+    columns = {
+        "iteration": np.fromiter(
+            (step.iteration for step in steps), dtype=np.int64, count=len(steps)
+        ),
+        "score": np.fromiter(
+            (step.score for step in steps), dtype=np.float64, count=len(steps)
+        ),
+    }
+    for name, dtype in CONFIG_COLUMNS.items():
+        if name == "mode":
+            values = (step.config.mode.value for step in steps)
+        else:
+            values = (getattr(step.config, name) for step in steps)
+        columns[name] = np.fromiter(values, dtype=dtype, count=len(steps))
+    for name in metric_names:
+        columns[name] = np.fromiter(
+            (step.metrics.get(name, np.nan) for step in steps),
+            dtype=np.float64,
+            count=len(steps),
+        )
+    return columns
+
+
+def _columns_to_steps(
+    columns: Dict[str, np.ndarray], metric_names: List[str]
+) -> List[OptimizationStep]:
+    """Rebuild steps from columns"""
+    lists = {name: column.tolist() for name, column in columns.items()}
+    present = [name for name in metric_names if name in lists]
+    steps = []
+    for i in range(len(lists["score"])):
+        values = {name: lists[name][i] for name in CONFIG_COLUMNS}
+        values["mode"] = ForwardMode(values["mode"])
+        metrics = {}
+        for name in present:
+            value = lists[name][i]
+            if value == value:  # Skip NaN (metric missing for this step)
+                metrics[name] = value
+        steps.append(
+            OptimizationStep(
+                iteration=lists["iteration"][i],
+                config=ScheduleConfig(**values),
+                metrics=metrics,
+                score=lists["score"][i],
+            )
+        )
+    return steps
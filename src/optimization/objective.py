@@ -8,6 +8,8 @@ or multi-objective optimization.
 from abc import ABC, abstractmethod
 from typing import Dict, Optional
 
+from src.arch.config import ScheduleConfig
+from src.arch.model_type import ForwardMode
 from src.arch.perf.model_perf import ModelPerformance
 
 
@@ -50,6 +52,24 @@ class BaseObjective(ABC):
         """
         pass
 
+    def lower_bound(
+        self, schedule_config: ScheduleConfig, ttft_lower_bound: float
+    ) -> float:
+        """
+        Optimistic score of a configuration given a lower bound on its TTFT/TPOT
+
+        Used for branch-and-bound pruning: the returned value must never exceed the
+        score evaluate() would give. Objectives that cannot be bounded return -inf.
+
+        Args:
+            schedule_config: Configuration being bounded
+            ttft_lower_bound: Lower bound on get_ttft_or_tpot() in milliseconds
+
+        Returns:
+            Lower bound on the score
+        """
+        return float("-inf")
+
     def set_normalization_bounds(self, bounds: Dict[str, tuple]) -> None:
         """
         Set bounds for normalization
@@ -83,6 +103,11 @@ class MinimizeTTFT(BaseObjective):
         ttft = perf.get_ttft_or_tpot()
         return self._normalize(ttft, "ttft")
 
+    def lower_bound(
+        self, schedule_config: ScheduleConfig, ttft_lower_bound: float
+    ) -> float:
+        return self._normalize(ttft_lower_bound, "ttft")
+
     def get_metrics(self, perf: ModelPerformance) -> Dict[str, float]:
         return {
             "ttft_ms": perf.get_ttft_or_tpot(),
@@ -107,6 +132,20 @@ class MaximizeThroughput(BaseObjective):
         # For maximization, we negate the normalized value
         return -normalized if self.normalize else -throughput
 
+    def lower_bound(
+        self, schedule_config: ScheduleConfig, ttft_lower_bound: float
+    ) -> float:
+        # Mirrors ModelPerformance.get_throughput with TTFT at its lower bound
+        if ttft_lower_bound <= 0:
+            return float("-inf")
+        if schedule_config.mode == ForwardMode.EXTEND:
+            tokens = schedule_config.batch_size * schedule_config.max_seqlen
+        else:
+            tokens = schedule_config.batch_size
+        throughput = tokens / (ttft_lower_bound / 1000.0)
+        normalized = self._normalize(throughput, "throughput")
+        return -normalized if self.normalize else -throughput
+
     def get_metrics(self, perf: ModelPerformance) -> Dict[str, float]:
         throughput = perf.get_throughput()
         return {
@@ -174,6 +213,24 @@ class MultiObjective(BaseObjective):
 
         return total_score / total_weight
 
+    def lower_bound(
+        self, schedule_config: ScheduleConfig, ttft_lower_bound: float
+    ) -> float:
+        """Weighted combination of the sub-objective bounds (needs non-negative weights)"""
+        total_bound = 0.0
+        total_weight = 0.0
+        for objective, weight in self.objectives.values():
+            if weight < 0:
+                return float("-inf")
+            total_bound += (
+                objective.lower_bound(schedule_config, ttft_lower_bound) * weight
+            )
+            total_weight += weight
+
+        if total_weight == 0:
+            return float("-inf")
+        return total_bound / total_weight
+
     def get_metrics(self, perf: ModelPerformance) -> Dict[str, float]:
         """Get metrics from all sub-objectives"""
         metrics = {}
@@ -3,9 +3,19 @@ Optimizers for parameter optimization
 """
 
 from src.optimization.optimizers.base import BaseOptimizer
+from src.optimization.optimizers.bayesian import BayesianOptimizer
+from src.optimization.optimizers.branch_and_bound import BranchAndBoundOptimizer
+from src.optimization.optimizers.coarse_to_fine import CoarseToFineOptimizer
+from src.optimization.optimizers.evolutionary import EvolutionaryOptimizer
 from src.optimization.optimizers.grid_search import GridSearchOptimizer
+from src.optimization.optimizers.pareto import ParetoOptimizer
 
 __all__ = [
     "BaseOptimizer",
+    "BayesianOptimizer",
+    "BranchAndBoundOptimizer",
+    "CoarseToFineOptimizer",
+    "EvolutionaryOptimizer",
     "GridSearchOptimizer",
+    "ParetoOptimizer",
 ]
@@ -2,15 +2,35 @@
 Base optimizer class for parameter optimization
 """
 
+import bisect
+import time
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from src.arch.config import ScheduleConfig
+from src.arch.perf.model_perf import ModelPerformance
+from src.optimization.checkpoint import Checkpoint
 from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.history import ColumnarHistory
 from src.optimization.objective import BaseObjective
+from src.optimization.progress import ProgressReporter
 from src.optimization.results import OptimizationResult, OptimizationStep
+from src.optimization.results_store import ResultsStore
 from src.optimization.search_space import SearchSpace
 
+# Criteria that can end an optimization run (OptimizationResult.stop_reason)
+STOP_REASONS = {
+    "completed": "search space exhausted",
+    "max_evaluations": "evaluation budget reached",
+    "time_budget": "time budget reached",
+    "no_improvement": "no improvement within the patience window",
+    "top_k_stable": "top-k configurations stable within the patience window",
+    "converged": "search converged",
+    "max_rounds": "round limit reached",
+    "max_generations": "generation limit reached",
+    "pruned": "remaining configurations cannot beat the best",
+}
+
 
 class BaseOptimizer(ABC):
     """
@@ -19,6 +39,11 @@ class BaseOptimizer(ABC):
     All optimizers should inherit from this class and implement the optimize method.
     """
 
+    # Whether optimize() saves checkpoints and can resume from them
+    supports_checkpoint = False
+    # Whether optimize() can evaluate a single shard of the search space
+    supports_sharding = False
+
     def __init__(
         self,
         search_space: SearchSpace,
@@ -33,17 +58,44 @@ class BaseOptimizer(ABC):
             search_space: Search space to explore
             objective: Objective function to optimize
             parallel_workers: Number of parallel evaluation workers
-            early_stop_patience: Number of iterations without improvement before stopping
+            early_stop_patience: Number of evaluations without a change of the top-k
+                set (see stable_top_k) before stopping
         """
         self.search_space = search_space
         self.objective = objective
         self.parallel_workers = parallel_workers
         self.early_stop_patience = early_stop_patience
 
+        # Stop once the stable_top_k best scores are unchanged for
+        # early_stop_patience evaluations (1: no improvement of the best)
+        self.stable_top_k: int = 1
+        # Wall-clock limit of optimize() in seconds, checked between batches
+        self.time_budget: Optional[float] = None
+
+        # Directory receiving the finished chunks of the history instead of memory
+        # (see ColumnarHistory), for sweeps too large to keep in RAM
+        self.history_spill_dir: Optional[str] = None
+
         self._best_config: Optional[ScheduleConfig] = None
         self._best_score: float = float("inf")
-        self._optimization_history: List[OptimizationStep] = []
+        self._optimization_history = ColumnarHistory()
         self._iteration: int = 0
+        # Evaluations including failed ones, for the convergence window
+        self._evaluations: int = 0
+        self._top_k_scores: List[float] = []
+        self._last_top_k_change: int = 0
+        self._start_time: float = time.time()
+        self._stop_reason: Optional[str] = None
+        # Receives the raw metrics of every evaluated configuration, if set
+        self.results_store: Optional[ResultsStore] = None
+        # Periodic snapshots of the run (see supports_checkpoint), and whether
+        # optimize() starts from the saved one
+        self.checkpoint: Optional[Checkpoint] = None
+        self.resume: bool = False
+        # (index, count): only every count-th configuration from index is evaluated
+        self.shard: Optional[Tuple[int, int]] = None
+        # Status line / events of evaluated configurations
+        self.progress = ProgressReporter()
 
     @abstractmethod
     def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
@@ -68,7 +120,7 @@ class BaseOptimizer(ABC):
 
     def get_optimization_history(self) -> List[OptimizationStep]:
         """Get the history of optimization steps"""
-        return self._optimization_history.copy()
+        return list(self._optimization_history)
 
     def _update_best(self, config: ScheduleConfig, score: float, metrics: dict) -> bool:
         """
@@ -109,33 +161,152 @@ class BaseOptimizer(ABC):
         self._optimization_history.append(step)
         return step
 
+    def _process_evaluation(
+        self,
+        evaluation_count: int,
+        config: ScheduleConfig,
+        perf: Optional[ModelPerformance],
+    ) -> Optional[float]:
+        """
+        Score, record and report one evaluated configuration
+
+        Returns:
+            Score of the configuration, or None if its evaluation failed
+        """
+        if self.results_store is not None:
+            self.results_store.add(config, perf)
+
+        if perf is None:
+            self._track_convergence(None)
+            self.progress.update(evaluation_count, config, None)
+            return None
+
+        # Calculate score and metrics
+        score = self.objective.evaluate(perf)
+        metrics = self._get_metrics(config, perf)
+
+        # Record step
+        self._record_step(config, score, metrics)
+
+        # Update best
+        is_best = self._update_best(config, score, metrics)
+
+        self._track_convergence(score)
+        self.progress.update(evaluation_count, config, score, metrics, is_best)
+        return score
+
+    def _get_metrics(
+        self, config: ScheduleConfig, perf: ModelPerformance
+    ) -> Dict[str, float]:
+        """Metrics recorded for an evaluated configuration"""
+        metrics = self.objective.get_metrics(perf)
+
+        # Add standard metrics
+        metrics["ttft_ms"] = perf.get_ttft_or_tpot()
+        metrics["throughput_tps"] = perf.get_throughput()
+        metrics["total_time_ms"] = perf.total_time
+        return metrics
+
+    def _track_convergence(self, score: Optional[float]) -> None:
+        """Count an evaluation and note whether it entered the top-k scores"""
+        self._evaluations += 1
+        if score is None:
+            return
+        top_k = self._top_k_scores
+        if len(top_k) < self.stable_top_k or score < top_k[-1]:
+            bisect.insort(top_k, score)
+            del top_k[self.stable_top_k :]
+            self._last_top_k_change = self._evaluations
+
     def _should_stop_early(self) -> bool:
         """
         Check if optimization should stop early
 
-        Returns True if no improvement for patience iterations
+        Returns True if the top-k scores did not change for patience evaluations
         """
-        if self.early_stop_patience is None:
+        if self.early_stop_patience is None or not self._top_k_scores:
             return False
+        return self._evaluations - self._last_top_k_change >= self.early_stop_patience
 
-        if len(self._optimization_history) < self.early_stop_patience:
-            return False
+    def _check_stop(self) -> bool:
+        """
+        Check the stopping criteria shared by all optimizers (time budget, patience)
 
-        # Check if there was improvement in the last patience iterations
-        recent_steps = self._optimization_history[-self.early_stop_patience :]
-        best_in_recent = min(step.score for step in recent_steps)
+        Optimizers call this between batches of evaluations; the criterion that
+        triggered is reported as the result's stop_reason. The time budget applies
+        even if no configuration was evaluated successfully yet (every evaluation
+        failing, e.g. with a model the hardware cannot hold); the result is then
+        empty.
 
-        # Compare with best before the recent window
-        if len(self._optimization_history) > self.early_stop_patience:
-            earlier_best = min(
-                step.score
-                for step in self._optimization_history[: -self.early_stop_patience]
+        Returns:
+            True if optimization should stop
+        """
+        if self._stop_reason is not None:
+            return True
+        if (
+            self.time_budget is not None
+            and time.time() - self._start_time >= self.time_budget
+        ):
+            self._stop_reason = "time_budget"
+        elif self._should_stop_early():
+            self._stop_reason = (
+                "no_improvement" if self.stable_top_k == 1 else "top_k_stable"
             )
-        else:
-            earlier_best = self._best_score
+        if self._stop_reason is not None:
+            self.progress.log(f"Stopping: {STOP_REASONS[self._stop_reason]}")
+        return self._stop_reason is not None
+
+    def _get_checkpoint_state(self) -> Dict[str, Any]:
+        """Optimizer state saved in checkpoints (subclasses add their own fields)"""
+        return {
+            "best_config": self._best_config,
+            "best_score": self._best_score,
+            "history": self._optimization_history,
+            "iteration": self._iteration,
+            "evaluations": self._evaluations,
+            "top_k_scores": self._top_k_scores,
+            "last_top_k_change": self._last_top_k_change,
+        }
 
-        # Stop if no improvement over the patience window
-        return best_in_recent >= earlier_best
+    def _restore_checkpoint_state(self, state: Dict[str, Any]) -> None:
+        """Restore the state saved by _get_checkpoint_state"""
+        self._best_config = state["best_config"]
+        self._best_score = state["best_score"]
+        self._optimization_history = state["history"]
+        self._iteration = state["iteration"]
+        self._evaluations = state["evaluations"]
+        self._top_k_scores = state["top_k_scores"]
+        self._last_top_k_change = state["last_top_k_change"]
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        """
+        Restore the saved state when resuming
+
+        Returns:
+            The saved state, or None if not resuming or no checkpoint exists
+        """
+        if self.checkpoint is None or not self.resume:
+            return None
+        state = self.checkpoint.load()
+        if state is None:
+            print(f"No checkpoint at {self.checkpoint.path}, starting from scratch")
+            return None
+        self._restore_checkpoint_state(state)
+        return state
+
+    def _save_checkpoint(self, force: bool = False, **progress) -> None:
+        """
+        Save a checkpoint if one is configured and due
+
+        Args:
+            force: Save even if the checkpoint interval has not elapsed
+            **progress: Optimizer-specific progress fields (e.g. the iterator position)
+        """
+        if self.checkpoint is None or not (force or self.checkpoint.is_due()):
+            return
+        state = self._get_checkpoint_state()
+        state.update(progress)
+        self.checkpoint.save(state)
 
     def _create_result(self, total_time_seconds: float) -> OptimizationResult:
         """
@@ -149,11 +320,7 @@ class BaseOptimizer(ABC):
         """
         best_metrics = {}
         if self._best_config and self._optimization_history:
-            # Find the step with the best score
-            for step in self._optimization_history:
-                if step.score == self._best_score:
-                    best_metrics = step.metrics
-                    break
+            best_metrics = self._optimization_history.best().metrics
 
         return OptimizationResult(
             best_config=self._best_config or ScheduleConfig(),
@@ -162,11 +329,17 @@ class BaseOptimizer(ABC):
             total_evaluations=self._iteration,
             total_time_seconds=total_time_seconds,
             search_space_size=self.search_space.get_search_space_size(),
+            stop_reason=self._stop_reason or "completed",
         )
 
     def reset(self) -> None:
         """Reset the optimizer state"""
         self._best_config = None
         self._best_score = float("inf")
-        self._optimization_history = []
+        self._optimization_history = ColumnarHistory(spill_dir=self.history_spill_dir)
         self._iteration = 0
+        self._evaluations = 0
+        self._top_k_scores = []
+        self._last_top_k_change = 0
+        self._start_time = time.time()
+        self._stop_reason: Optional[str] = None
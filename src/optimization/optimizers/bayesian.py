@@ -0,0 +1,183 @@
+"""
+Bayesian optimizer - tree-structured Parzen estimator over the discrete search lattice
+"""
+
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.objective import BaseObjective
+from src.optimization.optimizers.base import BaseOptimizer
+from src.optimization.optimizers.encoding import encode_dimensions
+from src.optimization.results import OptimizationResult
+from src.optimization.search_space import SearchSpace
+
+
+class BayesianOptimizer(BaseOptimizer):
+    """
+    Bayesian optimizer using a tree-structured Parzen estimator (TPE)
+
+    Evaluated configurations are split into a "good" set (best gamma fraction of
+    scores) and a "bad" set. Each dimension gets a Parzen density per set over its
+    value indices, smoothed towards neighbouring values for ordinal dimensions. The
+    next configurations are the unevaluated valid points with the highest density
+    ratio good/bad. Proposals are drawn from the valid lattice (see
+    SearchSpace.get_grid_arrays), so constraints are always satisfied.
+    """
+
+    def __init__(
+        self,
+        search_space: SearchSpace,
+        objective: BaseObjective,
+        parallel_workers: int = 1,
+        max_evaluations: Optional[int] = None,
+        n_initial: Optional[int] = None,
+        gamma: float = 0.25,
+        candidate_pool: int = 100000,
+        seed: int = 0,
+    ):
+        """
+        Initialize Bayesian optimizer
+
+        Args:
+            search_space: Search space to explore
+            objective: Objective function to optimize
+            parallel_workers: Number of parallel evaluation workers
+            max_evaluations: Maximum number of configurations to evaluate (default 200)
+            n_initial: Random configurations evaluated before the surrogate is used
+                (default: 10% of the budget, at least 10)
+            gamma: Fraction of evaluated configurations treated as good
+            candidate_pool: Maximum number of candidates scored per proposal round
+                (larger lattices are subsampled)
+            seed: Random seed, making runs reproducible
+        """
+        super().__init__(
+            search_space=search_space,
+            objective=objective,
+            parallel_workers=parallel_workers,
+        )
+        self.max_evaluations = max_evaluations or 200
+        self.n_initial = n_initial or max(10, self.max_evaluations // 10)
+        self.gamma = gamma
+        self.candidate_pool = candidate_pool
+        self.seed = seed
+
+    def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
+        """
+        Run Bayesian optimization
+
+        Args:
+            evaluator: Performance evaluator
+
+        Returns:
+            Optimization result
+        """
+        start_time = time.time()
+        self.reset()
+        rng = np.random.default_rng(self.seed)
+
+        grid = self.search_space.get_grid_arrays()
+        size = len(next(iter(grid.values())))
+        budget = min(self.max_evaluations, size)
+        print(
+            f"Starting Bayesian optimization: {budget} evaluations over "
+            f"{size} configurations..."
+        )
+
+        # Dimension values as integer indices, one column per searched dimension
+        dimensions = self.search_space.get_dimensions()
+        codes, num_values, ordinal = encode_dimensions(grid, dimensions)
+
+        evaluated = np.zeros(size, dtype=bool)
+        observed: List[int] = []
+        scores: List[float] = []
+        batch_size = max(1, self.parallel_workers)
+        self.progress.start(total=budget, evaluator=evaluator)
+
+        while len(observed) < budget and not self._check_stop():
+            count = min(batch_size, budget - len(observed))
+            if len(observed) < self.n_initial:
+                count = min(count, self.n_initial - len(observed))
+                indices = _sample_unevaluated(rng, evaluated, count)
+            else:
+                indices = self._propose(
+                    rng, codes, num_values, ordinal, evaluated, observed, scores, count
+                )
+
+            configs = SearchSpace.configs_from_arrays(
+                {name: column[indices] for name, column in grid.items()}
+            )
+            perfs = evaluator.evaluate_batch(
+                configs, parallel_workers=self.parallel_workers
+            )
+            for index, config, perf in zip(indices, configs, perfs):
+                evaluated[index] = True
+                score = self._process_evaluation(len(observed) + 1, config, perf)
+                observed.append(int(index))
+                # Failed configurations count as the worst observations
+                scores.append(float("inf") if score is None else score)
+
+        self.progress.finish()
+        if self._stop_reason is None and budget < size:
+            self._stop_reason = "max_evaluations"
+        total_time = time.time() - start_time
+        print(f"\nBayesian optimization completed in {total_time:.2f}s")
+        print(f"Total evaluations: {len(observed)}")
+        print(f"Best score: {self._best_score:.4f}")
+
+        return self._create_result(total_time)
+
+    def _propose(
+        self,
+        rng: np.random.Generator,
+        codes: List[np.ndarray],
+        num_values: List[int],
+        ordinal: List[bool],
+        evaluated: np.ndarray,
+        observed: List[int],
+        scores: List[float],
+        count: int,
+    ) -> np.ndarray:
+        """Pick the unevaluated points with the highest good/bad density ratio"""
+        candidates = np.flatnonzero(~evaluated)
+        if len(candidates) > self.candidate_pool:
+            candidates = rng.choice(candidates, self.candidate_pool, replace=False)
+
+        order = np.argsort(scores, kind="stable")
+        n_good = max(1, int(np.ceil(self.gamma * len(order))))
+        observed = np.asarray(observed)
+        good = observed[order[:n_good]]
+        bad = observed[order[n_good:]]
+
+        log_ratio = np.zeros(len(candidates))
+        for column, size, is_ordinal in zip(codes, num_values, ordinal):
+            good_density = _parzen_density(column[good], size, is_ordinal)
+            bad_density = _parzen_density(column[bad], size, is_ordinal)
+            log_ratio += np.log(good_density / bad_density)[column[candidates]]
+
+        # Random tie-breaking keeps proposals diverse among equally scored candidates
+        log_ratio += rng.uniform(0.0, 1e-9, len(candidates))
+        best = np.argsort(-log_ratio, kind="stable")[:count]
+        return candidates[best]
+
+
+def _parzen_density(
+    observations: np.ndarray, num_values: int, is_ordinal: bool
+) -> np.ndarray:
+    """Smoothed categorical density over value indices, with a uniform prior"""
+    counts = np.bincount(observations, minlength=num_values).astype(float)
+    if is_ordinal and num_values > 1:
+        # Spread each observation to its neighbours (discrete Gaussian-like kernel)
+        counts = np.convolve(counts, [0.25, 0.5, 0.25], mode="same")
+    weights = counts + 1.0 / num_values
+    return weights / weights.sum()
+
+
+def _sample_unevaluated(
+    rng: np.random.Generator, evaluated: np.ndarray, count: int
+) -> np.ndarray:
+    """Sample distinct unevaluated indices uniformly"""
+    candidates = np.flatnonzero(~evaluated)
+    return rng.choice(candidates, min(count, len(candidates)), replace=False)
@@ -0,0 +1,194 @@
+"""
+Branch-and-bound optimizer - exhaustive search that skips configurations whose cheap
+lower bound cannot beat the incumbent
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.arch.config import ScheduleConfig
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.objective import BaseObjective
+from src.optimization.optimizers.grid_search import GridSearchOptimizer
+from src.optimization.results import OptimizationResult
+from src.optimization.search_space import SearchSpace
+
+
+class BranchAndBoundOptimizer(GridSearchOptimizer):
+    """
+    Grid search with lower-bound pruning
+
+    Every valid configuration first gets an optimistic score from a TTFT/TPOT lower
+    bound, computed for the whole grid with one operator graph per structural group
+    (see PerformanceEvaluator.get_ttft_lower_bounds and BaseObjective.lower_bound).
+    Configurations are then fully evaluated in chunks, in order of increasing bound.
+    The first chunk holds one configuration per worker and each following chunk is
+    twice as large (up to chunk_size), so an incumbent exists early; a chunk ends at
+    the first bound worse than the best score found so far, and once the next bound
+    is worse, all remaining configurations are pruned. Configurations that cannot be
+    built are skipped as well, but counted apart from the pruned ones. The best
+    configuration is the same as with GridSearchOptimizer, as long as the bounds are
+    valid.
+    """
+
+    # Evaluation order depends on the bounds, not on a resumable enumeration
+    supports_checkpoint = False
+    supports_sharding = False
+
+    def __init__(
+        self,
+        search_space: SearchSpace,
+        objective: BaseObjective,
+        parallel_workers: int = 1,
+        max_evaluations: Optional[int] = None,
+    ):
+        """
+        Initialize branch-and-bound optimizer
+
+        Args:
+            search_space: Search space to explore
+            objective: Objective function to optimize
+            parallel_workers: Number of parallel evaluation workers
+            max_evaluations: Maximum number of configurations to fully evaluate
+        """
+        super().__init__(
+            search_space=search_space,
+            objective=objective,
+            parallel_workers=parallel_workers,
+            max_evaluations=max_evaluations,
+        )
+        self._pruned_evaluations = 0
+        self._unbuildable_configurations = 0
+
+    def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
+        """
+        Run branch-and-bound optimization
+
+        Args:
+            evaluator: Performance evaluator
+
+        Returns:
+            Optimization result with pruned_evaluations and unbuildable_configurations
+            set
+        """
+        start_time = time.time()
+        self.reset()
+        self._pruned_evaluations = 0
+        self._unbuildable_configurations = 0
+
+        arrays = self.search_space.get_grid_arrays()
+        configs = SearchSpace.configs_from_arrays(arrays)
+        print(f"Starting branch-and-bound search over {len(configs)} configurations...")
+
+        bounds = self._compute_bounds(evaluator, arrays, configs)
+        if np.all(np.isinf(bounds)):
+            print(
+                f"Warning: {type(self.objective).__name__} provides no lower bound, "
+                "nothing will be pruned"
+            )
+        # Stable sort keeps enumeration order among equal bounds
+        order = np.argsort(bounds, kind="stable")
+        sorted_bounds = bounds[order]
+
+        evaluation_count = 0
+        position = 0
+        # Grows geometrically from one configuration per worker up to chunk_size
+        chunk_size = max(1, self.parallel_workers)
+        # Pruning makes the number of evaluations unknown: no ETA
+        self.progress.start(evaluator=evaluator)
+        while position < len(order):
+            if self.max_evaluations and evaluation_count >= self.max_evaluations:
+                self.progress.log(
+                    f"Reached max evaluations limit ({self.max_evaluations})"
+                )
+                self._stop_reason = "max_evaluations"
+                break
+            if self._can_prune(sorted_bounds[position]):
+                # Bounds are sorted: nothing after this point can beat the incumbent
+                skipped = sorted_bounds[position:]
+                self._unbuildable_configurations = int(
+                    np.count_nonzero(np.isposinf(skipped))
+                )
+                self._pruned_evaluations = (
+                    len(skipped) - self._unbuildable_configurations
+                )
+                self._stop_reason = "pruned"
+                break
+            if self._check_stop():
+                break
+
+            # Chunks stop at the first bound that cannot beat the incumbent
+            end = min(position + chunk_size, len(order))
+            chunk_size = min(2 * chunk_size, self.chunk_size)
+            if self._best_score != float("inf"):
+                end = min(
+                    end,
+                    int(
+                        np.searchsorted(
+                            sorted_bounds, self._get_prune_threshold(), side="right"
+                        )
+                    ),
+                )
+            if self.max_evaluations:
+                end = min(end, position + self.max_evaluations - evaluation_count)
+            chunk = order[position:end]
+            position = end
+
+            chunk_configs = [configs[index] for index in chunk]
+            perfs = evaluator.evaluate_batch(
+                chunk_configs,
+                parallel_workers=self.parallel_workers,
+                arrays={name: column[chunk] for name, column in arrays.items()},
+            )
+            for config, perf in zip(chunk_configs, perfs):
+                evaluation_count += 1
+                self._process_evaluation(evaluation_count, config, perf)
+
+        self.progress.finish()
+        total_time = time.time() - start_time
+        print(f"\nBranch-and-bound search completed in {total_time:.2f}s")
+        print(f"Total evaluations: {evaluation_count}")
+        print(f"Pruned configurations: {self._pruned_evaluations}")
+        if self._unbuildable_configurations:
+            print(
+                "Skipped configurations that cannot be built: "
+                f"{self._unbuildable_configurations}"
+            )
+        print(f"Best score: {self._best_score:.4f}")
+
+        result = self._create_result(total_time)
+        result.pruned_evaluations = self._pruned_evaluations
+        result.unbuildable_configurations = self._unbuildable_configurations
+        return result
+
+    def _compute_bounds(
+        self,
+        evaluator: PerformanceEvaluator,
+        arrays: Dict[str, np.ndarray],
+        configs: List[ScheduleConfig],
+    ) -> np.ndarray:
+        """
+        Optimistic objective score of every configuration
+
+        Configurations that cannot be built get +inf (their evaluation would fail), and
+        objectives without a bound give -inf.
+        """
+        ttft_bounds = evaluator.get_ttft_lower_bounds(arrays).tolist()
+        bounds = np.full(len(configs), float("inf"))
+        for i, (config, ttft_bound) in enumerate(zip(configs, ttft_bounds)):
+            if ttft_bound == ttft_bound:
+                bounds[i] = self.objective.lower_bound(config, ttft_bound)
+        return bounds
+
+    def _get_prune_threshold(self) -> float:
+        """Largest bound that can still beat the incumbent"""
+        # Tolerance keeps ties (and rounding noise) evaluated
+        return self._best_score + 1e-9 * abs(self._best_score)
+
+    def _can_prune(self, bound: float) -> bool:
+        """Check whether a configuration with this bound cannot beat the incumbent"""
+        if self._best_score == float("inf"):
+            return False
+        return bound > self._get_prune_threshold()
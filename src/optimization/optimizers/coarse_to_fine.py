@@ -0,0 +1,208 @@
+"""
+Coarse-to-fine optimizer - refines integer dimensions around the best lattice points
+"""
+
+import dataclasses
+import time
+from typing import Dict, List, Optional
+
+from src.arch.config import ScheduleConfig
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.objective import BaseObjective
+from src.optimization.optimizers.base import BaseOptimizer
+from src.optimization.results import OptimizationResult
+from src.optimization.search_space import SearchSpace
+
+# Dimensions refined by default, when they are searched
+DEFAULT_REFINE_DIMENSIONS = ("batch_size", "max_seqlen")
+
+
+class CoarseToFineOptimizer(BaseOptimizer):
+    """
+    Coarse-to-fine search over integer dimensions
+
+    The search space lattice (e.g. power-of-two batch sizes from a "1-128" range) is
+    evaluated first. Each round then takes the top_k configurations so far and, for
+    every refined dimension, proposes the valid integer closest to the midpoint
+    between the configuration and its nearest evaluated neighbour on either side
+    (all other fields fixed). The brackets halve every round, so each region
+    converges to its local optimum at integer resolution in a logarithmic number of
+    rounds. Search stops when no new points are proposed.
+    """
+
+    def __init__(
+        self,
+        search_space: SearchSpace,
+        objective: BaseObjective,
+        parallel_workers: int = 1,
+        max_evaluations: Optional[int] = None,
+        top_k: int = 3,
+        max_rounds: int = 32,
+        refine_dimensions: Optional[List[str]] = None,
+    ):
+        """
+        Initialize coarse-to-fine optimizer
+
+        Args:
+            search_space: Search space whose lattice is evaluated in the first round
+            objective: Objective function to optimize
+            parallel_workers: Number of parallel evaluation workers
+            max_evaluations: Maximum number of configurations to evaluate
+            top_k: Number of best configurations refined per round
+            max_rounds: Maximum number of refinement rounds
+            refine_dimensions: Integer dimensions to refine (default: batch_size and,
+                if searched, max_seqlen)
+        """
+        super().__init__(
+            search_space=search_space,
+            objective=objective,
+            parallel_workers=parallel_workers,
+        )
+        self.max_evaluations = max_evaluations
+        self.top_k = top_k
+        self.max_rounds = max_rounds
+
+        self._names = [dimension.name for dimension in search_space.get_dimensions()]
+        if refine_dimensions is None:
+            refine_dimensions = [
+                name for name in DEFAULT_REFINE_DIMENSIONS if name in self._names
+            ]
+        for name in refine_dimensions:
+            if name not in self._names:
+                raise ValueError(
+                    f"Cannot refine dimension that is not searched: {name}"
+                )
+        self.refine_dimensions = list(refine_dimensions)
+
+        self._scores: Dict[tuple, float] = {}
+        self._configs: Dict[tuple, ScheduleConfig] = {}
+
+    def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
+        """
+        Run coarse-to-fine optimization
+
+        Args:
+            evaluator: Performance evaluator (its cache is shared by all rounds)
+
+        Returns:
+            Optimization result
+        """
+        start_time = time.time()
+        self.reset()
+        self._scores = {}
+        self._configs = {}
+
+        coarse = list(self.search_space.iterate_all())
+        print(
+            f"Starting coarse-to-fine search: {len(coarse)} lattice configurations, "
+            f"refining {', '.join(self.refine_dimensions) or 'nothing'}..."
+        )
+        self.progress.start(evaluator=evaluator)
+        self._evaluate(evaluator, coarse)
+
+        for round_index in range(1, self.max_rounds + 1):
+            if self._check_stop():
+                break
+            if self._budget_exhausted():
+                self.progress.log(
+                    f"Reached max evaluations limit ({self.max_evaluations})"
+                )
+                self._stop_reason = "max_evaluations"
+                break
+            proposals = self._propose()
+            if not proposals:
+                self.progress.log(
+                    f"Converged after {round_index - 1} refinement rounds"
+                )
+                self._stop_reason = "converged"
+                break
+            self.progress.log(
+                f"Refinement round {round_index}: {len(proposals)} configurations"
+            )
+            self._evaluate(evaluator, proposals)
+        else:
+            self._stop_reason = self._stop_reason or "max_rounds"
+
+        self.progress.finish()
+        total_time = time.time() - start_time
+        print(f"\nCoarse-to-fine search completed in {total_time:.2f}s")
+        print(f"Total evaluations: {len(self._scores)}")
+        print(f"Best score: {self._best_score:.4f}")
+
+        return self._create_result(total_time)
+
+    def _key(self, config: ScheduleConfig) -> tuple:
+        """Values of the searched dimensions, identifying a configuration"""
+        return tuple(getattr(config, name) for name in self._names)
+
+    def _budget_exhausted(self) -> bool:
+        return bool(self.max_evaluations) and len(self._scores) >= self.max_evaluations
+
+    def _evaluate(
+        self, evaluator: PerformanceEvaluator, configs: List[ScheduleConfig]
+    ) -> None:
+        """Evaluate configurations not seen yet, within the evaluation budget"""
+        pending = [
+            config for config in configs if self._key(config) not in self._scores
+        ]
+        if self.max_evaluations:
+            pending = pending[: max(0, self.max_evaluations - len(self._scores))]
+
+        chunk_size = 64 * max(1, self.parallel_workers)
+        for start in range(0, len(pending), chunk_size):
+            if self._check_stop():
+                break
+            chunk = pending[start : start + chunk_size]
+            perfs = evaluator.evaluate_batch(
+                chunk, parallel_workers=self.parallel_workers
+            )
+            for config, perf in zip(chunk, perfs):
+                key = self._key(config)
+                score = self._process_evaluation(len(self._scores) + 1, config, perf)
+                # Failed configurations are never refined
+                self._scores[key] = float("inf") if score is None else score
+                self._configs[key] = config
+
+    def _propose(self) -> List[ScheduleConfig]:
+        """Midpoint proposals around the top_k configurations"""
+        ranked = sorted(
+            (key for key, score in self._scores.items() if score != float("inf")),
+            key=self._scores.get,
+        )
+        proposals: Dict[tuple, ScheduleConfig] = {}
+        for key in ranked[: self.top_k]:
+            config = self._configs[key]
+            for name in self.refine_dimensions:
+                index = self._names.index(name)
+                value = key[index]
+                # Evaluated values along this dimension, all other fields equal
+                line = sorted(
+                    other[index]
+                    for other in self._scores
+                    if other[:index] == key[:index]
+                    and other[index + 1 :] == key[index + 1 :]
+                )
+                position = line.index(value)
+                neighbours = (
+                    line[max(0, position - 1) : position]
+                    + line[position + 1 : position + 2]
+                )
+                for neighbour in neighbours:
+                    candidate = self._midpoint(config, name, value, neighbour)
+                    if candidate is not None:
+                        proposals.setdefault(self._key(candidate), candidate)
+        return [config for key, config in proposals.items() if key not in self._scores]
+
+    def _midpoint(
+        self, config: ScheduleConfig, name: str, value: int, neighbour: int
+    ) -> Optional[ScheduleConfig]:
+        """Valid configuration strictly between value and neighbour, nearest the middle"""
+        low, high = sorted((value, neighbour))
+        middle = (low + high) / 2
+        # Integers in the open interval, nearest to the midpoint first
+        candidates = sorted(range(low + 1, high), key=lambda v: (abs(v - middle), v))
+        for candidate_value in candidates:
+            candidate = dataclasses.replace(config, **{name: candidate_value})
+            if self.search_space.is_valid(candidate):
+                return candidate
+        return None
@@ -0,0 +1,36 @@
+"""
+Dimension encoding - search space columns as integer value indices for model-based optimizers
+"""
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from src.optimization.search_space import SearchDimension
+
+
+def encode_dimensions(
+    grid: Dict[str, np.ndarray], dimensions: List[SearchDimension]
+) -> Tuple[List[np.ndarray], List[int], List[bool]]:
+    """
+    Encode each dimension column as indices into its sorted unique values
+
+    Args:
+        grid: Valid configurations as column arrays (see SearchSpace.get_grid_arrays)
+        dimensions: Searched dimensions, in enumeration order
+
+    Returns:
+        Tuple of (index column per dimension, number of values per dimension,
+        whether each dimension is ordinal)
+    """
+    codes = []
+    num_values = []
+    ordinal = []
+    for dimension in dimensions:
+        uniques, inverse = np.unique(grid[dimension.name], return_inverse=True)
+        codes.append(inverse.reshape(-1))
+        num_values.append(max(1, len(uniques)))
+        # Numeric dimensions are smoothed across neighbouring values; flags and
+        # modes are purely categorical
+        ordinal.append(uniques.dtype.kind in "iuf" and len(uniques) > 2)
+    return codes, num_values, ordinal
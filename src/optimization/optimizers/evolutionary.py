@@ -0,0 +1,215 @@
+"""
+Evolutionary optimizer - genetic search over parallelism, batch size, mode and flags
+"""
+
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.objective import BaseObjective
+from src.optimization.optimizers.base import BaseOptimizer
+from src.optimization.optimizers.encoding import encode_dimensions
+from src.optimization.results import OptimizationResult
+from src.optimization.search_space import SearchSpace
+
+
+class EvolutionaryOptimizer(BaseOptimizer):
+    """
+    Genetic algorithm over the search space dimensions
+
+    Individuals are vectors of value indices, one gene per searched dimension
+    (tp/dp/ep/batch/mode plus any feature flags or extra dimensions). Each generation
+    keeps the elite, then breeds children by tournament selection, uniform crossover
+    and mutation (a step to a neighbouring value for numeric dimensions, a random
+    value otherwise). Children violating a constraint are repaired by projecting them
+    onto the nearest valid configuration. All new children of a generation are
+    evaluated as one batch, in parallel when workers > 1.
+    """
+
+    def __init__(
+        self,
+        search_space: SearchSpace,
+        objective: BaseObjective,
+        parallel_workers: int = 1,
+        max_evaluations: Optional[int] = None,
+        population_size: int = 32,
+        max_generations: int = 100,
+        elite_size: int = 2,
+        tournament_size: int = 3,
+        crossover_rate: float = 0.9,
+        mutation_rate: Optional[float] = None,
+        seed: int = 0,
+    ):
+        """
+        Initialize evolutionary optimizer
+
+        Args:
+            search_space: Search space to explore
+            objective: Objective function to optimize
+            parallel_workers: Number of parallel evaluation workers
+            max_evaluations: Maximum number of configurations to evaluate (default 400)
+            population_size: Individuals per generation
+            max_generations: Maximum number of generations
+            elite_size: Best individuals carried over unchanged
+            tournament_size: Individuals competing for each parent slot
+            crossover_rate: Probability that a child mixes two parents
+            mutation_rate: Per-gene mutation probability (default 1 / number of genes)
+            seed: Random seed, making runs reproducible
+        """
+        super().__init__(
+            search_space=search_space,
+            objective=objective,
+            parallel_workers=parallel_workers,
+        )
+        self.max_evaluations = max_evaluations or 400
+        self.population_size = population_size
+        self.max_generations = max_generations
+        self.elite_size = elite_size
+        self.tournament_size = tournament_size
+        self.crossover_rate = crossover_rate
+        self.mutation_rate = mutation_rate
+        self.seed = seed
+
+        # Genomes of all valid configurations (value index per dimension), the
+        # number of values of each dimension and whether it is ordinal; set by
+        # optimize() from the search space grid
+        self._genomes = np.zeros((0, 0), dtype=np.int64)
+        self._num_values = np.zeros(0, dtype=np.int64)
+        self._ordinal = np.zeros(0, dtype=bool)
+
+    def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
+        """
+        Run evolutionary optimization
+
+        Args:
+            evaluator: Performance evaluator
+
+        Returns:
+            Optimization result
+        """
+        start_time = time.time()
+        self.reset()
+        rng = np.random.default_rng(self.seed)
+
+        grid = self.search_space.get_grid_arrays()
+        size = len(next(iter(grid.values())))
+        budget = min(self.max_evaluations, size)
+        dimensions = self.search_space.get_dimensions()
+        print(
+            f"Starting evolutionary search over {size} configurations "
+            f"({', '.join(dimension.name for dimension in dimensions)}), "
+            f"budget {budget} evaluations..."
+        )
+        if size == 0:
+            return self._create_result(time.time() - start_time)
+
+        codes, num_values, ordinal = encode_dimensions(grid, dimensions)
+        self._genomes = np.stack(codes, axis=1)
+        self._num_values = np.asarray(num_values)
+        self._ordinal = np.asarray(ordinal)
+        mutation_rate = self.mutation_rate or 1.0 / len(dimensions)
+
+        scores: Dict[int, float] = {}
+        # May stop early (see BaseOptimizer._check_stop), so the budget is an upper
+        # bound for the ETA
+        self.progress.start(total=budget, evaluator=evaluator)
+        population = rng.choice(size, min(self.population_size, size), replace=False)
+        self._evaluate(evaluator, grid, population, scores, budget)
+
+        for _ in range(self.max_generations):
+            if len(scores) >= budget:
+                if budget < size:
+                    self._stop_reason = "max_evaluations"
+                break
+            if self._check_stop():
+                break
+
+            ranked = sorted(population.tolist(), key=lambda index: scores[index])
+            children = ranked[: self.elite_size]
+            while len(children) < len(population):
+                first = self._tournament(rng, population, scores)
+                second = self._tournament(rng, population, scores)
+                genome = self._genomes[first].copy()
+                if rng.random() < self.crossover_rate:
+                    take = rng.random(len(genome)) < 0.5
+                    genome[take] = self._genomes[second][take]
+                genome = self._mutate(rng, genome, mutation_rate)
+                children.append(self._repair(rng, genome))
+
+            population = np.asarray(children)
+            self._evaluate(evaluator, grid, population, scores, budget)
+        else:
+            self._stop_reason = self._stop_reason or "max_generations"
+
+        self.progress.finish()
+        total_time = time.time() - start_time
+        print(f"\nEvolutionary search completed in {total_time:.2f}s")
+        print(f"Total evaluations: {len(scores)}")
+        print(f"Best score: {self._best_score:.4f}")
+
+        return self._create_result(total_time)
+
+    def _evaluate(
+        self,
+        evaluator: PerformanceEvaluator,
+        grid: Dict[str, np.ndarray],
+        population: np.ndarray,
+        scores: Dict[int, float],
+        budget: int,
+    ) -> None:
+        """Evaluate the individuals not seen before, as one batch"""
+        pending: List[int] = []
+        for index in population.tolist():
+            if index not in scores and index not in pending:
+                pending.append(index)
+        pending = pending[: max(0, budget - len(scores))]
+
+        configs = SearchSpace.configs_from_arrays(
+            {name: column[pending] for name, column in grid.items()}
+        )
+        perfs = evaluator.evaluate_batch(
+            configs, parallel_workers=self.parallel_workers
+        )
+        for index, config, perf in zip(pending, configs, perfs):
+            score = self._process_evaluation(len(scores) + 1, config, perf)
+            # Failed configurations rank last
+            scores[index] = float("inf") if score is None else score
+
+    def _tournament(
+        self, rng: np.random.Generator, population: np.ndarray, scores: Dict[int, float]
+    ) -> int:
+        """Select the best of a few random individuals"""
+        contestants = rng.choice(population, min(self.tournament_size, len(population)))
+        return int(min(contestants.tolist(), key=scores.get))
+
+    def _mutate(
+        self, rng: np.random.Generator, genome: np.ndarray, mutation_rate: float
+    ) -> np.ndarray:
+        """Mutate genes: numeric ones step to a neighbour, others take a random value"""
+        for gene in np.flatnonzero(rng.random(len(genome)) < mutation_rate):
+            count = self._num_values[gene]
+            if count < 2:
+                continue
+            if self._ordinal[gene] and rng.random() < 0.5:
+                step = rng.choice([-1, 1])
+                genome[gene] = min(max(genome[gene] + step, 0), count - 1)
+            else:
+                # Uniform over the other values
+                genome[gene] = (genome[gene] + rng.integers(1, count)) % count
+        return genome
+
+    def _repair(self, rng: np.random.Generator, genome: np.ndarray) -> int:
+        """
+        Map a genome to the nearest valid configuration
+
+        Distance counts differing categorical genes as 1 and numeric genes by their
+        normalized index distance; ties are broken at random.
+        """
+        difference = np.abs(self._genomes - genome).astype(float)
+        scale = np.where(self._ordinal, np.maximum(self._num_values - 1, 1), 1)
+        difference = np.where(self._ordinal, difference / scale, difference > 0)
+        distance = difference.sum(axis=1)
+        nearest = np.flatnonzero(distance == distance.min())
+        return int(rng.choice(nearest))
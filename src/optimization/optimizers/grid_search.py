@@ -10,6 +10,7 @@ from src.optimization.objective import BaseObjective
 from src.optimization.optimizers.base import BaseOptimizer
 from src.optimization.results import OptimizationResult
 from src.optimization.search_space import SearchSpace
+from src.optimization.sharding import get_shard_size
 
 
 class GridSearchOptimizer(BaseOptimizer):
@@ -17,15 +18,21 @@ class GridSearchOptimizer(BaseOptimizer):
     Grid search optimizer that evaluates all valid configurations
 
     This optimizer is exhaustive and deterministic, suitable for small
-    to medium-sized search spaces.
+    to medium-sized search spaces. Its position in the enumeration is checkpointed,
+    so an interrupted run can resume where it stopped, and a shard evaluates every
+    N-th configuration of it, so N hosts can split a sweep.
     """
 
+    supports_checkpoint = True
+    supports_sharding = True
+
     def __init__(
         self,
         search_space: SearchSpace,
         objective: BaseObjective,
         parallel_workers: int = 1,
         max_evaluations: Optional[int] = None,
+        chunk_size: Optional[int] = None,
     ):
         """
         Initialize grid search optimizer
@@ -35,6 +42,8 @@ class GridSearchOptimizer(BaseOptimizer):
             objective: Objective function to optimize
             parallel_workers: Number of parallel evaluation workers
             max_evaluations: Maximum number of configurations to evaluate
+            chunk_size: Configurations handed to the evaluator at once (default: 4096
+                per worker, so that the batch engine sees large structural groups)
         """
         super().__init__(
             search_space=search_space,
@@ -42,6 +51,7 @@ class GridSearchOptimizer(BaseOptimizer):
             parallel_workers=parallel_workers,
         )
         self.max_evaluations = max_evaluations
+        self.chunk_size = chunk_size or 4096 * max(1, parallel_workers)
 
     def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
         """
@@ -56,53 +66,77 @@ class GridSearchOptimizer(BaseOptimizer):
         start_time = time.time()
         self.reset()
 
-        print(
-            f"Starting grid search over {self.search_space.get_search_space_size()} configurations..."
-        )
-
         evaluation_count = 0
+        previous_time = 0.0
+        state = self._load_checkpoint()
+        if state is not None:
+            evaluation_count = state["position"]
+            previous_time = state["elapsed_seconds"]
+            print(
+                f"Resuming from checkpoint {self.checkpoint.path}: "
+                f"{evaluation_count} configurations already evaluated"
+            )
 
-        for config in self.search_space.iterate_all():
-            if self.max_evaluations and evaluation_count >= self.max_evaluations:
-                print(f"Reached max evaluations limit ({self.max_evaluations})")
-                break
-
-            evaluation_count += 1
-
-            # Evaluate configuration
-            perf = evaluator.evaluate(config)
-
-            if perf is None:
-                print(
-                    f"  [{evaluation_count}] Config failed: TP={config.tp_size}, DP={config.dp_size}, "
-                    f"EP={config.ep_size}, BS={config.batch_size}"
-                )
-                continue
-
-            # Calculate score and metrics
-            score = self.objective.evaluate(perf)
-            metrics = self.objective.get_metrics(perf)
-
-            # Add standard metrics
-            metrics["ttft_ms"] = perf.get_ttft_or_tpot()
-            metrics["throughput_tps"] = perf.get_throughput()
-            metrics["total_time_ms"] = perf.total_time
+        # Valid configurations as column arrays, cheaper to slice and hand to the
+        # batch engine than ScheduleConfig objects
+        arrays = self.search_space.get_grid_arrays()
+        size = self.search_space.get_search_space_size()
+        if self.shard is not None:
+            index, count = self.shard
+            arrays = {name: column[index::count] for name, column in arrays.items()}
+            print(
+                f"Starting grid search over shard {index}/{count}: "
+                f"{get_shard_size(size, self.shard)} of {size} configurations..."
+            )
+        else:
+            print(f"Starting grid search over {size} configurations...")
+
+        # Enumeration is deterministic, so resuming skips the evaluated prefix
+        arrays = {
+            name: column[evaluation_count : self.max_evaluations or None]
+            for name, column in arrays.items()
+        }
+        if self.shard is not None:
+            size = get_shard_size(size, self.shard)
+        self.progress.start(
+            total=min(size, self.max_evaluations or size),
+            evaluator=evaluator,
+            completed=evaluation_count,
+            best_score=self._best_score,
+        )
 
-            # Record step
-            self._record_step(config, score, metrics)
+        # Evaluate in chunks (in parallel when workers > 1) and merge in enumeration order
+        remaining = len(next(iter(arrays.values())))
+        for start in range(0, remaining, self.chunk_size):
+            chunk_arrays = {
+                name: column[start : start + self.chunk_size]
+                for name, column in arrays.items()
+            }
+            chunk = SearchSpace.configs_from_arrays(chunk_arrays)
+            perfs = evaluator.evaluate_batch(
+                chunk, parallel_workers=self.parallel_workers, arrays=chunk_arrays
+            )
 
-            # Update best
-            is_best = self._update_best(config, score, metrics)
+            for config, perf in zip(chunk, perfs):
+                evaluation_count += 1
+                self._process_evaluation(evaluation_count, config, perf)
 
-            status = "*** BEST ***" if is_best else ""
-            print(
-                f"  [{evaluation_count}] TP={config.tp_size}, DP={config.dp_size}, "
-                f"EP={config.ep_size}, BS={config.batch_size}, Mode={config.mode.name}, "
-                f"Score={score:.4f}, TTFT={metrics['ttft_ms']:.2f}ms, "
-                f"TPS={metrics['throughput_tps']:.2f} {status}"
+            self._save_checkpoint(
+                position=evaluation_count,
+                elapsed_seconds=previous_time + time.time() - start_time,
             )
+            if self._check_stop():
+                break
 
-        total_time = time.time() - start_time
+        self.progress.finish()
+        if self._stop_reason is None and evaluation_count < size:
+            print(f"Reached max evaluations limit ({self.max_evaluations})")
+            self._stop_reason = "max_evaluations"
+
+        total_time = previous_time + time.time() - start_time
+        self._save_checkpoint(
+            force=True, position=evaluation_count, elapsed_seconds=total_time
+        )
         print(f"\nGrid search completed in {total_time:.2f}s")
         print(f"Total evaluations: {evaluation_count}")
         print(f"Best score: {self._best_score:.4f}")
@@ -0,0 +1,79 @@
+"""
+Pareto optimizer - exhaustive search keeping the latency/throughput/GPU-count frontier
+"""
+
+from typing import Any, Dict, Optional
+
+from src.arch.config import ScheduleConfig
+from src.arch.perf.model_perf import ModelPerformance
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.optimizers.grid_search import GridSearchOptimizer
+from src.optimization.pareto import PARETO_OBJECTIVES, ParetoArchive
+from src.optimization.results import OptimizationResult
+
+
+class ParetoOptimizer(GridSearchOptimizer):
+    """
+    Multi-objective grid search
+
+    Evaluates the search space like GridSearchOptimizer, but also keeps the
+    non-dominated set over (TTFT/TPOT, throughput per GPU, GPU count) in a
+    ParetoArchive. The result carries the whole frontier; its knee point is reported
+    as the best configuration.
+    """
+
+    def optimize(self, evaluator: PerformanceEvaluator) -> OptimizationResult:
+        """
+        Run Pareto search
+
+        Args:
+            evaluator: Performance evaluator
+
+        Returns:
+            Optimization result with pareto_front and knee_index set
+        """
+        self._archive = ParetoArchive([sense for _, sense in PARETO_OBJECTIVES])
+        result = super().optimize(evaluator)
+
+        result.pareto_front = [step for _, step in self._archive.get_front()]
+        result.knee_index = self._archive.get_knee_index()
+        knee = result.get_knee_step()
+        if knee is not None:
+            result.best_config = knee.config
+            result.best_metrics = knee.metrics
+
+        print(f"Pareto front: {len(result.pareto_front)} configurations")
+        return result
+
+    def _get_checkpoint_state(self) -> Dict[str, Any]:
+        state = super()._get_checkpoint_state()
+        state["archive"] = self._archive
+        return state
+
+    def _restore_checkpoint_state(self, state: Dict[str, Any]) -> None:
+        super()._restore_checkpoint_state(state)
+        self._archive = state["archive"]
+
+    def _get_metrics(
+        self, config: ScheduleConfig, perf: ModelPerformance
+    ) -> Dict[str, float]:
+        """Standard metrics plus the frontier objectives"""
+        metrics = super()._get_metrics(config, perf)
+        metrics["throughput_per_gpu"] = perf.get_throughput_single_gpu()
+        metrics["num_gpus"] = config.tp_size * config.dp_size
+        return metrics
+
+    def _process_evaluation(
+        self,
+        evaluation_count: int,
+        config: ScheduleConfig,
+        perf: Optional[ModelPerformance],
+    ) -> Optional[float]:
+        """Score and record a configuration, then offer it to the Pareto archive"""
+        score = super()._process_evaluation(evaluation_count, config, perf)
+        if score is None:
+            return None
+
+        step = self._optimization_history[-1]
+        self._archive.add([step.metrics[name] for name, _ in PARETO_OBJECTIVES], step)
+        return score
@@ -0,0 +1,100 @@
+"""
+Pareto archive - incremental non-dominated set for multi-objective search
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Default frontier objectives: (metric name, sense)
+PARETO_OBJECTIVES = (
+    ("ttft_ms", "min"),
+    ("throughput_per_gpu", "max"),
+    ("num_gpus", "min"),
+)
+
+
+class ParetoArchive:
+    """
+    Incrementally maintained set of non-dominated points
+
+    Each insertion is checked against the current front only (not the full history)
+    with one vectorized dominance test, and the points it dominates are dropped.
+    """
+
+    def __init__(self, senses: Sequence[str]):
+        """
+        Args:
+            senses: "min" or "max" per objective
+        """
+        for sense in senses:
+            if sense not in ("min", "max"):
+                raise ValueError(f"Objective sense must be 'min' or 'max': {sense}")
+        self.senses = list(senses)
+        # Internally every objective is minimized
+        self._signs = np.array([1.0 if sense == "min" else -1.0 for sense in senses])
+        self._points = np.empty((0, len(senses)))
+        self._items: List[Any] = []
+
+    def add(self, values: Sequence[float], item: Any = None) -> bool:
+        """
+        Offer a point to the archive
+
+        Args:
+            values: Objective values, in the order of senses
+            item: Payload kept alongside the point
+
+        Returns:
+            True if the point is non-dominated and was added
+        """
+        point = np.asarray(values, dtype=float) * self._signs
+        if point.shape != (len(self.senses),) or np.isnan(point).any():
+            return False
+
+        # Rejected if any archived point is at least as good in every objective
+        if len(self._items) and np.all(self._points <= point, axis=1).any():
+            return False
+
+        dominated = np.all(point <= self._points, axis=1)
+        if dominated.any():
+            keep = ~dominated
+            self._points = self._points[keep]
+            self._items = [item for item, kept in zip(self._items, keep) if kept]
+
+        self._points = np.vstack([self._points, point])
+        self._items.append(item)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get_front(self) -> List[Tuple[Tuple[float, ...], Any]]:
+        """
+        Get the non-dominated points, sorted by the first objective
+
+        Returns:
+            List of (objective values, item)
+        """
+        values = self._points * self._signs
+        order = np.lexsort(self._points.T[::-1]) if len(self._items) else []
+        return [(tuple(values[i].tolist()), self._items[i]) for i in order]
+
+    def get_knee_index(self) -> Optional[int]:
+        """
+        Get the knee point of the front (index into get_front())
+
+        The knee is the point closest to the ideal point after normalizing every
+        objective to [0, 1] over the front, i.e. the most balanced trade-off.
+
+        Returns:
+            Index of the knee point, or None if the archive is empty
+        """
+        if not self._items:
+            return None
+        order = np.lexsort(self._points.T[::-1])
+        points = self._points[order]
+        low = points.min(axis=0)
+        span = points.max(axis=0) - low
+        span[span == 0] = 1.0
+        distances = np.linalg.norm((points - low) / span, axis=1)
+        return int(np.argmin(distances))
@@ -0,0 +1,264 @@
+"""
+Progress reporting - throttled status line and JSONL events for optimization runs
+"""
+
+import json
+import sys
+import time
+from typing import Dict, Optional, TextIO
+
+from src.arch.config import ScheduleConfig
+from src.optimization.results_store import config_to_dict
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as H:MM:SS"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600}:{seconds // 60 % 60:02d}:{seconds % 60:02d}"
+
+
+class ProgressReporter:
+    """
+    Progress of an optimization run
+
+    Instead of one line per evaluated configuration, a status line (evaluations,
+    rate, cache hit rate, best score so far, ETA) is refreshed at most every
+    interval_seconds: in place on a terminal, as periodic summary lines otherwise.
+    With verbose set, every configuration is printed as well (and the in-place line
+    is disabled so the two don't interleave).
+
+    With events_path set, machine-readable JSON Lines events are written to that
+    file: "start", throttled "progress", "best" on every new best configuration, and
+    "finish".
+    """
+
+    def __init__(
+        self,
+        verbose: bool = False,
+        events_path: Optional[str] = None,
+        interval_seconds: Optional[float] = None,
+        stream: Optional[TextIO] = None,
+    ):
+        """
+        Args:
+            verbose: Print every evaluated configuration
+            events_path: JSON Lines file receiving progress events (None to disable)
+            interval_seconds: Minimum time between two status updates (default 0.5s
+                on a terminal, 30s otherwise)
+            stream: Output stream (default sys.stdout)
+        """
+        self.verbose = verbose
+        self.events_path = events_path
+        self.stream = stream if stream is not None else sys.stdout
+        self._in_place = not verbose and self.stream.isatty()
+        if interval_seconds is None:
+            interval_seconds = 0.5 if self.stream.isatty() else 30.0
+        self.interval_seconds = interval_seconds
+        self._events: Optional[TextIO] = None
+        self._evaluator = None
+        self._reset(total=None, completed=0)
+
+    def _reset(self, total: Optional[int], completed: int) -> None:
+        self.total = total
+        self.evaluations = completed
+        self.failures = 0
+        self.best_score = float("inf")
+        self._initial = completed
+        self._start_time = time.time()
+        self._last_report = self._start_time
+        self._cache_counts = (0, 0)
+        self._line_width = 0
+
+    def start(
+        self,
+        total: Optional[int] = None,
+        evaluator=None,
+        completed: int = 0,
+        best_score: float = float("inf"),
+    ) -> None:
+        """
+        Begin reporting a run
+
+        Args:
+            total: Number of evaluations expected (None if unknown, disables the ETA)
+            evaluator: PerformanceEvaluator whose cache hit rate is reported
+            completed: Evaluations done before this run (e.g. restored from a checkpoint)
+            best_score: Best score of those evaluations
+        """
+        self._reset(total=total, completed=completed)
+        self.best_score = best_score
+        self._evaluator = evaluator
+        if evaluator is not None:
+            self._cache_counts = (evaluator.cache_hits, evaluator.cache_misses)
+        if self.events_path is not None and self._events is None:
+            self._events = open(self.events_path, "a")
+        self._emit("start", total=total, completed=completed)
+
+    def update(
+        self,
+        evaluation_count: int,
+        config: ScheduleConfig,
+        score: Optional[float],
+        metrics: Optional[Dict[str, float]] = None,
+        is_best: bool = False,
+    ) -> None:
+        """
+        Report one evaluated configuration
+
+        Args:
+            evaluation_count: Number of the evaluation within the run
+            config: Evaluated configuration
+            score: Its score, or None if the evaluation failed
+            metrics: Its metrics (unused for failed evaluations)
+            is_best: Whether it is the new best configuration
+        """
+        self.evaluations += 1
+        if score is None:
+            self.failures += 1
+        elif is_best:
+            self.best_score = score
+            self._emit(
+                "best",
+                evaluation=evaluation_count,
+                score=score,
+                config=config_to_dict(config),
+                metrics=metrics,
+            )
+
+        if self.verbose:
+            self._print_evaluation(evaluation_count, config, score, metrics, is_best)
+
+        now = time.time()
+        if now - self._last_report >= self.interval_seconds:
+            self._last_report = now
+            self._report(self.get_stats(now))
+
+    def log(self, message: str) -> None:
+        """Print a message without garbling the in-place status line"""
+        if self._in_place and self._line_width:
+            self.stream.write("\r" + " " * self._line_width + "\r")
+            self._line_width = 0
+        print(message, file=self.stream)
+
+    def finish(self) -> Dict[str, Optional[float]]:
+        """
+        End reporting a run
+
+        Returns:
+            Final statistics (see get_stats)
+        """
+        stats = self.get_stats()
+        if not self.verbose and stats["evaluations"] > self._initial:
+            self._write_status(stats)
+        if self._in_place and self._line_width:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._line_width = 0
+        self._emit("finish", **stats)
+        if self._events is not None:
+            self._events.close()
+            self._events = None
+        return stats
+
+    def get_stats(self, now: Optional[float] = None) -> Dict[str, Optional[float]]:
+        """
+        Current statistics of the run
+
+        Returns:
+            Dictionary with evaluations, failures, elapsed_seconds,
+            evaluations_per_second, cache_hit_rate, best_score and eta_seconds
+            (None where unknown)
+        """
+        elapsed = (now or time.time()) - self._start_time
+        done = self.evaluations - self._initial
+        rate = done / elapsed if elapsed > 0 else None
+
+        cache_hit_rate = None
+        if self._evaluator is not None:
+            hits = self._evaluator.cache_hits - self._cache_counts[0]
+            misses = self._evaluator.cache_misses - self._cache_counts[1]
+            if hits + misses:
+                cache_hit_rate = hits / (hits + misses)
+
+        eta = None
+        if self.total is not None and rate:
+            eta = max(0, self.total - self.evaluations) / rate
+
+        return {
+            "evaluations": self.evaluations,
+            "total": self.total,
+            "failures": self.failures,
+            "elapsed_seconds": elapsed,
+            "evaluations_per_second": rate,
+            "cache_hit_rate": cache_hit_rate,
+            "best_score": self.best_score if self.best_score != float("inf") else None,
+            "eta_seconds": eta,
+        }
+
+    def _report(self, stats: Dict[str, Optional[float]]) -> None:
+        """Write the status line and a progress event"""
+        self._emit("progress", **stats)
+        if not self.verbose:
+            self._write_status(stats)
+
+    def _write_status(self, stats: Dict[str, Optional[float]]) -> None:
+        """Write the status line"""
+        if stats["total"]:
+            parts = [
+                f"{stats['evaluations']}/{stats['total']} "
+                f"({100.0 * stats['evaluations'] / stats['total']:.1f}%)"
+            ]
+        else:
+            parts = [f"{stats['evaluations']} evaluations"]
+        if stats["evaluations_per_second"] is not None:
+            parts.append(f"{stats['evaluations_per_second']:.1f} eval/s")
+        if stats["cache_hit_rate"] is not None:
+            parts.append(f"cache hits {100.0 * stats['cache_hit_rate']:.1f}%")
+        if stats["failures"]:
+            parts.append(f"{stats['failures']} failed")
+        if stats["best_score"] is not None:
+            parts.append(f"best {stats['best_score']:.4f}")
+        if stats["eta_seconds"] is not None:
+            parts.append(f"ETA {format_duration(stats['eta_seconds'])}")
+        line = "  " + ", ".join(parts)
+
+        if self._in_place:
+            self.stream.write("\r" + line.ljust(self._line_width))
+            self._line_width = len(line)
+        else:
+            self.stream.write(line + "\n")
+        self.stream.flush()
+
+    def _print_evaluation(
+        self,
+        evaluation_count: int,
+        config: ScheduleConfig,
+        score: Optional[float],
+        metrics: Optional[Dict[str, float]],
+        is_best: bool,
+    ) -> None:
+        """Print one evaluated configuration (verbose mode)"""
+        if score is None:
+            print(
+                f"  [{evaluation_count}] Config failed: TP={config.tp_size}, DP={config.dp_size}, "
+                f"EP={config.ep_size}, BS={config.batch_size}",
+                file=self.stream,
+            )
+            return
+        status = "*** BEST ***" if is_best else ""
+        print(
+            f"  [{evaluation_count}] TP={config.tp_size}, DP={config.dp_size}, "
+            f"EP={config.ep_size}, BS={config.batch_size}, Mode={config.mode.name}, "
+            f"Score={score:.4f}, TTFT={metrics['ttft_ms']:.2f}ms, "
+            f"TPS={metrics['throughput_tps']:.2f} {status}",
+            file=self.stream,
+        )
+
+    def _emit(self, event: str, **fields) -> None:
+        """Write one JSON Lines event"""
+        if self._events is None:
+            return
+        record = {"event": event, "time": time.time()}
+        record.update(fields)
+        self._events.write(json.dumps(record) + "\n")
+        self._events.flush()
@@ -2,8 +2,12 @@
 Optimization results data structures
 """
 
+import csv
 from dataclasses import dataclass, field
-from typing import Dict, List
+from enum import Enum
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
 
 from src.arch.config import ScheduleConfig
 
@@ -24,28 +28,54 @@ class OptimizationResult:
 
     best_config: ScheduleConfig
     best_metrics: Dict[str, float]
-    optimization_history: List[OptimizationStep] = field(default_factory=list)
+    # A plain list or a ColumnarHistory (see src.optimization.history)
+    optimization_history: Sequence[OptimizationStep] = field(default_factory=list)
     total_evaluations: int = 0
     total_time_seconds: float = 0.0
     search_space_size: int = 0
+    # Non-dominated configurations (multi-objective search only), with the knee point
+    pareto_front: List[OptimizationStep] = field(default_factory=list)
+    knee_index: Optional[int] = None
+    # Configurations skipped because their lower bound could not beat the best
+    pruned_evaluations: int = 0
+    # Configurations skipped because their operator graph cannot be built
+    unbuildable_configurations: int = 0
+    # Criterion that ended the run (see optimizers.base.STOP_REASONS), if any
+    stop_reason: Optional[str] = None
+
+    def get_knee_step(self) -> Optional[OptimizationStep]:
+        """Get the knee point of the Pareto front, if one was computed"""
+        if self.knee_index is None or not self.pareto_front:
+            return None
+        return self.pareto_front[self.knee_index]
+
+    def _get_column(self, name: str) -> np.ndarray:
+        """Get a history column as an array (vectorized for a ColumnarHistory)"""
+        history = self.optimization_history
+        if hasattr(history, "columns"):
+            return history.columns([name])[name]
+        return np.array([getattr(step, name) for step in history])
 
     def get_best_score(self) -> float:
         """Get the best score achieved"""
         if self.optimization_history:
-            return min(step.score for step in self.optimization_history)
+            return float(self._get_column("score").min())
         return float("inf")
 
+    def get_top_k(self, k: int) -> List[OptimizationStep]:
+        """Get the k best steps, best first"""
+        history = self.optimization_history
+        if hasattr(history, "top_k"):
+            return history.top_k(k)
+        return sorted(history, key=lambda step: step.score)[:k]
+
     def get_improvement_history(self) -> List[tuple]:
         """Get list of (iteration, score) tuples showing improvement over time"""
         if not self.optimization_history:
             return []
 
-        history = []
-        best_so_far = float("inf")
-        for step in self.optimization_history:
-            best_so_far = min(best_so_far, step.score)
-            history.append((step.iteration, best_so_far))
-        return history
+        best_so_far = np.minimum.accumulate(self._get_column("score").astype(float))
+        return list(zip(self._get_column("iteration").tolist(), best_so_far.tolist()))
 
 
 @dataclass
@@ -76,6 +106,63 @@ class SensitivityAnalysisResult:
         return self.param_values[best_start], self.param_values[best_end]
 
 
+@dataclass
+class SensitivityGrid:
+    """Metrics over a grid of one or two parameters around a base configuration"""
+
+    param_names: List[str]
+    # Values per parameter, one axis of every metric array each
+    param_values: List[List]
+    base_config: ScheduleConfig
+    # Metric name -> array of shape (len(values_0), [len(values_1)]), NaN where the
+    # configuration failed to evaluate
+    metrics: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    def get_best(self) -> Optional[Tuple[tuple, float]]:
+        """
+        Get the grid point with the lowest score
+
+        Returns:
+            (parameter values, score), or None if every point failed
+        """
+        scores = self.metrics["score"]
+        if np.all(np.isnan(scores)):
+            return None
+        index = np.unravel_index(np.nanargmin(scores), scores.shape)
+        values = tuple(
+            axis_values[i] for axis_values, i in zip(self.param_values, index)
+        )
+        return values, float(scores[index])
+
+    def save(self, path: str) -> None:
+        """
+        Write the grid to a .npz file (one array per metric plus the parameter
+        values as param_<name>) or a .csv file (one row per grid point)
+
+        Args:
+            path: Output file path
+        """
+        labels = [
+            [value.name if isinstance(value, Enum) else value for value in values]
+            for values in self.param_values
+        ]
+        if path.endswith(".csv"):
+            names = list(self.metrics)
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(self.param_names + names)
+                for index in np.ndindex(*self.metrics["score"].shape):
+                    point = [labels[axis][i] for axis, i in enumerate(index)]
+                    writer.writerow(
+                        point + [float(self.metrics[name][index]) for name in names]
+                    )
+        else:
+            arrays = dict(self.metrics)
+            for name, values in zip(self.param_names, labels):
+                arrays[f"param_{name}"] = np.asarray(values)
+            np.savez(path, **arrays)
+
+
 @dataclass
 class RecommendedConfig:
     """Recommended configuration with explanation"""
@@ -84,3 +171,61 @@ class RecommendedConfig:
     metrics: Dict[str, float]
     priority: str  # "latency", "throughput", "balanced"
     explanation: str = ""
+
+
+@dataclass
+class DisaggregatedDeployment:
+    """Prefill and decode instance configurations served together in a P:D ratio"""
+
+    prefill_config: ScheduleConfig
+    decode_config: ScheduleConfig
+    # Instances of each role in one deployment unit (the P:D ratio)
+    num_prefill: int
+    num_decode: int
+    # GPUs of one instance (tp_size * dp_size)
+    prefill_gpus: int
+    decode_gpus: int
+    # Prefill forward pass, KV cache transfer and TTFT (their sum) of a request
+    prefill_ms: float
+    kv_transfer_ms: float
+    ttft_ms: float
+    tpot_ms: float
+    # Requests per second of one instance of each role
+    prefill_rps: float
+    decode_rps: float
+    # Requests per second of the deployment unit, all within the SLOs
+    goodput_rps: float
+
+    @property
+    def total_gpus(self) -> int:
+        """GPUs of the deployment unit"""
+        return self.num_prefill * self.prefill_gpus + self.num_decode * self.decode_gpus
+
+    @property
+    def goodput_per_gpu(self) -> float:
+        """Requests per second per GPU"""
+        return self.goodput_rps / self.total_gpus
+
+
+@dataclass
+class DisaggregationResult:
+    """Result of a joint prefill/decode disaggregation search"""
+
+    prompt_len: int
+    output_len: int
+    ttft_slo_ms: Optional[float]
+    tpot_slo_ms: Optional[float]
+    # Best deployment of each (prefill, decode) configuration pair, best first
+    deployments: List[DisaggregatedDeployment] = field(default_factory=list)
+    # Configurations evaluated per role, and those meeting their SLO and memory
+    prefill_candidates: int = 0
+    prefill_feasible: int = 0
+    decode_candidates: int = 0
+    decode_feasible: int = 0
+    # (prefill, decode, P:D ratio) combinations scored
+    combinations: int = 0
+    total_time_seconds: float = 0.0
+
+    def get_best(self) -> Optional[DisaggregatedDeployment]:
+        """Get the deployment with the highest goodput per GPU, if any is feasible"""
+        return self.deployments[0] if self.deployments else None
@@ -0,0 +1,316 @@
+"""
+Results store - raw per-configuration metrics of a sweep, re-scorable under any objective
+"""
+
+import json
+import os
+import time
+from dataclasses import fields
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.arch.config import ScheduleConfig
+from src.arch.model_type import ForwardMode
+from src.arch.perf.model_perf import ModelPerformance
+from src.optimization.constraints import Constraint
+from src.optimization.history import ColumnarHistory
+from src.optimization.objective import BaseObjective
+from src.optimization.pareto import PARETO_OBJECTIVES, ParetoArchive
+from src.optimization.results import OptimizationResult, OptimizationStep
+
+# Header fields that must agree between shards of one sweep (see ResultsStore.merge)
+RUN_METADATA_FIELDS = ("model_type", "hardware", "max_seqlen", "search_space")
+
+# Aggregated ModelPerformance fields persisted per configuration; every objective
+# only reads these (plus the schedule config)
+RAW_FIELDS = (
+    "model_name",
+    "forward_mode",
+    "ttft",
+    "total_time",
+    "total_compute_time",
+    "total_memory_time",
+    "total_transfer_time",
+    "model_total_mem_occupy",
+)
+
+# Names of the metrics returned by get_raw_metrics
+RAW_METRIC_NAMES = (
+    "ttft_ms",
+    "throughput_tps",
+    "throughput_per_gpu",
+    "total_time_ms",
+    "compute_time_ms",
+    "memory_time_ms",
+    "transfer_time_ms",
+    "weight_memory_gb",
+    "num_gpus",
+)
+
+
+def get_raw_metrics(perf: ModelPerformance) -> Dict[str, float]:
+    """
+    Objective-independent metrics of an evaluated configuration
+
+    These are the names SLA filters refer to (see ResultsStore.rescore).
+
+    Args:
+        perf: Model performance
+
+    Returns:
+        Dictionary of metric name -> value
+    """
+    config = perf.schedule_config
+    return {
+        "ttft_ms": perf.get_ttft_or_tpot(),
+        "throughput_tps": perf.get_throughput(),
+        "throughput_per_gpu": perf.get_throughput_single_gpu(),
+        "total_time_ms": perf.total_time / 1000.0,
+        "compute_time_ms": perf.total_compute_time / 1000.0,
+        "memory_time_ms": perf.total_memory_time / 1000.0,
+        "transfer_time_ms": perf.total_transfer_time / 1000.0,
+        "weight_memory_gb": perf.model_total_mem_occupy / (1024**3),
+        "num_gpus": config.tp_size * config.dp_size,
+    }
+
+
+def config_to_dict(config: ScheduleConfig) -> dict:
+    """Serialize a ScheduleConfig to JSON-compatible values"""
+    data = {field.name: getattr(config, field.name) for field in fields(config)}
+    data["mode"] = config.mode.name
+    return data
+
+
+def config_from_dict(data: dict) -> ScheduleConfig:
+    """Inverse of config_to_dict"""
+    values = dict(data)
+    if "mode" in values:
+        values["mode"] = ForwardMode[values["mode"]]
+    return ScheduleConfig(**values)
+
+
+class ResultsStore:
+    """
+    Append-only JSON Lines file of raw evaluation results
+
+    The first line holds run metadata, each following line one evaluated
+    configuration with its aggregated ModelPerformance fields (or null if the
+    evaluation failed). Records are written as they arrive, so a store can be
+    re-scored under any objective, constraint or SLA filter without re-evaluating.
+    """
+
+    def __init__(
+        self, path: str, metadata: Optional[dict] = None, append: bool = False
+    ):
+        """
+        Args:
+            path: File path (overwritten when the first record is added)
+            metadata: Run description stored in the header (model, hardware, ...)
+            append: Add records to an existing file instead (e.g. a resumed run)
+        """
+        self.path = path
+        self.metadata = metadata or {}
+        self.append = append
+        self.count = 0
+        self._file = None
+
+    def add(self, config: ScheduleConfig, perf: Optional[ModelPerformance]) -> None:
+        """
+        Append one evaluated configuration
+
+        Args:
+            config: Evaluated configuration
+            perf: Its performance, or None if the evaluation failed
+        """
+        if self._file is None:
+            has_header = (
+                self.append
+                and os.path.exists(self.path)
+                and os.path.getsize(self.path) > 0
+            )
+            self._file = open(self.path, "a" if has_header else "w")
+            if not has_header:
+                self._file.write(json.dumps({"metadata": self.metadata}) + "\n")
+        raw = None
+        if perf is not None:
+            raw = {name: getattr(perf, name) for name in RAW_FIELDS}
+        record = {"config": config_to_dict(config), "perf": raw}
+        self._file.write(json.dumps(record) + "\n")
+        self.count += 1
+
+    def close(self) -> None:
+        """Flush and close the file"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "ResultsStore":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @staticmethod
+    def read_metadata(path: str) -> dict:
+        """Read the header of a store file"""
+        with open(path) as f:
+            return json.loads(f.readline()).get("metadata", {})
+
+    @staticmethod
+    def iter_records(
+        path: str,
+    ) -> Iterator[Tuple[ScheduleConfig, Optional[ModelPerformance]]]:
+        """
+        Stream the records of a store file
+
+        Args:
+            path: Store file path
+
+        Yields:
+            (configuration, performance summary or None if it failed)
+        """
+        with open(path) as f:
+            f.readline()
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                config = config_from_dict(record["config"])
+                raw = record["perf"]
+                perf = None
+                if raw is not None:
+                    perf = ModelPerformance(schedule_config=config, **raw)
+                yield config, perf
+
+    @staticmethod
+    def rescore(
+        path: str,
+        objective: BaseObjective,
+        constraints: Optional[List[Constraint]] = None,
+    ) -> OptimizationResult:
+        """
+        Score a stored sweep under another objective
+
+        Constraints are checked against the configuration, with the raw metrics
+        (see get_raw_metrics) as context, so an SLA is a constraint on a metric name,
+        e.g. RangeConstraint("ttft_ms", max_value=50). Configurations stored more
+        than once (e.g. evaluated again after resuming from a checkpoint) count once.
+
+        Args:
+            path: Store file path
+            objective: Objective to apply
+            constraints: Configuration constraints and SLA filters
+
+        Returns:
+            Optimization result over the configurations passing all constraints
+        """
+        return _score_records(ResultsStore.iter_records(path), objective, constraints)
+
+    @staticmethod
+    def merge(
+        paths: Sequence[str],
+        objective: BaseObjective,
+        constraints: Optional[List[Constraint]] = None,
+    ) -> OptimizationResult:
+        """
+        Combine the stores of a sharded sweep into one result
+
+        The best configuration is global under the objective; the Pareto front over
+        PARETO_OBJECTIVES (with its knee point) is computed across all shards.
+        Configurations stored more than once (e.g. by a restarted shard) count once.
+
+        Args:
+            paths: Store files of the shards
+            objective: Objective to apply
+            constraints: Configuration constraints and SLA filters (see rescore)
+
+        Returns:
+            Optimization result with pareto_front and knee_index set
+
+        Raises:
+            ValueError: If the stores were written by different sweeps
+        """
+        if not paths:
+            raise ValueError("No results files to merge")
+        reference = ResultsStore.read_metadata(paths[0])
+        shards = set()
+        for path in paths:
+            metadata = ResultsStore.read_metadata(path)
+            for name in RUN_METADATA_FIELDS:
+                if metadata.get(name) != reference.get(name):
+                    raise ValueError(
+                        f"Cannot merge {path}: its {name} differs from {paths[0]}"
+                    )
+            if metadata.get("shard") is not None:
+                shards.add(tuple(metadata["shard"]))
+
+        counts = {count for _, count in shards}
+        if len(counts) == 1:
+            count = counts.pop()
+            missing = sorted(set(range(count)) - {index for index, _ in shards})
+            if missing:
+                print(
+                    f"Warning: shards {', '.join(map(str, missing))} of {count} "
+                    "are missing, the result covers part of the search space"
+                )
+
+        records = (
+            record for path in paths for record in ResultsStore.iter_records(path)
+        )
+        archive = ParetoArchive([sense for _, sense in PARETO_OBJECTIVES])
+        result = _score_records(records, objective, constraints, archive)
+        result.pareto_front = [step for _, step in archive.get_front()]
+        result.knee_index = archive.get_knee_index()
+        return result
+
+
+def _score_records(
+    records: Iterator[Tuple[ScheduleConfig, Optional[ModelPerformance]]],
+    objective: BaseObjective,
+    constraints: Optional[List[Constraint]] = None,
+    archive: Optional[ParetoArchive] = None,
+) -> OptimizationResult:
+    """
+    Score stored records (see ResultsStore.rescore), offering them to archive
+
+    Only the first record of each configuration is used: a resumed run or a
+    restarted shard stores again the configurations it evaluated between its last
+    checkpoint and the interruption.
+    """
+    start_time = time.time()
+    constraints = constraints or []
+    history = ColumnarHistory()
+    seen = set()
+
+    for config, perf in records:
+        key = tuple(config_to_dict(config).values())
+        if key in seen:
+            continue
+        seen.add(key)
+        if perf is None:
+            continue
+        raw_metrics = get_raw_metrics(perf)
+        context = dict(raw_metrics, max_seqlen=config.max_seqlen)
+        if not all(constraint.check(config, **context) for constraint in constraints):
+            continue
+
+        metrics = objective.get_metrics(perf)
+        metrics.update(raw_metrics)
+        step = OptimizationStep(
+            iteration=len(history) + 1,
+            config=config,
+            metrics=metrics,
+            score=objective.evaluate(perf),
+        )
+        history.append(step)
+        if archive is not None:
+            archive.add([metrics[name] for name, _ in PARETO_OBJECTIVES], step)
+
+    best = history.best()
+    return OptimizationResult(
+        best_config=best.config if best else ScheduleConfig(),
+        best_metrics=best.metrics if best else {},
+        optimization_history=history,
+        total_evaluations=len(history),
+        total_time_seconds=time.time() - start_time,
+        search_space_size=len(seen),
+    )
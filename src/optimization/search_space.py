@@ -2,7 +2,11 @@
 Search space definition and parameter generation for optimization
 """
 
-from typing import Iterator, List
+from dataclasses import dataclass, fields
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+import numpy as np
 
 from src.arch.config import ScheduleConfig
 from src.arch.model_type import ForwardMode
@@ -14,12 +18,26 @@ from src.optimization.constraints import (
     ProductConstraint,
 )
 
+# Feature flags that only affect MoE layers
+MOE_FLAG_NAMES = ("deepep", "enable_moe_dense_fully_dp")
+
+
+@dataclass
+class SearchDimension:
+    """A searched ScheduleConfig field and its candidate values"""
+
+    name: str
+    values: List[Any]
+
 
 class SearchSpace:
     """
     Defines the search space for parameter optimization.
 
     Manages parameter ranges and validates configurations against constraints.
+    Dimensions are enumerated as nested loops in declaration order, and every
+    constraint is checked at the outermost loop level where all of its attributes
+    are fixed, so invalid prefixes are pruned before the inner loops run.
     """
 
     def __init__(
@@ -27,20 +45,66 @@ class SearchSpace:
         config: SearchSpaceConfig,
         max_seqlen: int,
         is_moe_model: bool = False,
+        extra_dimensions: Optional[List[SearchDimension]] = None,
     ):
         """
         Initialize search space
 
         Args:
             config: Search space configuration
-            max_seqlen: Fixed maximum sequence length (used for constraint checking)
+            max_seqlen: Fixed maximum sequence length (used for constraint checking,
+                unless config searches max_seqlen)
             is_moe_model: Whether the model uses MoE (affects EP constraints)
+            extra_dimensions: Additional ScheduleConfig fields to search, enumerated
+                after the standard dimensions (a "max_seqlen" dimension overrides
+                the fixed value)
         """
         self.config = config
         self.max_seqlen = max_seqlen
         self.is_moe_model = is_moe_model
+        self._dimensions: List[SearchDimension] = self._build_dimensions(
+            extra_dimensions or []
+        )
         self._constraints: List[Constraint] = []
         self._build_constraints()
+        self._size: Optional[int] = None
+
+    def _build_dimensions(
+        self, extra_dimensions: List[SearchDimension]
+    ) -> List[SearchDimension]:
+        """Build the ordered list of searched dimensions"""
+        ep_values = self.config.get_ep_values()
+        if not self.is_moe_model:
+            # EP > 1 is meaningless for dense models
+            ep_values = [ep for ep in ep_values if not ep > 1]
+
+        modes = [
+            ForwardMode.EXTEND if mode_str == "extend" else ForwardMode.DECODE
+            for mode_str in self.config.get_mode_values()
+        ]
+
+        dimensions = [
+            SearchDimension("tp_size", self.config.get_tp_values()),
+            SearchDimension("dp_size", self.config.get_dp_values()),
+            SearchDimension("ep_size", ep_values),
+            SearchDimension("batch_size", self.config.get_batch_size_values()),
+            SearchDimension("mode", modes),
+        ]
+        for name, values in self.config.get_flag_values().items():
+            if not self.is_moe_model and name in MOE_FLAG_NAMES:
+                # Expert-parallel features have no effect on dense models
+                values = values[:1]
+            dimensions.append(SearchDimension(name, values))
+        seqlen_values = self.config.get_seqlen_values()
+        if seqlen_values:
+            dimensions.append(SearchDimension("max_seqlen", seqlen_values))
+        names = {dimension.name for dimension in dimensions}
+        for dimension in extra_dimensions:
+            if dimension.name in names:
+                raise ValueError(f"Duplicate search dimension: {dimension.name}")
+            names.add(dimension.name)
+            dimensions.append(dimension)
+        return dimensions
 
     def _build_constraints(self) -> None:
         """Build the list of constraints for this search space"""
@@ -86,6 +150,28 @@ class SearchSpace:
         """Get all constraints"""
         return self._constraints.copy()
 
+    def add_constraint(self, constraint: Constraint) -> None:
+        """Add a constraint to the search space"""
+        self._constraints.append(constraint)
+        self._size = None
+
+    def get_dimensions(self) -> List[SearchDimension]:
+        """Get the searched dimensions in enumeration order"""
+        return list(self._dimensions)
+
+    def _get_context(self) -> Dict[str, Any]:
+        """
+        Fixed values of the ScheduleConfig fields that are not searched
+
+        Constraints on these fields are checked against the values every generated
+        configuration gets: the fixed max_seqlen and the ScheduleConfig defaults.
+        """
+        defaults = ScheduleConfig(max_seqlen=self.max_seqlen)
+        context = {f.name: getattr(defaults, f.name) for f in fields(ScheduleConfig)}
+        for dimension in self._dimensions:
+            context.pop(dimension.name, None)
+        return context
+
     def validate(self, schedule_config: ScheduleConfig) -> tuple[bool, List[str]]:
         """
         Validate a configuration against all constraints
@@ -112,47 +198,194 @@ class SearchSpace:
         valid, _ = self.validate(schedule_config)
         return valid
 
+    def _plan_levels(self) -> tuple:
+        """
+        Assign each constraint to the loop level where it can first be checked
+
+        Returns:
+            Tuple of (constraints checked before any loop, constraints per level,
+            memoization attributes per level for counting)
+        """
+        names = [dimension.name for dimension in self._dimensions]
+        position = {name: index for index, name in enumerate(names)}
+
+        initial: List[Constraint] = []
+        per_level: List[List[Constraint]] = [[] for _ in names]
+        for constraint in self._constraints:
+            attributes = constraint.get_attributes()
+            if attributes is None:
+                # Needs the full configuration, check at the innermost level
+                level = len(names) - 1
+            else:
+                levels = [position[attr] for attr in attributes if attr in position]
+                level = max(levels) if levels else -1
+            if level < 0:
+                initial.append(constraint)
+            else:
+                per_level[level].append(constraint)
+
+        # The number of completions below a level only depends on the outer dimensions
+        # read by constraints at that level or deeper
+        memo_attributes = []
+        for level in range(len(names)):
+            needed = set()
+            for constraints in per_level[level:]:
+                for constraint in constraints:
+                    attributes = constraint.get_attributes()
+                    needed.update(names[:level] if attributes is None else attributes)
+            memo_attributes.append(
+                tuple(name for name in names[:level] if name in needed)
+            )
+        return initial, per_level, memo_attributes
+
+    def _check_all(self, constraints: List[Constraint], partial, context: dict) -> bool:
+        """Check constraints against a partially assigned configuration"""
+        for constraint in constraints:
+            if not constraint.check(partial, **context):
+                return False
+        return True
+
     def iterate_all(self) -> Iterator[ScheduleConfig]:
         """
         Iterate over all valid configurations in the search space
 
+        Configurations are generated lazily; prefixes violating a constraint are skipped
+        without enumerating the dimensions below them.
+
         Yields:
             ScheduleConfig: Valid configuration
         """
-        tp_values = self.config.get_tp_values()
-        dp_values = self.config.get_dp_values()
-        ep_values = self.config.get_ep_values()
-        batch_values = self.config.get_batch_size_values()
-        mode_values = self.config.get_mode_values()
-
-        iteration = 0
-        for tp in tp_values:
-            for dp in dp_values:
-                for ep in ep_values:
-                    for batch in batch_values:
-                        for mode_str in mode_values:
-                            # Skip EP > 1 for non-MoE models
-                            if not self.is_moe_model and ep > 1:
-                                continue
-
-                            mode = (
-                                ForwardMode.EXTEND
-                                if mode_str == "extend"
-                                else ForwardMode.DECODE
-                            )
-
-                            config = ScheduleConfig(
-                                tp_size=tp,
-                                dp_size=dp,
-                                ep_size=ep,
-                                batch_size=batch,
-                                max_seqlen=self.max_seqlen,
-                                mode=mode,
-                            )
-
-                            if self.is_valid(config):
-                                iteration += 1
-                                yield config
+        initial, per_level, _ = self._plan_levels()
+        context = self._get_context()
+        partial = SimpleNamespace(**context)
+        if not self._check_all(initial, partial, context):
+            return
+        yield from self._iterate_level(0, per_level, partial, context)
+
+    def _iterate_level(
+        self, level: int, per_level: List[List[Constraint]], partial, context: dict
+    ) -> Iterator[ScheduleConfig]:
+        """Enumerate one loop level of the search space"""
+        if level == len(self._dimensions):
+            yield ScheduleConfig(**vars(partial))
+            return
+
+        dimension = self._dimensions[level]
+        for value in dimension.values:
+            setattr(partial, dimension.name, value)
+            if self._check_all(per_level[level], partial, context):
+                yield from self._iterate_level(level + 1, per_level, partial, context)
+        vars(partial).pop(dimension.name, None)
+
+    def count(self) -> int:
+        """
+        Count valid configurations without materializing them
+
+        Subtrees are counted once per distinct value of the outer dimensions that
+        deeper constraints depend on, so unconstrained inner dimensions contribute a
+        simple product.
+
+        Returns:
+            Number of valid configurations
+        """
+        if self._size is None:
+            initial, per_level, memo_attributes = self._plan_levels()
+            context = self._get_context()
+            partial = SimpleNamespace(**context)
+            if not self._check_all(initial, partial, context):
+                self._size = 0
+            else:
+                self._size = self._count_level(
+                    0, per_level, memo_attributes, partial, context, {}
+                )
+        return self._size
+
+    def _count_level(
+        self,
+        level: int,
+        per_level: List[List[Constraint]],
+        memo_attributes: List[tuple],
+        partial,
+        context: dict,
+        memo: dict,
+    ) -> int:
+        """Count the valid completions of a partial assignment"""
+        if level == len(self._dimensions):
+            return 1
+
+        key = (level,) + tuple(
+            getattr(partial, name) for name in memo_attributes[level]
+        )
+        if key in memo:
+            return memo[key]
+
+        dimension = self._dimensions[level]
+        total = 0
+        for value in dimension.values:
+            setattr(partial, dimension.name, value)
+            if self._check_all(per_level[level], partial, context):
+                total += self._count_level(
+                    level + 1, per_level, memo_attributes, partial, context, memo
+                )
+        vars(partial).pop(dimension.name, None)
+
+        memo[key] = total
+        return total
+
+    def get_grid_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Get all valid configurations as column arrays
+
+        The Cartesian product is built one dimension at a time and filtered with the
+        vectorized Constraint.mask after each level, so rejected prefixes are never
+        expanded. Points are in iterate_all order; modes are ForwardMode integer values.
+
+        Returns:
+            ScheduleConfig field name -> 1-D array, one entry per valid configuration
+            (includes max_seqlen)
+        """
+        initial, per_level, _ = self._plan_levels()
+        context = self._get_context()
+
+        size = 1
+        columns: Dict[str, np.ndarray] = {}
+        if not self._check_all(initial, SimpleNamespace(**context), context):
+            size = 0
+        for level, dimension in enumerate(self._dimensions):
+            values = np.asarray(
+                [
+                    value.value if isinstance(value, ForwardMode) else value
+                    for value in dimension.values
+                ]
+            )
+            columns = {
+                name: np.repeat(column, len(values)) for name, column in columns.items()
+            }
+            columns[dimension.name] = np.tile(values, size)
+            size *= len(values)
+
+            keep = np.ones(size, dtype=bool)
+            for constraint in per_level[level]:
+                keep &= constraint.mask(columns, **context)
+            if not keep.all():
+                columns = {name: column[keep] for name, column in columns.items()}
+                size = int(keep.sum())
+
+        if "max_seqlen" not in columns:
+            columns["max_seqlen"] = np.full(size, self.max_seqlen, dtype=np.int64)
+        return columns
+
+    @staticmethod
+    def configs_from_arrays(arrays: Dict[str, np.ndarray]) -> List[ScheduleConfig]:
+        """Convert column arrays (see get_grid_arrays) back to ScheduleConfig objects"""
+        names = list(arrays.keys())
+        configs = []
+        for row in zip(*(arrays[name].tolist() for name in names)):
+            values = dict(zip(names, row))
+            if "mode" in values:
+                values["mode"] = ForwardMode(values["mode"])
+            configs.append(ScheduleConfig(**values))
+        return configs
 
     def get_valid_configs(self) -> List[ScheduleConfig]:
         """Get all valid configurations as a list"""
@@ -160,7 +393,7 @@ class SearchSpace:
 
     def get_search_space_size(self) -> int:
         """Get the total number of valid configurations"""
-        return len(self.get_valid_configs())
+        return self.count()
 
     def filter_by_memory(
         self,
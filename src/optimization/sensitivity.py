@@ -0,0 +1,90 @@
+"""
+Sensitivity analysis - batched sweeps of one or two parameters around a base configuration
+"""
+
+import dataclasses
+import itertools
+from typing import Dict, Sequence
+
+import numpy as np
+
+from src.arch.config import ScheduleConfig
+from src.arch.model_type import ForwardMode
+from src.optimization.evaluator import PerformanceEvaluator
+from src.optimization.objective import BaseObjective
+from src.optimization.results import SensitivityGrid
+from src.optimization.results_store import RAW_METRIC_NAMES, get_raw_metrics
+
+# Metrics recorded per grid point: the objective score plus the raw metrics
+SENSITIVITY_METRICS = ("score",) + RAW_METRIC_NAMES
+
+
+def run_sensitivity_grid(
+    evaluator: PerformanceEvaluator,
+    objective: BaseObjective,
+    base_config: ScheduleConfig,
+    params: Dict[str, Sequence],
+    parallel_workers: int = 1,
+) -> SensitivityGrid:
+    """
+    Evaluate every combination of one or two parameters around a base configuration
+
+    Each grid point is the base configuration with only the swept fields replaced,
+    so all other fields (including the feature flags) keep their base values. All
+    points are evaluated as one batch (in parallel when workers > 1).
+
+    Args:
+        evaluator: Performance evaluator
+        objective: Objective providing the score metric
+        base_config: Configuration to vary from
+        params: ScheduleConfig field name -> values, one or two entries
+        parallel_workers: Number of parallel evaluation workers
+
+    Returns:
+        Sensitivity grid with one axis per parameter, in the order of params
+    """
+    if not 1 <= len(params) <= 2:
+        raise ValueError(
+            f"Sensitivity analysis sweeps one or two parameters, got {len(params)}"
+        )
+    field_names = {field.name for field in dataclasses.fields(ScheduleConfig)}
+    names = list(params)
+    values = []
+    for name in names:
+        if name not in field_names:
+            raise ValueError(f"Unknown ScheduleConfig parameter: {name}")
+        axis_values = list(params[name])
+        if not axis_values:
+            raise ValueError(f"No values given for parameter: {name}")
+        if name == "mode":
+            axis_values = [
+                ForwardMode[value.upper()] if isinstance(value, str) else value
+                for value in axis_values
+            ]
+        values.append(axis_values)
+
+    configs = [
+        dataclasses.replace(base_config, **dict(zip(names, point)))
+        for point in itertools.product(*values)
+    ]
+    print(
+        f"Analyzing sensitivity of {' x '.join(names)} over {len(configs)} "
+        "configurations..."
+    )
+    perfs = evaluator.evaluate_batch(configs, parallel_workers=parallel_workers)
+
+    metrics = {name: np.full(len(configs), np.nan) for name in SENSITIVITY_METRICS}
+    for i, perf in enumerate(perfs):
+        if perf is None:
+            continue
+        metrics["score"][i] = objective.evaluate(perf)
+        for name, value in get_raw_metrics(perf).items():
+            metrics[name][i] = value
+
+    shape = tuple(len(axis_values) for axis_values in values)
+    return SensitivityGrid(
+        param_names=names,
+        param_values=values,
+        base_config=base_config,
+        metrics={name: array.reshape(shape) for name, array in metrics.items()},
+    )
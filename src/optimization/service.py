@@ -2,24 +2,40 @@
 Optimization service - main interface for parameter optimization
 """
 
-from typing import List, Optional, Union
+import os
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 from src.arch.config import ModelConfig, ScheduleConfig
 from src.hardware.hardware_config import HardwareConfig
+from src.optimization.checkpoint import Checkpoint, make_run_key
 from src.optimization.config import SearchSpaceConfig
+from src.optimization.constraints import Constraint
+from src.optimization.disaggregation import run_disaggregation_search
 from src.optimization.evaluator import PerformanceEvaluator
 from src.optimization.objective import (
     BaseObjective,
     create_objective,
 )
 from src.optimization.optimizers.base import BaseOptimizer
+from src.optimization.optimizers.bayesian import BayesianOptimizer
+from src.optimization.optimizers.branch_and_bound import BranchAndBoundOptimizer
+from src.optimization.optimizers.coarse_to_fine import CoarseToFineOptimizer
+from src.optimization.optimizers.evolutionary import EvolutionaryOptimizer
 from src.optimization.optimizers.grid_search import GridSearchOptimizer
+from src.optimization.optimizers.pareto import ParetoOptimizer
+from src.optimization.progress import ProgressReporter
 from src.optimization.results import (
+    DisaggregationResult,
     OptimizationResult,
     RecommendedConfig,
     SensitivityAnalysisResult,
+    SensitivityGrid,
 )
+from src.optimization.results_store import ResultsStore
 from src.optimization.search_space import SearchSpace
+from src.optimization.sensitivity import run_sensitivity_grid
 
 
 class OptimizationService:
@@ -43,6 +59,19 @@ class OptimizationService:
         optimizer_type: str = "grid_search",
         parallel_workers: int = 1,
         max_evaluations: Optional[int] = None,
+        cache_path: Optional[str] = None,
+        cost_model_dir: Optional[str] = None,
+        results_path: Optional[str] = None,
+        history_spill_dir: Optional[str] = None,
+        checkpoint_dir: Optional[str] = None,
+        checkpoint_interval: float = 60.0,
+        resume: bool = False,
+        shard: Optional[Tuple[int, int]] = None,
+        verbose: bool = False,
+        progress_events_path: Optional[str] = None,
+        time_budget: Optional[float] = None,
+        patience: Optional[int] = None,
+        stable_top_k: int = 1,
     ) -> OptimizationResult:
         """
         Run parameter optimization
@@ -53,15 +82,42 @@ class OptimizationService:
             max_seqlen: Fixed maximum sequence length
             search_space_config: Search space configuration
             objective_type: Type of objective ("minimize_ttft", "maximize_tps", "balanced")
-            optimizer_type: Type of optimizer ("grid_search")
+            optimizer_type: Type of optimizer ("grid_search", "branch_and_bound",
+                "coarse_to_fine", "evolutionary", "bayesian", "pareto")
             parallel_workers: Number of parallel workers
             max_evaluations: Maximum number of evaluations (None for unlimited)
+            cache_path: SQLite file of the persistent evaluation cache (None to disable)
+            cost_model_dir: Directory storing the compiled cost model across runs (None
+                to keep it in memory)
+            results_path: JSON Lines file receiving the raw metrics of every evaluated
+                configuration, for later re-scoring (None to disable)
+            history_spill_dir: Directory receiving the optimization history in chunks
+                as it grows, instead of keeping it in memory (None to disable; a
+                shard writes to its own subdirectory)
+            checkpoint_dir: Directory receiving periodic checkpoints of the run
+                (None to disable; only optimizers with supports_checkpoint)
+            checkpoint_interval: Minimum seconds between two checkpoints
+            resume: Continue from the checkpoint of an identical earlier run
+                (requires checkpoint_dir; results_path is then appended to)
+            shard: (index, count) to evaluate only that slice of the search space
+                enumeration (combine the shards' results_path files with merge())
+            verbose: Print every evaluated configuration and evaluation failure
+                instead of a periodic progress summary only
+            progress_events_path: JSON Lines file receiving progress events
+                (None to disable)
+            time_budget: Wall-clock limit in seconds (None for unlimited)
+            patience: Stop once the stable_top_k best scores did not change for
+                this many evaluations (None to disable)
+            stable_top_k: Number of best scores the patience window watches
 
         Returns:
             Optimization result
         """
+        if resume and checkpoint_dir is None:
+            raise ValueError("Resuming requires a checkpoint directory")
+
         # Determine if model uses MoE
-        is_moe_model = self._is_moe_model(model_config)
+        is_moe_model = model_config.is_moe()
 
         # Create search space
         search_space = SearchSpace(
@@ -73,7 +129,11 @@ class OptimizationService:
 
         # Create evaluator
         evaluator = PerformanceEvaluator(
-            model_config=model_config, hardware_config=hardware_config
+            model_config=model_config,
+            hardware_config=hardware_config,
+            cache_path=cache_path,
+            cost_model_dir=cost_model_dir,
+            verbose=verbose,
         )
 
         # Create optimizer
@@ -84,9 +144,107 @@ class OptimizationService:
             parallel_workers=parallel_workers,
             max_evaluations=max_evaluations,
         )
+        optimizer.progress = ProgressReporter(
+            verbose=verbose, events_path=progress_events_path
+        )
+        optimizer.time_budget = time_budget
+        if patience is not None:
+            optimizer.early_stop_patience = patience
+        optimizer.stable_top_k = stable_top_k
+        if history_spill_dir is not None and shard is not None:
+            history_spill_dir = os.path.join(history_spill_dir, f"shard_{shard[0]:05d}")
+        optimizer.history_spill_dir = history_spill_dir
+
+        if shard is not None:
+            if not optimizer.supports_sharding:
+                raise ValueError(f"Optimizer {optimizer_type} does not support shards")
+            optimizer.shard = shard
+
+        if checkpoint_dir is not None:
+            if not optimizer.supports_checkpoint:
+                raise ValueError(
+                    f"Optimizer {optimizer_type} does not support checkpoints"
+                )
+            # The evaluation budget is left out, so a resumed run may extend it
+            run_key = make_run_key(
+                model_config,
+                hardware_config,
+                max_seqlen,
+                search_space_config.to_dict(),
+                objective_type,
+                optimizer_type,
+                shard,
+            )
+            optimizer.checkpoint = Checkpoint(
+                checkpoint_dir, run_key, interval_seconds=checkpoint_interval
+            )
+            optimizer.resume = resume
+
+        results_store = None
+        if results_path is not None:
+            results_store = ResultsStore(
+                results_path,
+                metadata={
+                    "model_type": getattr(model_config, "model_type", ""),
+                    "hardware": hardware_config.name,
+                    "max_seqlen": max_seqlen,
+                    "search_space": search_space_config.to_dict(),
+                    "objective": objective_type,
+                    "optimizer": optimizer_type,
+                    "shard": list(shard) if shard is not None else None,
+                },
+                append=resume,
+            )
+            optimizer.results_store = results_store
 
-        # Run optimization
-        return optimizer.optimize(evaluator)
+        # Run optimization (shutting down any worker pool afterwards)
+        with evaluator:
+            try:
+                return optimizer.optimize(evaluator)
+            finally:
+                if results_store is not None:
+                    results_store.close()
+
+    def rescore(
+        self,
+        results_path: str,
+        objective_type: str = "maximize_tps",
+        constraints: Optional[List[Constraint]] = None,
+    ) -> OptimizationResult:
+        """
+        Re-score a stored sweep without re-evaluating it
+
+        Args:
+            results_path: File written by optimize(results_path=...)
+            objective_type: Type of objective to apply
+            constraints: Configuration constraints and SLA filters on raw metrics
+                (see ResultsStore.rescore)
+
+        Returns:
+            Optimization result over the stored configurations passing all constraints
+        """
+        objective = create_objective(objective_type)
+        return ResultsStore.rescore(results_path, objective, constraints)
+
+    def merge(
+        self,
+        results_paths: Sequence[str],
+        objective_type: str = "maximize_tps",
+        constraints: Optional[List[Constraint]] = None,
+    ) -> OptimizationResult:
+        """
+        Combine the stored results of a sharded sweep
+
+        Args:
+            results_paths: Files written by optimize(shard=..., results_path=...)
+            objective_type: Type of objective selecting the global best
+            constraints: Configuration constraints and SLA filters on raw metrics
+
+        Returns:
+            Optimization result with the global best and the Pareto front
+        """
+        objective = create_objective(objective_type)
+        return ResultsStore.merge(results_paths, objective, constraints)
 
     def get_recommended_config(
         self,
@@ -95,6 +253,8 @@ class OptimizationService:
         max_seqlen: int,
         priority: str = "balanced",
         world_size: Optional[int] = None,
+        cache_path: Optional[str] = None,
+        cost_model_dir: Optional[str] = None,
     ) -> RecommendedConfig:
         """
         Get recommended configuration for a given priority
@@ -105,6 +265,9 @@ class OptimizationService:
             max_seqlen: Fixed maximum sequence length
             priority: Priority mode ("latency", "throughput", "balanced")
             world_size: Total number of GPUs (constrains TP * DP)
+            cache_path: SQLite file of the persistent evaluation cache (None to disable)
+            cost_model_dir: Directory storing the compiled cost model across runs (None
+                to keep it in memory)
 
         Returns:
             Recommended configuration with metrics
@@ -115,7 +278,7 @@ class OptimizationService:
             search_config = SearchSpaceConfig(
                 tp_size=[1, 2, 4, 8],
                 dp_size=[1, 2, 4, 8],
-                ep_size=[1, 2, 4, 8] if self._is_moe_model(model_config) else [1],
+                ep_size=[1, 2, 4, 8] if model_config.is_moe() else [1],
                 batch_size=[1, 2, 4, 8],
                 mode="extend",
                 world_size=world_size,
@@ -126,7 +289,7 @@ class OptimizationService:
             search_config = SearchSpaceConfig(
                 tp_size=[1, 2, 4, 8],
                 dp_size=[1, 2, 4, 8],
-                ep_size=[1, 2, 4, 8, 16] if self._is_moe_model(model_config) else [1],
+                ep_size=[1, 2, 4, 8, 16] if model_config.is_moe() else [1],
                 batch_size=[8, 16, 32, 64, 128],
                 mode="extend",
                 world_size=world_size,
@@ -137,7 +300,7 @@ class OptimizationService:
             search_config = SearchSpaceConfig(
                 tp_size=[1, 2, 4, 8],
                 dp_size=[1, 2, 4, 8],
-                ep_size=[1, 2, 4, 8] if self._is_moe_model(model_config) else [1],
+                ep_size=[1, 2, 4, 8] if model_config.is_moe() else [1],
                 batch_size=[1, 2, 4, 8, 16, 32, 64],
                 mode="extend",
                 world_size=world_size,
@@ -151,6 +314,8 @@ class OptimizationService:
             max_seqlen=max_seqlen,
             search_space_config=search_config,
             objective_type=objective_type,
+            cache_path=cache_path,
+            cost_model_dir=cost_model_dir,
         )
 
         # Generate explanation
@@ -171,6 +336,7 @@ class OptimizationService:
         param_name: str,
         param_range: Union[List, tuple],
         objective_type: str = "balanced",
+        parallel_workers: int = 1,
     ) -> SensitivityAnalysisResult:
         """
         Analyze sensitivity of a parameter
@@ -182,66 +348,186 @@ class OptimizationService:
             param_name: Name of parameter to analyze (e.g., "tp_size", "batch_size")
             param_range: Range of values to test
             objective_type: Type of objective
+            parallel_workers: Number of parallel workers
 
         Returns:
             Sensitivity analysis result
         """
-        evaluator = PerformanceEvaluator(
-            model_config=model_config, hardware_config=hardware_config
-        )
-
-        objective = create_objective(objective_type)
-
         # Convert range to list
         if isinstance(param_range, tuple):
             param_values = list(range(param_range[0], param_range[1] + 1))
         else:
             param_values = list(param_range)
 
-        scores = []
-        metrics = {"ttft": [], "throughput": [], "total_time": []}
-
-        print(
-            f"Analyzing sensitivity of {param_name} over {len(param_values)} values..."
+        grid = self.analyze_sensitivity_grid(
+            model_config=model_config,
+            hardware_config=hardware_config,
+            base_config=base_config,
+            params={param_name: param_values},
+            objective_type=objective_type,
+            parallel_workers=parallel_workers,
         )
 
-        for value in param_values:
-            # Create modified config
-            config = ScheduleConfig(
-                batch_size=base_config.batch_size,
-                max_seqlen=base_config.max_seqlen,
-                mode=base_config.mode,
-                tp_size=base_config.tp_size,
-                dp_size=base_config.dp_size,
-                ep_size=base_config.ep_size,
-            )
-            setattr(config, param_name, value)
-
-            # Evaluate
-            perf = evaluator.evaluate(config)
-            if perf is not None:
-                score = objective.evaluate(perf)
-                scores.append(score)
-                metrics["ttft"].append(perf.get_ttft_or_tpot())
-                metrics["throughput"].append(perf.get_throughput())
-                metrics["total_time"].append(perf.total_time)
-            else:
-                scores.append(float("inf"))
-                metrics["ttft"].append(float("inf"))
-                metrics["throughput"].append(0)
-                metrics["total_time"].append(float("inf"))
+        # Failed configurations: infinite score and time, no throughput
+        def column(name: str, failed_value: float) -> List[float]:
+            values = grid.metrics[name]
+            return np.where(np.isnan(values), failed_value, values).tolist()
 
         return SensitivityAnalysisResult(
             param_name=param_name,
             param_values=param_values,
-            scores=scores,
-            metrics=metrics,
+            scores=column("score", float("inf")),
+            metrics={
+                "ttft": column("ttft_ms", float("inf")),
+                "throughput": column("throughput_tps", 0),
+                # Same unit as ModelPerformance.total_time (us)
+                "total_time": [
+                    value * 1000.0 for value in column("total_time_ms", float("inf"))
+                ],
+            },
         )
 
-    def _is_moe_model(self, model_config: ModelConfig) -> bool:
-        """Check if model uses Mixture of Experts"""
-        model_type = getattr(model_config, "model_type", "")
-        return "moe" in model_type.lower() or model_type == "deepseek_v3"
+    def analyze_sensitivity_grid(
+        self,
+        model_config: ModelConfig,
+        hardware_config: HardwareConfig,
+        base_config: ScheduleConfig,
+        params: Dict[str, Sequence],
+        objective_type: str = "balanced",
+        parallel_workers: int = 1,
+        cache_path: Optional[str] = None,
+        cost_model_dir: Optional[str] = None,
+    ) -> SensitivityGrid:
+        """
+        Analyze one parameter or the interaction of two (e.g. tp_size x batch_size)
+
+        Args:
+            model_config: Model configuration
+            hardware_config: Hardware configuration
+            base_config: Base configuration to vary from (all other fields kept)
+            params: ScheduleConfig field name -> values to test, one or two entries
+            objective_type: Type of objective providing the score metric
+            parallel_workers: Number of parallel workers
+            cache_path: SQLite file of the persistent evaluation cache (None to disable)
+            cost_model_dir: Directory storing the compiled cost model across runs (None
+                to keep it in memory)
+
+        Returns:
+            Sensitivity grid of all metrics
+        """
+        objective = create_objective(objective_type)
+        evaluator = PerformanceEvaluator(
+            model_config=model_config,
+            hardware_config=hardware_config,
+            cache_path=cache_path,
+            cost_model_dir=cost_model_dir,
+        )
+        with evaluator:
+            return run_sensitivity_grid(
+                evaluator, objective, base_config, params, parallel_workers
+            )
+
+    def optimize_disaggregation(
+        self,
+        model_config: ModelConfig,
+        hardware_config: HardwareConfig,
+        prompt_len: int,
+        output_len: int,
+        ttft_slo_ms: Optional[float] = None,
+        tpot_slo_ms: Optional[float] = None,
+        prefill_search_space_config: Optional[SearchSpaceConfig] = None,
+        decode_search_space_config: Optional[SearchSpaceConfig] = None,
+        max_instances: int = 8,
+        max_gpus: Optional[int] = None,
+        gpu_memory_utilization: float = 0.9,
+        top_k: int = 10,
+        parallel_workers: int = 1,
+        cache_path: Optional[str] = None,
+        cost_model_dir: Optional[str] = None,
+    ) -> DisaggregationResult:
+        """
+        Jointly optimize prefill/decode disaggregated serving
+
+        Chooses the prefill instance configuration, the decode instance
+        configuration and the P:D instance ratio maximizing goodput per GPU under
+        TTFT/TPOT SLOs, including the KV cache transfer from prefill to decode
+        (see run_disaggregation_search).
+
+        Args:
+            model_config: Model configuration
+            hardware_config: Hardware configuration
+            prompt_len: Prompt length of a request
+            output_len: Output length of a request
+            ttft_slo_ms: TTFT objective (None for no limit)
+            tpot_slo_ms: TPOT objective (None for no limit)
+            prefill_search_space_config: Prefill instance configurations (default
+                TP 1-8, DP 1-16, EP 1-16 for MoE models; the batch size only enters
+                the TP divisibility check, as a prefill pass holds one prompt)
+            decode_search_space_config: Decode instance configurations (default
+                TP 1-8, DP 1-16, EP 1-16 for MoE models, batch sizes 8-256)
+            max_instances: Largest number of instances of each role in a unit
+            max_gpus: Largest number of GPUs in a unit (None for no limit)
+            gpu_memory_utilization: Fraction of HBM usable for weights and KV cache
+            top_k: Number of (prefill, decode) configuration pairs kept
+            parallel_workers: Number of parallel workers
+            cache_path: SQLite file of the persistent evaluation cache (None to disable)
+            cost_model_dir: Directory storing the compiled cost model across runs (None
+                to keep it in memory)
+
+        Returns:
+            Disaggregation result, best deployment first
+        """
+        is_moe_model = model_config.is_moe()
+        ep_size = [1, 2, 4, 8, 16] if is_moe_model else [1]
+        if prefill_search_space_config is None:
+            prefill_search_space_config = SearchSpaceConfig(
+                tp_size=[1, 2, 4, 8],
+                dp_size=[1, 2, 4, 8, 16],
+                ep_size=ep_size,
+                batch_size=[8],
+                mode="extend",
+            )
+        if decode_search_space_config is None:
+            decode_search_space_config = SearchSpaceConfig(
+                tp_size=[1, 2, 4, 8],
+                dp_size=[1, 2, 4, 8, 16],
+                ep_size=ep_size,
+                batch_size=[8, 16, 32, 64, 128, 256],
+                mode="decode",
+            )
+        # Divisibility by TP is checked against the prompt for both roles
+        prefill_search_space = SearchSpace(
+            config=prefill_search_space_config,
+            max_seqlen=prompt_len,
+            is_moe_model=is_moe_model,
+        )
+        decode_search_space = SearchSpace(
+            config=decode_search_space_config,
+            max_seqlen=prompt_len,
+            is_moe_model=is_moe_model,
+        )
+
+        evaluator = PerformanceEvaluator(
+            model_config=model_config,
+            hardware_config=hardware_config,
+            cache_path=cache_path,
+            cost_model_dir=cost_model_dir,
+        )
+        with evaluator:
+            return run_disaggregation_search(
+                evaluator,
+                prefill_search_space,
+                decode_search_space,
+                prompt_len=prompt_len,
+                output_len=output_len,
+                ttft_slo_ms=ttft_slo_ms,
+                tpot_slo_ms=tpot_slo_ms,
+                max_instances=max_instances,
+                max_gpus=max_gpus,
+                gpu_memory_utilization=gpu_memory_utilization,
+                top_k=top_k,
+                parallel_workers=parallel_workers,
+            )
 
     def _create_optimizer(
         self,
@@ -261,6 +547,41 @@ class OptimizationService:
                 parallel_workers=parallel_workers,
                 max_evaluations=max_evaluations,
             )
+        elif optimizer_type == "pareto":
+            return ParetoOptimizer(
+                search_space=search_space,
+                objective=objective,
+                parallel_workers=parallel_workers,
+                max_evaluations=max_evaluations,
+            )
+        elif optimizer_type == "branch_and_bound":
+            return BranchAndBoundOptimizer(
+                search_space=search_space,
+                objective=objective,
+                parallel_workers=parallel_workers,
+                max_evaluations=max_evaluations,
+            )
+        elif optimizer_type == "coarse_to_fine":
+            return CoarseToFineOptimizer(
+                search_space=search_space,
+                objective=objective,
+                parallel_workers=parallel_workers,
+                max_evaluations=max_evaluations,
+            )
+        elif optimizer_type == "evolutionary":
+            return EvolutionaryOptimizer(
+                search_space=search_space,
+                objective=objective,
+                parallel_workers=parallel_workers,
+                max_evaluations=max_evaluations,
+            )
+        elif optimizer_type == "bayesian":
+            return BayesianOptimizer(
+                search_space=search_space,
+                objective=objective,
+                parallel_workers=parallel_workers,
+                max_evaluations=max_evaluations,
+            )
         else:
             raise ValueError(f"Unknown optimizer type: {optimizer_type}")
 
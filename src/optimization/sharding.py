@@ -0,0 +1,112 @@
+"""
+Sharded sweeps - slicing the search space enumeration and a shared-filesystem work queue
+"""
+
+import glob
+import os
+import socket
+from typing import List, Optional, Tuple
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parse a shard specification
+
+    Args:
+        value: "i/N", the i-th (0-based) of N shards
+
+    Returns:
+        (index, count)
+    """
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must be given as i/N: {value}")
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, {count}): {value}")
+    return index, count
+
+
+def get_shard_size(size: int, shard: Tuple[int, int]) -> int:
+    """Number of configurations of a size-long enumeration in the shard"""
+    index, count = shard
+    return len(range(index, size, count))
+
+
+class ShardQueue:
+    """
+    Work queue of sweep shards in a shared directory
+
+    Every worker host runs the same sweep against the same directory and repeatedly
+    claims the next free shard. A claim is a lock file created with O_EXCL, which
+    at most one worker can create, so no external coordination service is needed.
+    A shard's results are written to a partial file that is renamed once the shard
+    completes; the finished files are the input of ResultsStore.merge.
+
+    A worker that dies leaves its lock behind; deleting the lock file of an
+    unfinished shard puts it back in the queue.
+    """
+
+    def __init__(self, directory: str, num_shards: int):
+        """
+        Args:
+            directory: Shared directory holding locks and shard results
+            num_shards: Number of shards the sweep is split into
+        """
+        if num_shards < 1:
+            raise ValueError(f"Number of shards must be positive: {num_shards}")
+        self.directory = directory
+        self.num_shards = num_shards
+        os.makedirs(directory, exist_ok=True)
+
+    def _name(self, index: int) -> str:
+        return os.path.join(
+            self.directory, f"shard-{index:05d}-of-{self.num_shards:05d}"
+        )
+
+    def get_results_path(self, index: int) -> str:
+        """Results file of a completed shard"""
+        return self._name(index) + ".jsonl"
+
+    def get_partial_path(self, index: int) -> str:
+        """Results file of a shard while it is being evaluated"""
+        return self._name(index) + ".jsonl.part"
+
+    def claim(self) -> Optional[int]:
+        """
+        Claim the next shard nobody has claimed yet
+
+        Returns:
+            Shard index, or None if every shard is claimed or done
+        """
+        for index in range(self.num_shards):
+            if os.path.exists(self.get_results_path(index)):
+                continue
+            try:
+                fd = os.open(
+                    self._name(index) + ".lock", os.O_CREAT | os.O_EXCL | os.O_WRONLY
+                )
+            except FileExistsError:
+                continue
+            with os.fdopen(fd, "w") as f:
+                f.write(f"{socket.gethostname()}:{os.getpid()}\n")
+            return index
+        return None
+
+    def complete(self, index: int) -> None:
+        """Publish the results of a claimed shard"""
+        os.replace(self.get_partial_path(index), self.get_results_path(index))
+
+    def release(self, index: int) -> None:
+        """
+        Give up a claimed shard so another worker can take it
+
+        The partial results stay, so a worker resuming from a checkpoint can append
+        to them; otherwise the next claimant overwrites them.
+        """
+        os.remove(self._name(index) + ".lock")
+
+    def get_completed_paths(self) -> List[str]:
+        """Results files of the completed shards"""
+        pattern = f"shard-*-of-{self.num_shards:05d}.jsonl"
+        return sorted(glob.glob(os.path.join(self.directory, pattern)))
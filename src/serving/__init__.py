@@ -0,0 +1,103 @@
+"""
+LLMSim Serving Simulation Module
+
+Discrete-event simulation of continuous-batching inference under a request
+workload, with every engine step costed by the performance model. Reports
+TTFT/TPOT/end-to-end latency percentiles, queueing delay and goodput. Workloads
+are generated (SyntheticWorkload) or replayed from request traces (TraceWorkload);
+step composition, admission order and preemption are pluggable (Scheduler).
+plan_capacity finds the deployment with the fewest GPUs that meets the SLOs at a
+target request rate.
+
+Example usage:
+    from src.serving import (
+        PoissonArrivals, LogNormalLength, FixedLength,
+        ServingSimulator, StepCostModel, SyntheticWorkload,
+    )
+
+    cost_model = StepCostModel(model_config, hardware_config, schedule_config)
+    workload = SyntheticWorkload(
+        arrivals=PoissonArrivals(rate=20.0),
+        prompt_lengths=LogNormalLength(mean=1024, cv=1.0, max_value=8192),
+        output_lengths=FixedLength(256),
+        num_requests=100000,
+    )
+    result = ServingSimulator(cost_model).run(workload, ttft_slo_ms=2000)
+
+    summary = result.get_summary()
+    print(f"p99 TTFT: {summary['ttft_ms_p99']:.2f} ms")
+    print(f"Goodput: {summary['goodput_rps']:.2f} requests/s")
+"""
+
+from src.serving.capacity import plan_capacity
+from src.serving.results import (
+    CapacityCandidate,
+    CapacityPlan,
+    LatencyHistogram,
+    RequestRecorder,
+    ServingResult,
+)
+from src.serving.scheduler import (
+    EngineState,
+    FCFSScheduler,
+    Scheduler,
+    SequenceState,
+    ShortestPromptFirstScheduler,
+    StepPlan,
+    create_scheduler,
+)
+from src.serving.simulator import ServingSimulator
+from src.serving.step_cost import StepCostModel, round_up_to_bucket
+from src.serving.trace import TraceWorkload, iter_trace_requests
+from src.serving.workload import (
+    ArrivalProcess,
+    ConstantArrivals,
+    FixedLength,
+    GammaArrivals,
+    LengthDistribution,
+    LogNormalLength,
+    PoissonArrivals,
+    Request,
+    SyntheticWorkload,
+    UniformLength,
+    create_arrival_process,
+    parse_length_distribution,
+)
+
+__all__ = [
+    # Simulation
+    "ServingSimulator",
+    "StepCostModel",
+    "round_up_to_bucket",
+    # Scheduling
+    "Scheduler",
+    "FCFSScheduler",
+    "ShortestPromptFirstScheduler",
+    "StepPlan",
+    "SequenceState",
+    "EngineState",
+    "create_scheduler",
+    # Workload
+    "Request",
+    "SyntheticWorkload",
+    "ArrivalProcess",
+    "PoissonArrivals",
+    "GammaArrivals",
+    "ConstantArrivals",
+    "LengthDistribution",
+    "FixedLength",
+    "UniformLength",
+    "LogNormalLength",
+    "create_arrival_process",
+    "parse_length_distribution",
+    "TraceWorkload",
+    "iter_trace_requests",
+    # Results
+    "ServingResult",
+    "RequestRecorder",
+    "LatencyHistogram",
+    # Capacity planning
+    "plan_capacity",
+    "CapacityPlan",
+    "CapacityCandidate",
+]
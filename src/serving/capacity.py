@@ -0,0 +1,243 @@
+"""
+Capacity planning - cheapest deployment meeting latency SLOs at a target request rate
+"""
+
+import time
+from typing import Dict, Optional
+
+from src.arch.config import ModelConfig
+from src.hardware.hardware_config import HardwareConfig
+from src.optimization.config import SearchSpaceConfig
+from src.optimization.search_space import SearchSpace
+from src.serving.results import CapacityCandidate, CapacityPlan, ServingResult
+from src.serving.scheduler import Scheduler
+from src.serving.simulator import ServingSimulator
+from src.serving.step_cost import StepCostModel
+from src.serving.workload import (
+    LengthDistribution,
+    SyntheticWorkload,
+    create_arrival_process,
+)
+
+# Sequence length given to the search space; it only enters the TP divisibility
+# check, as the simulator sets the shape of every step itself
+_SEARCH_MAX_SEQLEN = 4096
+
+
+def plan_capacity(
+    model_config: ModelConfig,
+    hardware_config: HardwareConfig,
+    target_qps: float,
+    prompt_lengths: LengthDistribution,
+    output_lengths: LengthDistribution,
+    ttft_slo_ms: Optional[float] = None,
+    tpot_slo_ms: Optional[float] = None,
+    slo_attainment: float = 0.99,
+    search_space_config: Optional[SearchSpaceConfig] = None,
+    max_replicas: int = 1024,
+    arrival: str = "poisson",
+    burstiness: float = 2.0,
+    num_requests: int = 2000,
+    seed: int = 0,
+    scheduler: Optional[Scheduler] = None,
+    gpu_memory_utilization: Optional[float] = 0.9,
+    resolution: int = 16,
+    verbose: bool = True,
+) -> CapacityPlan:
+    """
+    Find the deployment with the fewest GPUs that meets latency SLOs
+
+    Every instance configuration of the search space is a candidate replica
+    (tp_size * dp_size GPUs). Requests are spread evenly across replicas, so a
+    deployment of n replicas is simulated as one replica at target_qps / n, and
+    its SLO attainment grows with n. The fewest replicas meeting the target are
+    therefore found by binary search: doubling from one replica until the target
+    is met, then bisecting. Once a deployment is known, a candidate is first
+    simulated at the largest replica count that could tie it, and dropped after
+    that single simulation if even that count misses the target.
+
+    Args:
+        model_config: Model configuration
+        hardware_config: Hardware configuration
+        target_qps: Total request rate to serve (requests per second)
+        prompt_lengths: Prompt length distribution
+        output_lengths: Output length distribution
+        ttft_slo_ms: TTFT objective (None for no limit)
+        tpot_slo_ms: TPOT objective (None for no limit)
+        slo_attainment: Fraction of requests that must meet both SLOs
+        search_space_config: Instance configurations to consider (default TP 1-8,
+            batch sizes 16-256, no DP or EP)
+        max_replicas: Largest replica count considered
+        arrival: Arrival process ("poisson", "gamma" or "constant")
+        burstiness: Coefficient of variation of inter-arrival times (gamma)
+        num_requests: Requests simulated per replica count
+        seed: Random seed of the workload
+        scheduler: Scheduling policy of the replicas (default FCFS)
+        gpu_memory_utilization: Fraction of HBM for weights and KV cache, bounding
+            the KV cache of every engine (None for unlimited)
+        resolution: Step shape buckets per power-of-two octave
+        verbose: Print the outcome of every candidate
+
+    Returns:
+        Capacity plan, with the outcome of every candidate
+
+    Raises:
+        ValueError: If the request rate, SLOs or bounds are invalid
+    """
+    if target_qps <= 0:
+        raise ValueError(f"Target QPS must be positive: {target_qps}")
+    if ttft_slo_ms is None and tpot_slo_ms is None:
+        raise ValueError("Capacity planning needs a TTFT or TPOT SLO")
+    if not 0 < slo_attainment <= 1:
+        raise ValueError(f"SLO attainment must be in (0, 1]: {slo_attainment}")
+    if max_replicas < 1:
+        raise ValueError(f"max_replicas must be positive: {max_replicas}")
+
+    start_time = time.time()
+    if search_space_config is None:
+        search_space_config = SearchSpaceConfig(
+            tp_size=[1, 2, 4, 8],
+            dp_size=[1],
+            batch_size=[16, 32, 64, 128, 256],
+        )
+    search_space = SearchSpace(
+        search_space_config,
+        max_seqlen=_SEARCH_MAX_SEQLEN,
+        is_moe_model=model_config.is_moe(),
+    )
+    plan = CapacityPlan(
+        target_qps=target_qps,
+        ttft_slo_ms=ttft_slo_ms,
+        tpot_slo_ms=tpot_slo_ms,
+        slo_attainment=slo_attainment,
+    )
+
+    for config in search_space.iterate_all():
+        gpus = config.tp_size * config.dp_size
+        candidate = CapacityCandidate(config=config, gpus_per_replica=gpus)
+        plan.candidates.append(candidate)
+        # Cheaper or as cheap as the best deployment so far
+        limit = max_replicas
+        if plan.is_feasible():
+            limit = min(limit, plan.total_gpus // gpus)
+        if limit < 1:
+            candidate.pruned = True
+            if verbose:
+                print(_format_candidate(candidate))
+            continue
+
+        try:
+            cost_model = StepCostModel(
+                model_config, hardware_config, config, resolution=resolution
+            )
+            kv_cache_tokens = None
+            if gpu_memory_utilization is not None:
+                kv_cache_tokens = cost_model.get_kv_cache_capacity(
+                    gpu_memory_utilization
+                )
+            simulator = ServingSimulator(
+                cost_model, scheduler=scheduler, kv_cache_tokens=kv_cache_tokens
+            )
+        except ValueError as e:
+            candidate.error = str(e)
+            if verbose:
+                print(_format_candidate(candidate))
+            continue
+
+        results: Dict[int, ServingResult] = {}
+
+        def meets_slo(replicas: int) -> bool:
+            if replicas not in results:
+                workload = SyntheticWorkload(
+                    arrivals=create_arrival_process(
+                        arrival, target_qps / replicas, burstiness
+                    ),
+                    prompt_lengths=prompt_lengths,
+                    output_lengths=output_lengths,
+                    num_requests=num_requests,
+                    seed=seed,
+                )
+                results[replicas] = simulator.run(
+                    workload,
+                    ttft_slo_ms=ttft_slo_ms,
+                    tpot_slo_ms=tpot_slo_ms,
+                    keep_requests=False,
+                )
+                candidate.simulations += 1
+                plan.simulations += 1
+            attainment = results[replicas].get_summary()["slo_attainment"]
+            candidate.slo_attainment = attainment
+            return attainment >= slo_attainment
+
+        # Largest count known to miss the target and smallest known to meet it
+        low, high = 0, None
+        try:
+            if plan.is_feasible():
+                if meets_slo(limit):
+                    high = limit
+                else:
+                    candidate.pruned = True
+            else:
+                replicas = 1
+                while high is None and low < limit:
+                    if meets_slo(replicas):
+                        high = replicas
+                    else:
+                        low = replicas
+                        replicas = min(2 * replicas, limit)
+            while high is not None and high - low > 1:
+                middle = (low + high) // 2
+                if meets_slo(middle):
+                    high = middle
+                else:
+                    low = middle
+        except ValueError as e:
+            candidate.error = str(e)
+            if verbose:
+                print(_format_candidate(candidate))
+            continue
+
+        if high is not None:
+            candidate.replicas = high
+            candidate.slo_attainment = results[high].get_summary()["slo_attainment"]
+            # Fewest GPUs, then highest attainment
+            if (
+                not plan.is_feasible()
+                or candidate.total_gpus < plan.total_gpus
+                or candidate.slo_attainment
+                > plan.result.get_summary()["slo_attainment"]
+            ):
+                plan.config = config
+                plan.replicas = high
+                plan.total_gpus = candidate.total_gpus
+                plan.result = results[high]
+        if verbose:
+            print(_format_candidate(candidate))
+
+    plan.wall_time_seconds = time.time() - start_time
+    return plan
+
+
+def _format_candidate(candidate: CapacityCandidate) -> str:
+    """One-line description of a candidate's outcome"""
+    config = candidate.config
+    label = (
+        f"TP={config.tp_size} DP={config.dp_size} EP={config.ep_size} "
+        f"batch={config.batch_size}"
+    )
+    if candidate.error is not None:
+        return f"  {label}: infeasible ({candidate.error})"
+    if candidate.pruned and not candidate.simulations:
+        return f"  {label}: cannot beat the best plan"
+    if candidate.replicas is None:
+        reason = "cannot beat the best plan" if candidate.pruned else "SLOs not met"
+        return (
+            f"  {label}: {reason} "
+            f"({100.0 * candidate.slo_attainment:.1f}% attainment, "
+            f"{candidate.simulations} simulations)"
+        )
+    return (
+        f"  {label}: {candidate.replicas} replicas = {candidate.total_gpus} GPUs "
+        f"({100.0 * candidate.slo_attainment:.1f}% attainment, "
+        f"{candidate.simulations} simulations)"
+    )
@@ -0,0 +1,746 @@
+"""
+CLI for serving simulation
+
+Usage:
+    python -m src.serving.cli \\
+        --model_path hf_config/qwen3-32B_config.json \\
+        --hardware h800 \\
+        --tp_size 4 --dp_size 2 --batch_size 64 \\
+        --qps 20 --prompt_len lognormal:1024,1,8192 --output_len 64-512 \\
+        --num_requests 100000 --ttft_slo 2000 --tpot_slo 50
+
+    # Replay a production trace, streaming per-request predictions to disk
+    python -m src.serving.cli \
+        --model_path hf_config/qwen3-32B_config.json \
+        --tp_size 4 --dp_size 2 --batch_size 64 \
+        --trace requests.jsonl.gz --timestamp_unit ms \
+        --ttft_slo 2000 --tpot_slo 50 \
+        --stream_results --output predictions.csv.gz
+
+    # Compare scheduling policies under a bounded KV cache
+    python -m src.serving.cli \
+        --model_path hf_config/qwen3-32B_config.json \
+        --tp_size 4 --batch_size 128 --qps 10 --prompt_len 64-8192 \
+        --scheduler fcfs spf --chunked_prefill both --max_num_batched_tokens 8192 \
+        --gpu_memory_utilization 0.9 --ttft_slo 2000 --tpot_slo 50
+
+    # Fewest GPUs serving 50 requests/s within the SLOs
+    python -m src.serving.cli plan \
+        --model_path hf_config/qwen3-32B_config.json \
+        --qps 50 --prompt_len lognormal:1024,1,8192 --output_len 64-512 \
+        --ttft_slo 2000 --tpot_slo 50 --slo_attainment 0.99
+"""
+
+import argparse
+import itertools
+import json
+import math
+import sys
+from typing import List, Optional
+
+import numpy as np
+
+from src.arch.config import ScheduleConfig
+from src.optimization.cli import load_hardware_config, load_model_config, parse_range
+from src.optimization.config import FLAG_NAMES, SearchSpaceConfig
+from src.serving.capacity import plan_capacity
+from src.serving.results import (
+    LATENCY_METRICS,
+    PERCENTILES,
+    CapacityPlan,
+    ServingResult,
+)
+from src.serving.scheduler import create_scheduler
+from src.serving.simulator import ServingSimulator
+from src.serving.step_cost import StepCostModel
+from src.serving.trace import TIMESTAMP_UNITS, TraceWorkload
+from src.serving.workload import (
+    SyntheticWorkload,
+    create_arrival_process,
+    parse_length_distribution,
+)
+
+
+def add_workload_arguments(parser: argparse.ArgumentParser):
+    """Add the arrival process and length distributions of synthetic workloads"""
+    parser.add_argument(
+        "--arrival",
+        type=str,
+        default="poisson",
+        choices=["poisson", "gamma", "constant"],
+        help="Arrival process",
+    )
+    parser.add_argument(
+        "--burstiness",
+        type=float,
+        default=2.0,
+        help="Coefficient of variation of inter-arrival times (gamma arrivals)",
+    )
+    parser.add_argument(
+        "--prompt_len",
+        type=parse_length_distribution,
+        default="1024",
+        help="Prompt length: N, LOW-HIGH (uniform) or lognormal:MEAN[,CV[,MAX]]",
+    )
+    parser.add_argument(
+        "--output_len",
+        type=parse_length_distribution,
+        default="256",
+        help="Output length, same syntax as --prompt_len",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """Create argument parser"""
+    parser = argparse.ArgumentParser(
+        description="LLMSim Serving Simulation - latency percentiles and goodput "
+        "of a deployment under a request workload"
+    )
+
+    # Deployment
+    parser.add_argument(
+        "--model_path",
+        type=str,
+        required=True,
+        help="Path to model configuration JSON file",
+    )
+    parser.add_argument(
+        "--hardware",
+        type=str,
+        default="h800",
+        help="Hardware configuration name (h20, h800, gb200, klx_p800) or path to JSON",
+    )
+    parser.add_argument("--tp_size", type=int, default=1, help="TP size")
+    parser.add_argument(
+        "--dp_size",
+        type=int,
+        default=1,
+        help="DP size (every DP rank is one engine with its own batch)",
+    )
+    parser.add_argument("--ep_size", type=int, default=1, help="EP size")
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=64,
+        help="Maximum number of running sequences per engine",
+    )
+    for name in FLAG_NAMES:
+        parser.add_argument(
+            f"--{name}",
+            action=argparse.BooleanOptionalAction,
+            default=getattr(ScheduleConfig, name),
+            help=f"{name} feature flag",
+        )
+
+    # Workload: synthetic
+    parser.add_argument(
+        "--qps",
+        type=float,
+        default=None,
+        help="Mean request arrival rate of a synthetic workload (requests per second)",
+    )
+    add_workload_arguments(parser)
+    parser.add_argument(
+        "--num_requests",
+        type=int,
+        default=None,
+        help="Number of requests to simulate (default 10000 synthetic requests, or "
+        "the whole trace)",
+    )
+
+    # Workload: trace replay
+    parser.add_argument(
+        "--trace",
+        type=str,
+        default=None,
+        help="Replay a request trace (CSV with a header or JSON Lines, optionally "
+        ".gz) with arrival_ts, prompt_tokens, output_tokens and prefix_id columns "
+        "instead of a synthetic workload",
+    )
+    parser.add_argument(
+        "--trace_format",
+        type=str,
+        default=None,
+        choices=["csv", "jsonl"],
+        help="Trace format (default: detected from the file extension)",
+    )
+    parser.add_argument(
+        "--timestamp_unit",
+        type=str,
+        default="s",
+        choices=list(TIMESTAMP_UNITS),
+        help="Unit of the trace's arrival_ts",
+    )
+    parser.add_argument(
+        "--speedup",
+        type=float,
+        default=1.0,
+        help="Replay the trace this many times faster (scales the request rate)",
+    )
+
+    # Scheduling
+    parser.add_argument(
+        "--scheduler",
+        type=str,
+        nargs="+",
+        default=["fcfs"],
+        choices=["fcfs", "spf"],
+        help="Scheduling policy: fcfs (first come, first served) or spf (shortest "
+        "prompt first); several policies are simulated and compared",
+    )
+    parser.add_argument(
+        "--chunked_prefill",
+        type=str,
+        default="off",
+        choices=["off", "on", "both"],
+        help="Split prompts into chunks piggybacked on decode steps (both: compare "
+        "every scheduler with and without)",
+    )
+    parser.add_argument(
+        "--max_num_batched_tokens",
+        type=int,
+        default=None,
+        help="Token budget of a step (default: no limit)",
+    )
+    parser.add_argument(
+        "--gpu_memory_utilization",
+        type=float,
+        default=None,
+        help="Fraction of HBM for weights and KV cache; sequences are preempted and "
+        "recomputed when the KV cache is full (default: unlimited KV cache)",
+    )
+
+    # SLOs and output
+    parser.add_argument(
+        "--ttft_slo",
+        type=float,
+        default=None,
+        help="TTFT objective in ms for goodput",
+    )
+    parser.add_argument(
+        "--tpot_slo",
+        type=float,
+        default=None,
+        help="TPOT objective in ms for goodput",
+    )
+    parser.add_argument(
+        "--resolution",
+        type=int,
+        default=16,
+        help="Step shape buckets per power of two (higher is more exact, slower)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write per-request latencies to this CSV file (.gz to compress); when "
+        "comparing schedulers, those of the one with the best goodput",
+    )
+    parser.add_argument(
+        "--stream_results",
+        action="store_true",
+        help="Write per-request latencies to --output as requests complete and keep "
+        "only latency histograms in memory (flat memory for multi-GB traces, "
+        "percentiles within 0.5%%)",
+    )
+    return parser
+
+
+def format_serving_result(result: ServingResult) -> str:
+    """Format serving simulation result for display"""
+    summary = result.get_summary()
+    lines = []
+    lines.append("=" * 60)
+    lines.append("SERVING SIMULATION RESULTS")
+    lines.append("=" * 60)
+
+    lines.append(
+        f"\nRequests: {summary['requests']} over {result.duration_s:.1f}s simulated "
+        f"({result.num_engines} engines, {result.num_gpus} GPUs)"
+    )
+    lines.append(
+        f"Steps: {result.prefill_steps} prefill, {result.decode_steps} decode "
+        f"(mean decode batch {result.mean_decode_batch:.1f}, "
+        f"utilization {100.0 * result.engine_utilization:.1f}%)"
+    )
+    lines.append(
+        f"Scheduler: {result.scheduler or 'fcfs'}, " f"{result.preemptions} preemptions"
+    )
+
+    lines.append("\nLatency (ms):")
+    header = "".join(f"{'p' + str(p):>12}" for p in PERCENTILES)
+    lines.append(f"  {'metric':<10}{'mean':>12}{header}")
+    for name in LATENCY_METRICS:
+        values = [summary[f"{name}_mean"]]
+        values += [summary[f"{name}_p{p}"] for p in PERCENTILES]
+        cells = "".join(
+            f"{'-':>12}" if math.isnan(value) else f"{value:>12.2f}" for value in values
+        )
+        lines.append(f"  {name[:-3]:<10}{cells}")
+
+    lines.append("\nThroughput:")
+    lines.append(f"  Requests/s: {summary['request_throughput_rps']:.2f}")
+    lines.append(f"  Output tokens/s: {summary['output_throughput_tps']:.2f}")
+    lines.append(
+        f"  Output tokens/s per GPU: {summary['output_throughput_per_gpu']:.2f}"
+    )
+
+    if result.ttft_slo_ms is not None or result.tpot_slo_ms is not None:
+        slos = []
+        if result.ttft_slo_ms is not None:
+            slos.append(f"TTFT <= {result.ttft_slo_ms:g}ms")
+        if result.tpot_slo_ms is not None:
+            slos.append(f"TPOT <= {result.tpot_slo_ms:g}ms")
+        lines.append(f"\nSLO ({', '.join(slos)}):")
+        if result.ttft_slo_ms is not None and result.tpot_slo_ms is not None:
+            lines.append(
+                f"  TTFT attainment: {100.0 * summary['ttft_slo_attainment']:.1f}%, "
+                f"TPOT attainment: {100.0 * summary['tpot_slo_attainment']:.1f}%"
+            )
+        lines.append(f"  Attainment: {100.0 * summary['slo_attainment']:.1f}%")
+        lines.append(f"  Goodput: {summary['goodput_rps']:.2f} requests/s")
+        lines.append(f"  Goodput per GPU: {summary['goodput_per_gpu']:.4f} requests/s")
+
+    stats = result.step_cache_stats
+    lines.append(
+        f"\nSimulation time: {result.wall_time_seconds:.2f}s "
+        f"({stats.get('prefill_shapes', 0)} prefill and "
+        f"{stats.get('decode_shapes', 0)} decode step shapes evaluated, "
+        f"{100.0 * stats.get('operator_hit_rate', 0.0):.0f}% operator cache hits)"
+    )
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+def format_policy_comparison(results: List[ServingResult]) -> str:
+    """Format the results of several scheduling policies, best goodput first"""
+    summaries = [(result, result.get_summary()) for result in results]
+    summaries.sort(key=lambda item: -np.nan_to_num(item[1]["goodput_rps"]))
+    lines = []
+    lines.append("=" * 96)
+    lines.append("SCHEDULER COMPARISON")
+    lines.append("=" * 96)
+    lines.append(
+        f"{'Scheduler':<48}{'Goodput':>10}{'SLO %':>8}{'p99 TTFT':>11}"
+        f"{'p99 TPOT':>10}{'Preempt':>9}"
+    )
+    for result, summary in summaries:
+        lines.append(
+            f"{result.scheduler:<48}{summary['goodput_rps']:>10.2f}"
+            f"{100.0 * summary['slo_attainment']:>8.1f}"
+            f"{summary['ttft_ms_p99']:>11.1f}{summary['tpot_ms_p99']:>10.2f}"
+            f"{result.preemptions:>9}"
+        )
+    lines.append(f"\nBest scheduler by goodput: {summaries[0][0].scheduler}")
+    lines.append("=" * 96)
+    return "\n".join(lines)
+
+
+def create_plan_parser() -> argparse.ArgumentParser:
+    """Create argument parser of the plan command"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src.serving.cli plan",
+        description="Capacity planning - the deployment with the fewest GPUs that "
+        "serves a target request rate within latency SLOs",
+    )
+    parser.add_argument(
+        "--model_path",
+        type=str,
+        required=True,
+        help="Path to model configuration JSON file",
+    )
+    parser.add_argument(
+        "--hardware",
+        type=str,
+        default="h800",
+        help="Hardware configuration name (h20, h800, gb200, klx_p800) or path to JSON",
+    )
+    parser.add_argument(
+        "--qps",
+        type=float,
+        required=True,
+        help="Total request rate to serve (requests per second)",
+    )
+    add_workload_arguments(parser)
+    parser.add_argument(
+        "--num_requests",
+        type=int,
+        default=2000,
+        help="Requests simulated per candidate deployment",
+    )
+    parser.add_argument(
+        "--ttft_slo", type=float, default=None, help="TTFT objective in ms"
+    )
+    parser.add_argument(
+        "--tpot_slo", type=float, default=None, help="TPOT objective in ms"
+    )
+    parser.add_argument(
+        "--slo_attainment",
+        type=float,
+        default=0.99,
+        help="Fraction of requests that must meet both SLOs",
+    )
+
+    # Instance configurations
+    parser.add_argument(
+        "--tp_range",
+        type=parse_range,
+        default="1,2,4,8",
+        help="Tensor Parallel range of a replica (e.g., '1,2,4,8' or '1-8')",
+    )
+    parser.add_argument(
+        "--dp_range",
+        type=parse_range,
+        default="1",
+        help="Data Parallel range of a replica (engines per replica)",
+    )
+    parser.add_argument(
+        "--ep_range",
+        type=parse_range,
+        default=None,
+        help="Expert Parallel range. Auto-detected for MoE models.",
+    )
+    parser.add_argument(
+        "--batch_range",
+        type=parse_range,
+        default="16,32,64,128,256",
+        help="Range of the maximum number of running sequences per engine",
+    )
+    parser.add_argument(
+        "--search_flags",
+        action="store_true",
+        help="Also search the is_mtp, deepep and enable_moe_dense_fully_dp flags",
+    )
+    parser.add_argument(
+        "--max_replicas",
+        type=int,
+        default=1024,
+        help="Largest number of replicas considered",
+    )
+
+    # Scheduling
+    parser.add_argument(
+        "--scheduler",
+        type=str,
+        default="fcfs",
+        choices=["fcfs", "spf"],
+        help="Scheduling policy of the replicas",
+    )
+    parser.add_argument(
+        "--chunked_prefill",
+        action=argparse.BooleanOptionalAction,
+        default=False,
+        help="Split prompts into chunks piggybacked on decode steps",
+    )
+    parser.add_argument(
+        "--max_num_batched_tokens",
+        type=int,
+        default=None,
+        help="Token budget of a step (default: no limit)",
+    )
+    parser.add_argument(
+        "--gpu_memory_utilization",
+        type=float,
+        default=0.9,
+        help="Fraction of HBM for weights and KV cache (bounds the KV cache)",
+    )
+    parser.add_argument(
+        "--resolution",
+        type=int,
+        default=16,
+        help="Step shape buckets per power of two (higher is more exact, slower)",
+    )
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=None,
+        help="Write the plan and every candidate's outcome to this JSON file",
+    )
+    return parser
+
+
+def format_capacity_plan(plan: CapacityPlan) -> str:
+    """Format a capacity plan for display"""
+    lines = []
+    lines.append("=" * 60)
+    lines.append("CAPACITY PLAN")
+    lines.append("=" * 60)
+    slos = []
+    if plan.ttft_slo_ms is not None:
+        slos.append(f"TTFT <= {plan.ttft_slo_ms:g}ms")
+    if plan.tpot_slo_ms is not None:
+        slos.append(f"TPOT <= {plan.tpot_slo_ms:g}ms")
+    lines.append(
+        f"\nTarget: {plan.target_qps:g} requests/s, {', '.join(slos)} for "
+        f"{100.0 * plan.slo_attainment:g}% of requests"
+    )
+    lines.append(
+        f"Search: {len(plan.candidates)} instance configurations, "
+        f"{plan.simulations} simulations in {plan.wall_time_seconds:.1f}s"
+    )
+
+    if not plan.is_feasible():
+        lines.append("\nNo deployment within the search space meets the SLOs")
+        lines.append("=" * 60)
+        return "\n".join(lines)
+
+    config = plan.config
+    summary = plan.result.get_summary()
+    lines.append(f"\nCheapest deployment: {plan.total_gpus} GPUs")
+    lines.append(
+        f"  {plan.replicas} replicas x {config.tp_size * config.dp_size} GPUs "
+        f"(TP={config.tp_size}, DP={config.dp_size}, EP={config.ep_size}, "
+        f"batch size {config.batch_size})"
+    )
+    lines.append(
+        f"  Per replica: {plan.target_qps / plan.replicas:.2f} requests/s, "
+        f"utilization {100.0 * summary['engine_utilization']:.1f}%"
+    )
+    lines.append(f"  SLO attainment: {100.0 * summary['slo_attainment']:.2f}%")
+    lines.append(
+        f"  p99 TTFT: {summary['ttft_ms_p99']:.2f} ms, "
+        f"p99 TPOT: {summary['tpot_ms_p99']:.2f} ms"
+    )
+
+    feasible = [c for c in plan.candidates if c.replicas is not None]
+    feasible.sort(key=lambda c: (c.total_gpus, -c.slo_attainment))
+    if len(feasible) > 1:
+        lines.append("\nOther deployments meeting the SLOs:")
+        for candidate in feasible[1:6]:
+            config = candidate.config
+            lines.append(
+                f"  {candidate.total_gpus:>5} GPUs: {candidate.replicas} x "
+                f"(TP={config.tp_size}, DP={config.dp_size}, EP={config.ep_size}, "
+                f"batch size {config.batch_size})"
+            )
+    lines.append("=" * 60)
+    return "\n".join(lines)
+
+
+def save_capacity_plan(plan: CapacityPlan, output_path: str):
+    """
+    Save a capacity plan to a JSON file
+
+    Args:
+        plan: Capacity plan
+        output_path: JSON file path
+    """
+
+    def config_to_dict(config: ScheduleConfig) -> dict:
+        data = {
+            "tp_size": config.tp_size,
+            "dp_size": config.dp_size,
+            "ep_size": config.ep_size,
+            "batch_size": config.batch_size,
+        }
+        for name in FLAG_NAMES:
+            data[name] = getattr(config, name)
+        return data
+
+    data = {
+        "target_qps": plan.target_qps,
+        "ttft_slo_ms": plan.ttft_slo_ms,
+        "tpot_slo_ms": plan.tpot_slo_ms,
+        "slo_attainment": plan.slo_attainment,
+        "plan": None,
+        "statistics": {
+            "candidates": len(plan.candidates),
+            "simulations": plan.simulations,
+            "total_time_seconds": plan.wall_time_seconds,
+        },
+        "candidates": [
+            {
+                "config": config_to_dict(candidate.config),
+                "gpus_per_replica": candidate.gpus_per_replica,
+                "replicas": candidate.replicas,
+                "total_gpus": candidate.total_gpus,
+                "slo_attainment": candidate.slo_attainment,
+                "simulations": candidate.simulations,
+                "pruned": candidate.pruned,
+                "error": candidate.error,
+            }
+            for candidate in plan.candidates
+        ],
+    }
+    if plan.is_feasible():
+        summary = plan.result.get_summary()
+        data["plan"] = {
+            "config": config_to_dict(plan.config),
+            "replicas": plan.replicas,
+            "total_gpus": plan.total_gpus,
+            "replica_summary": {
+                key: None if isinstance(value, float) and math.isnan(value) else value
+                for key, value in summary.items()
+            },
+        }
+    with open(output_path, "w") as f:
+        json.dump(data, f, indent=2)
+    print(f"\nCapacity plan saved to: {output_path}")
+
+
+def plan_main(argv: List[str]):
+    """Entry point of the plan command"""
+    parser = create_plan_parser()
+    args = parser.parse_args(argv)
+    if args.ttft_slo is None and args.tpot_slo is None:
+        parser.error("Give --ttft_slo and/or --tpot_slo")
+
+    print(f"Loading model configuration from: {args.model_path}")
+    model_config = load_model_config(args.model_path)
+    print(f"Loading hardware configuration: {args.hardware}")
+    hardware_config = load_hardware_config(args.hardware)
+
+    ep_range = args.ep_range
+    if ep_range is None:
+        # Auto-detect for MoE models
+        if model_config.is_moe():
+            ep_range = [1, 2, 4, 8, 16]
+        else:
+            ep_range = [1]
+    search_config = SearchSpaceConfig(
+        tp_size=args.tp_range,
+        dp_size=args.dp_range,
+        ep_size=ep_range,
+        batch_size=args.batch_range,
+    )
+    if args.search_flags:
+        for name in FLAG_NAMES:
+            setattr(search_config, name, [False, True])
+
+    print(
+        f"\nPlanning capacity for {args.qps:g} requests/s "
+        f"({args.num_requests} requests simulated per candidate)..."
+    )
+    try:
+        plan = plan_capacity(
+            model_config,
+            hardware_config,
+            target_qps=args.qps,
+            prompt_lengths=args.prompt_len,
+            output_lengths=args.output_len,
+            ttft_slo_ms=args.ttft_slo,
+            tpot_slo_ms=args.tpot_slo,
+            slo_attainment=args.slo_attainment,
+            search_space_config=search_config,
+            max_replicas=args.max_replicas,
+            arrival=args.arrival,
+            burstiness=args.burstiness,
+            num_requests=args.num_requests,
+            seed=args.seed,
+            scheduler=create_scheduler(
+                args.scheduler, args.max_num_batched_tokens, args.chunked_prefill
+            ),
+            gpu_memory_utilization=args.gpu_memory_utilization,
+            resolution=args.resolution,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    print(format_capacity_plan(plan))
+    if args.output:
+        save_capacity_plan(plan, args.output)
+
+
+def main(argv: Optional[List[str]] = None):
+    """Main entry point"""
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ["plan"]:
+        plan_main(argv[1:])
+        return
+
+    parser = create_parser()
+    args = parser.parse_args(argv)
+
+    print(f"Loading model configuration from: {args.model_path}")
+    model_config = load_model_config(args.model_path)
+    print(f"Loading hardware configuration: {args.hardware}")
+    hardware_config = load_hardware_config(args.hardware)
+
+    base_config = ScheduleConfig(
+        batch_size=args.batch_size,
+        tp_size=args.tp_size,
+        dp_size=args.dp_size,
+        ep_size=args.ep_size,
+        world_size=args.tp_size * args.dp_size,
+        **{name: getattr(args, name) for name in FLAG_NAMES},
+    )
+    if (args.qps is None) == (args.trace is None):
+        parser.error("Give either --qps (synthetic workload) or --trace")
+    try:
+        cost_model = StepCostModel(
+            model_config, hardware_config, base_config, resolution=args.resolution
+        )
+        if args.trace:
+            workload = TraceWorkload(
+                args.trace,
+                trace_format=args.trace_format,
+                timestamp_unit=args.timestamp_unit,
+                speedup=args.speedup,
+                limit=args.num_requests,
+            )
+            print(f"Replaying trace: {args.trace}")
+        else:
+            workload = SyntheticWorkload(
+                arrivals=create_arrival_process(
+                    args.arrival, args.qps, args.burstiness
+                ),
+                prompt_lengths=args.prompt_len,
+                output_lengths=args.output_len,
+                num_requests=args.num_requests or 10000,
+                seed=args.seed,
+            )
+            print(f"Simulating {len(workload)} requests at {args.qps:g} QPS...")
+    except ValueError as e:
+        parser.error(str(e))
+
+    chunked_options = {"off": [False], "on": [True], "both": [False, True]}
+    schedulers = [
+        create_scheduler(name, args.max_num_batched_tokens, chunked_prefill)
+        for name, chunked_prefill in itertools.product(
+            args.scheduler, chunked_options[args.chunked_prefill]
+        )
+    ]
+    if len(schedulers) > 1 and args.stream_results:
+        parser.error("--stream_results needs a single scheduling policy")
+
+    results = []
+    try:
+        kv_cache_tokens = None
+        if args.gpu_memory_utilization is not None:
+            kv_cache_tokens = cost_model.get_kv_cache_capacity(
+                args.gpu_memory_utilization
+            )
+            print(f"KV cache capacity: {kv_cache_tokens} tokens per engine")
+        for scheduler in schedulers:
+            simulator = ServingSimulator(
+                cost_model, scheduler=scheduler, kv_cache_tokens=kv_cache_tokens
+            )
+            result = simulator.run(
+                workload,
+                ttft_slo_ms=args.ttft_slo,
+                tpot_slo_ms=args.tpot_slo,
+                keep_requests=not args.stream_results,
+                request_log=args.output if args.stream_results else None,
+            )
+            print(format_serving_result(result))
+            results.append(result)
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        sys.exit(1)
+
+    result = results[0]
+    if len(results) > 1:
+        print(format_policy_comparison(results))
+        result = max(
+            results, key=lambda r: np.nan_to_num(r.get_summary()["goodput_rps"])
+        )
+
+    if args.output:
+        if not args.stream_results:
+            result.save(args.output)
+        print(f"\nPer-request results saved to: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
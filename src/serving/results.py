@@ -0,0 +1,447 @@
+"""
+Serving simulation results data structures
+"""
+
+import csv
+import gzip
+import math
+from array import array
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.arch.config import ScheduleConfig
+from src.serving.workload import Request
+
+# Percentiles reported for every latency metric
+PERCENTILES = (50, 90, 99)
+
+# Per-request latency columns of a ServingResult (milliseconds)
+LATENCY_METRICS = ("queue_ms", "ttft_ms", "tpot_ms", "e2e_ms")
+
+# Columns of per-request results files (see ServingResult.save and RequestRecorder)
+REQUEST_COLUMNS = (
+    "request_id",
+    "prefix_id",
+    "arrival_s",
+    "prompt_tokens",
+    "output_tokens",
+) + LATENCY_METRICS
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed histogram with bounded relative quantile error
+
+    Bucket bounds grow geometrically, so every quantile is within relative_error of
+    the exact value while memory stays constant (a few thousand buckets span
+    microseconds to days). Used instead of per-request arrays when results are
+    streamed to disk.
+    """
+
+    # Values at or below this are counted as zero
+    MIN_VALUE = 1e-9
+
+    def __init__(self, relative_error: float = 0.005):
+        """
+        Args:
+            relative_error: Maximum relative error of quantiles
+        """
+        self.relative_error = relative_error
+        self._gamma = (1 + relative_error) / (1 - relative_error)
+        self._log_gamma = math.log(self._gamma)
+        self.counts: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value: float) -> None:
+        """Count one value (NaN is ignored)"""
+        if value != value:
+            return
+        self.count += 1
+        self.total += value
+        if value <= self.MIN_VALUE:
+            self.zero_count += 1
+            return
+        key = math.ceil(math.log(value) / self._log_gamma)
+        self.counts[key] = self.counts.get(key, 0) + 1
+
+    def mean(self) -> float:
+        """Exact mean of the counted values"""
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Approximate percentile of the counted values
+
+        Args:
+            percentile: Percentile in [0, 100]
+
+        Returns:
+            Value (NaN if the histogram is empty)
+        """
+        if not self.count:
+            return math.nan
+        rank = percentile / 100.0 * (self.count - 1)
+        seen = self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen > rank:
+                return 2.0 * self._gamma**key / (self._gamma + 1)
+        return 2.0 * self._gamma ** max(self.counts) / (self._gamma + 1)
+
+
+@dataclass
+class ServingResult:
+    """
+    Result of a serving simulation
+
+    Per-request arrays are indexed in arrival order. They are None when the run
+    streamed its per-request results to disk (see RequestRecorder); the summary is
+    then computed from latency histograms. The TPOT of a request with a single
+    output token is NaN (it has no inter-token interval).
+    """
+
+    num_requests: int = 0
+    total_output_tokens: int = 0
+    # Requests meeting the TTFT SLO, the TPOT SLO, and both
+    ttft_slo_met: int = 0
+    tpot_slo_met: int = 0
+    slo_met: int = 0
+    # Simulated time from the first arrival to the last completion
+    duration_s: float = 0.0
+    num_engines: int = 1
+    num_gpus: int = 1
+    # Scheduling policy (see Scheduler.get_description)
+    scheduler: str = ""
+    # Steps prefilling prompt tokens and steps decoding (a chunked-prefill step that
+    # does both counts as both)
+    prefill_steps: int = 0
+    decode_steps: int = 0
+    # Mean number of sequences in a decode step
+    mean_decode_batch: float = 0.0
+    # Sequences evicted from the KV cache to be recomputed
+    preemptions: int = 0
+    # Fraction of the simulated time the engines were running a step
+    engine_utilization: float = 0.0
+    ttft_slo_ms: Optional[float] = None
+    tpot_slo_ms: Optional[float] = None
+    wall_time_seconds: float = 0.0
+    step_cache_stats: Dict[str, float] = field(default_factory=dict)
+
+    # Per-request results (None when streamed)
+    request_id: Optional[np.ndarray] = None
+    prefix_id: Optional[List[Optional[str]]] = None
+    arrival_s: Optional[np.ndarray] = None
+    prompt_tokens: Optional[np.ndarray] = None
+    output_tokens: Optional[np.ndarray] = None
+    queue_ms: Optional[np.ndarray] = None
+    ttft_ms: Optional[np.ndarray] = None
+    tpot_ms: Optional[np.ndarray] = None
+    e2e_ms: Optional[np.ndarray] = None
+    # Latency histograms (streamed runs only)
+    histograms: Dict[str, LatencyHistogram] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return self.num_requests
+
+    def get_slo_mask(self) -> np.ndarray:
+        """Requests meeting both SLOs (an unset SLO is always met)"""
+        if self.ttft_ms is None:
+            raise ValueError("Per-request results were streamed, not kept")
+        return _slo_mask(self.ttft_ms, self.tpot_ms, self.ttft_slo_ms, self.tpot_slo_ms)
+
+    def get_summary(self) -> Dict[str, float]:
+        """
+        Aggregate metrics of the simulation
+
+        Returns:
+            Dictionary with latency percentiles (e.g. ttft_ms_p99), means, request and
+            token throughput, SLO attainment and goodput (requests per second meeting
+            both SLOs)
+        """
+        summary = {"requests": self.num_requests, "duration_s": self.duration_s}
+        for name in LATENCY_METRICS:
+            values = getattr(self, name)
+            if values is None:
+                histogram = self.histograms[name]
+                summary[f"{name}_mean"] = histogram.mean()
+                for percentile in PERCENTILES:
+                    summary[f"{name}_p{percentile}"] = histogram.percentile(percentile)
+                continue
+            values = values[~np.isnan(values)]
+            summary[f"{name}_mean"] = float(values.mean()) if len(values) else np.nan
+            for percentile in PERCENTILES:
+                summary[f"{name}_p{percentile}"] = (
+                    float(np.percentile(values, percentile)) if len(values) else np.nan
+                )
+
+        duration = self.duration_s if self.duration_s > 0 else np.nan
+        count = self.num_requests if self.num_requests else np.nan
+        summary["request_throughput_rps"] = self.num_requests / duration
+        summary["output_throughput_tps"] = self.total_output_tokens / duration
+        summary["output_throughput_per_gpu"] = (
+            summary["output_throughput_tps"] / self.num_gpus
+        )
+        summary["ttft_slo_attainment"] = self.ttft_slo_met / count
+        summary["tpot_slo_attainment"] = self.tpot_slo_met / count
+        summary["slo_attainment"] = self.slo_met / count
+        summary["goodput_rps"] = self.slo_met / duration
+        summary["goodput_per_gpu"] = summary["goodput_rps"] / self.num_gpus
+        summary["mean_decode_batch"] = self.mean_decode_batch
+        summary["preemptions"] = self.preemptions
+        summary["engine_utilization"] = self.engine_utilization
+        return summary
+
+    def save(self, path: str) -> None:
+        """
+        Save the per-request metrics as CSV (gzip-compressed for a .gz path)
+
+        Args:
+            path: Output CSV file path
+        """
+        met = self.get_slo_mask()
+        arrays = [
+            self.request_id.tolist(),
+            self.prefix_id,
+            self.arrival_s.tolist(),
+            self.prompt_tokens.tolist(),
+            self.output_tokens.tolist(),
+        ] + [getattr(self, name).tolist() for name in LATENCY_METRICS]
+        with _open_text(path) as f:
+            writer = csv.writer(f)
+            writer.writerow(REQUEST_COLUMNS + ("slo_met",))
+            for index, row in enumerate(zip(*arrays)):
+                writer.writerow(row + (bool(met[index]),))
+
+
+def _slo_mask(
+    ttft_ms: np.ndarray,
+    tpot_ms: np.ndarray,
+    ttft_slo_ms: Optional[float],
+    tpot_slo_ms: Optional[float],
+) -> np.ndarray:
+    """Requests meeting both SLOs (NaN TPOT meets any TPOT SLO)"""
+    met = np.ones(len(ttft_ms), dtype=bool)
+    if ttft_slo_ms is not None:
+        met &= ttft_ms <= ttft_slo_ms
+    if tpot_slo_ms is not None:
+        met &= np.isnan(tpot_ms) | (tpot_ms <= tpot_slo_ms)
+    return met
+
+
+def _open_text(path: str, mode: str = "w"):
+    """Open a text file, gzip-compressed if the path ends with .gz"""
+    if path.endswith(".gz"):
+        return gzip.open(path, mode + "t", newline="")
+    return open(path, mode, newline="")
+
+
+class RequestRecorder:
+    """
+    Collects the completed requests of a simulation
+
+    With keep_requests, per-request results are kept as arrays (exact percentiles,
+    memory linear in the number of requests). Otherwise only latency histograms and
+    counters are kept, so memory stays constant however long the workload is; with
+    log_path set, every request is also written to that CSV file as it completes.
+    """
+
+    def __init__(
+        self,
+        ttft_slo_ms: Optional[float] = None,
+        tpot_slo_ms: Optional[float] = None,
+        keep_requests: bool = True,
+        log_path: Optional[str] = None,
+    ):
+        """
+        Args:
+            ttft_slo_ms: TTFT objective (None for no limit)
+            tpot_slo_ms: TPOT objective (None for no limit)
+            keep_requests: Keep per-request arrays in memory
+            log_path: CSV file (.gz for compression) receiving every completed request
+        """
+        self.ttft_slo_ms = ttft_slo_ms
+        self.tpot_slo_ms = tpot_slo_ms
+        self.keep_requests = keep_requests
+        self.count = 0
+        self.output_tokens = 0
+        self.ttft_slo_met = 0
+        self.tpot_slo_met = 0
+        self.slo_met = 0
+        self.first_arrival = math.inf
+        self.last_finish = -math.inf
+        self.histograms = {
+            name: LatencyHistogram() for name in LATENCY_METRICS if not keep_requests
+        }
+        integer_columns = ("order", "request_id", "prompt_tokens", "output_tokens")
+        self._columns = {
+            name: array("q" if name in integer_columns else "d")
+            for name in ("order",) + REQUEST_COLUMNS
+            if name != "prefix_id"
+        }
+        self._prefix_ids: List[Optional[str]] = []
+        self._log = None
+        self._writer = None
+        if log_path is not None:
+            self._log = _open_text(log_path)
+            self._writer = csv.writer(self._log)
+            self._writer.writerow(REQUEST_COLUMNS + ("slo_met",))
+
+    def add(
+        self,
+        order: int,
+        request: Request,
+        start_s: float,
+        first_token_s: float,
+        finish_s: float,
+    ) -> None:
+        """
+        Record one completed request
+
+        Args:
+            order: Position of the request in arrival order
+            request: The request
+            start_s: Time its prefill step started
+            first_token_s: Time its first token was emitted
+            finish_s: Time its last token was emitted
+        """
+        arrival = request.arrival_time
+        queue_ms = (start_s - arrival) * 1000.0
+        ttft_ms = (first_token_s - arrival) * 1000.0
+        e2e_ms = (finish_s - arrival) * 1000.0
+        tpot_ms = math.nan
+        if request.output_tokens > 1:
+            tpot_ms = (finish_s - first_token_s) * 1000.0 / (request.output_tokens - 1)
+
+        ttft_met = self.ttft_slo_ms is None or ttft_ms <= self.ttft_slo_ms
+        tpot_met = self.tpot_slo_ms is None or not tpot_ms > self.tpot_slo_ms
+        self.count += 1
+        self.output_tokens += request.output_tokens
+        self.ttft_slo_met += ttft_met
+        self.tpot_slo_met += tpot_met
+        self.slo_met += ttft_met and tpot_met
+        self.first_arrival = min(self.first_arrival, arrival)
+        self.last_finish = max(self.last_finish, finish_s)
+
+        latencies = (queue_ms, ttft_ms, tpot_ms, e2e_ms)
+        if self.keep_requests:
+            columns = self._columns
+            columns["order"].append(order)
+            columns["request_id"].append(request.request_id)
+            columns["arrival_s"].append(arrival)
+            columns["prompt_tokens"].append(request.prompt_tokens)
+            columns["output_tokens"].append(request.output_tokens)
+            for name, value in zip(LATENCY_METRICS, latencies):
+                columns[name].append(value)
+            self._prefix_ids.append(request.prefix_id)
+        else:
+            for name, value in zip(LATENCY_METRICS, latencies):
+                self.histograms[name].add(value)
+        if self._writer is not None:
+            self._writer.writerow(
+                (
+                    request.request_id,
+                    request.prefix_id,
+                    arrival,
+                    request.prompt_tokens,
+                    request.output_tokens,
+                )
+                + latencies
+                + (ttft_met and tpot_met,)
+            )
+
+    def close(self) -> None:
+        """Flush and close the request log"""
+        if self._log is not None:
+            self._log.close()
+            self._log = None
+            self._writer = None
+
+    def get_result(self, **stats) -> ServingResult:
+        """
+        Build the result of the simulation
+
+        Args:
+            **stats: Engine statistics (ServingResult fields)
+
+        Returns:
+            Serving result, with per-request arrays in arrival order if kept
+        """
+        result = ServingResult(
+            num_requests=self.count,
+            total_output_tokens=self.output_tokens,
+            ttft_slo_met=self.ttft_slo_met,
+            tpot_slo_met=self.tpot_slo_met,
+            slo_met=self.slo_met,
+            duration_s=max(0.0, self.last_finish - self.first_arrival),
+            ttft_slo_ms=self.ttft_slo_ms,
+            tpot_slo_ms=self.tpot_slo_ms,
+            histograms=self.histograms,
+            **stats,
+        )
+        if self.keep_requests:
+            order = np.argsort(np.frombuffer(self._columns["order"], dtype=np.int64))
+            for name, column in self._columns.items():
+                if name != "order":
+                    dtype = np.int64 if column.typecode == "q" else np.float64
+                    setattr(result, name, np.frombuffer(column, dtype=dtype)[order])
+            result.prefix_id = [self._prefix_ids[index] for index in order.tolist()]
+        return result
+
+
+@dataclass
+class CapacityCandidate:
+    """Replica search outcome of one instance configuration"""
+
+    config: ScheduleConfig
+    gpus_per_replica: int
+    # Fewest replicas meeting the SLOs (None if none within the bound)
+    replicas: Optional[int] = None
+    # SLO attainment at that replica count (at the largest count tried otherwise)
+    slo_attainment: float = 0.0
+    simulations: int = 0
+    # Whether the search stopped because the config could not beat the best plan
+    pruned: bool = False
+    # Why the configuration cannot serve the workload, if it cannot
+    error: Optional[str] = None
+
+    @property
+    def total_gpus(self) -> Optional[int]:
+        """GPUs of the deployment (None if the SLOs are not met)"""
+        if self.replicas is None:
+            return None
+        return self.replicas * self.gpus_per_replica
+
+
+@dataclass
+class CapacityPlan:
+    """
+    Cheapest deployment meeting latency SLOs at a target request rate
+
+    The request rate is split evenly across identical replicas, so result is the
+    simulation of one replica at target_qps / replicas.
+    """
+
+    target_qps: float
+    ttft_slo_ms: Optional[float]
+    tpot_slo_ms: Optional[float]
+    # Fraction of requests that must meet both SLOs
+    slo_attainment: float
+    # Chosen instance configuration and replica count (None if no deployment within
+    # the bounds meets the SLOs)
+    config: Optional[ScheduleConfig] = None
+    replicas: int = 0
+    total_gpus: int = 0
+    result: Optional[ServingResult] = None
+    candidates: List[CapacityCandidate] = field(default_factory=list)
+    simulations: int = 0
+    wall_time_seconds: float = 0.0
+
+    def is_feasible(self) -> bool:
+        """Whether a deployment meeting the SLOs was found"""
+        return self.config is not None
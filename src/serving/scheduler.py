@@ -0,0 +1,366 @@
+"""
+Scheduler policies - admission order, step composition and preemption of serving engines
+"""
+
+import heapq
+import itertools
+import math
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+from src.serving.workload import Request
+
+
+class SequenceState:
+    """A request in flight"""
+
+    __slots__ = (
+        "order",
+        "request",
+        "start",
+        "first_token",
+        "generated",
+        "computed",
+        "offset",
+        "entry",
+    )
+
+    def __init__(self, order: int, request: Request):
+        # Position in arrival order
+        self.order = order
+        self.request = request
+        # Time the sequence was first scheduled (None while it has not been)
+        self.start: Optional[float] = None
+        self.first_token = 0.0
+        # Output tokens generated so far, kept across preemptions
+        self.generated = 0
+        # Tokens of the current prefill already computed
+        self.computed = 0
+        # Context length minus the engine's decode_steps while running
+        self.offset = 0
+        # Entry of the sequence in its engine's finish heap (None unless running)
+        self.entry: Optional[tuple] = None
+
+    @property
+    def prefill_tokens(self) -> int:
+        """Tokens to prefill: the prompt, plus the tokens generated before a preemption"""
+        return self.request.prompt_tokens + self.generated
+
+
+class EngineState:
+    """State of one engine (data-parallel rank) during a simulation"""
+
+    __slots__ = (
+        "index",
+        "kv_capacity",
+        "running",
+        "decode_steps",
+        "finish_heap",
+        "context_offset",
+        "prefilling",
+        "reserved_tokens",
+        "busy_time",
+        "preemptions",
+        "plan",
+    )
+
+    def __init__(self, index: int, kv_capacity: Optional[int] = None):
+        """
+        Args:
+            index: Engine index
+            kv_capacity: KV cache capacity in tokens (None for unlimited)
+        """
+        self.index = index
+        self.kv_capacity = kv_capacity
+        # Sequences in the decode batch by order, in the order they started decoding
+        self.running: Dict[int, SequenceState] = {}
+        self.decode_steps = 0
+        # (decode step at which the sequence finishes, order, sequence); entries of
+        # preempted sequences are left in place and skipped
+        self.finish_heap: List[tuple] = []
+        # Sum over running sequences of (context length - decode_steps), so that the
+        # total context length is context_offset + len(running) * decode_steps
+        self.context_offset = 0
+        # Sequences admitted for prefill and not fully prefilled, in admission order
+        self.prefilling: List[SequenceState] = []
+        # KV cache tokens reserved for the prompts of the prefilling sequences
+        self.reserved_tokens = 0
+        self.busy_time = 0.0
+        self.preemptions = 0
+        # Plan of the step in flight
+        self.plan: Optional["StepPlan"] = None
+
+    def get_num_sequences(self) -> int:
+        """Number of sequences holding a batch slot"""
+        return len(self.running) + len(self.prefilling)
+
+    def get_context_tokens(self) -> int:
+        """Total context length of the running sequences"""
+        return self.context_offset + len(self.running) * self.decode_steps
+
+    def get_free_kv_tokens(self) -> float:
+        """KV cache tokens neither used nor reserved (inf if unlimited)"""
+        if self.kv_capacity is None:
+            return math.inf
+        return self.kv_capacity - self.get_context_tokens() - self.reserved_tokens
+
+    def admit(self, seq: SequenceState) -> None:
+        """Start prefilling a sequence, reserving KV cache for its whole prompt"""
+        seq.computed = 0
+        self.prefilling.append(seq)
+        self.reserved_tokens += seq.prefill_tokens
+
+    def pop_prefilled(self) -> List[SequenceState]:
+        """Remove the fully prefilled sequences, releasing their reservations"""
+        prefilled = []
+        prefilling = []
+        for seq in self.prefilling:
+            if seq.computed >= seq.prefill_tokens:
+                self.reserved_tokens -= seq.prefill_tokens
+                prefilled.append(seq)
+            else:
+                prefilling.append(seq)
+        self.prefilling = prefilling
+        return prefilled
+
+    def start_decoding(self, seq: SequenceState) -> None:
+        """Add a prefilled sequence to the decode batch"""
+        seq.offset = seq.request.prompt_tokens + seq.generated - self.decode_steps
+        finish_step = self.decode_steps + seq.request.output_tokens - seq.generated
+        seq.entry = (finish_step, seq.order, seq)
+        self.running[seq.order] = seq
+        self.context_offset += seq.offset
+        heapq.heappush(self.finish_heap, seq.entry)
+
+    def pop_finished(self) -> List[SequenceState]:
+        """Remove the sequences that generated their last token"""
+        finished = []
+        finish_heap = self.finish_heap
+        while finish_heap and finish_heap[0][0] <= self.decode_steps:
+            entry = heapq.heappop(finish_heap)
+            seq = entry[2]
+            if seq.entry is not entry:
+                continue
+            seq.entry = None
+            del self.running[seq.order]
+            self.context_offset -= seq.offset
+            finished.append(seq)
+        return finished
+
+    def preempt(self, seq: SequenceState) -> None:
+        """Evict a running sequence, freeing its KV cache for recomputation"""
+        del self.running[seq.order]
+        self.context_offset -= seq.offset
+        seq.generated = seq.offset + self.decode_steps - seq.request.prompt_tokens
+        seq.entry = None
+        self.preemptions += 1
+
+
+class StepPlan:
+    """Composition of one engine step"""
+
+    __slots__ = ("prefill", "decode")
+
+    def __init__(self, prefill: List[Tuple[SequenceState, int]], decode: bool):
+        """
+        Args:
+            prefill: (sequence, tokens) of every prompt chunk prefilled in the step
+            decode: Whether every running sequence generates a token in the step
+        """
+        self.prefill = prefill
+        self.decode = decode
+
+
+class Scheduler(ABC):
+    """
+    Scheduling policy of continuous-batching engines
+
+    A scheduler owns the queue of waiting sequences shared by all engines and
+    decides the composition of every engine step. Subclasses define the queue
+    order (get_priority) and may override the choice of preempted sequences
+    (select_victim) or the step composition itself (schedule).
+
+    Without chunked prefill, a step prefills whole prompts while the engine has
+    free batch slots and decodes otherwise (prefill-first). With chunked prefill,
+    every step decodes all running sequences and fills the rest of the token
+    budget with prompt chunks, so long prompts do not stall the decode batch.
+
+    Admitted sequences reserve KV cache for their whole prompt. When the running
+    sequences have no room for one more token each, the most recently started are
+    preempted: their KV cache is freed and they return to the queue, to prefill
+    their prompt and the tokens generated so far again (recompute).
+    """
+
+    name = ""
+
+    def __init__(
+        self,
+        max_num_batched_tokens: Optional[int] = None,
+        chunked_prefill: bool = False,
+    ):
+        """
+        Args:
+            max_num_batched_tokens: Token budget of a step (None for no limit); a
+                prompt longer than the budget is prefilled alone without chunking
+            chunked_prefill: Split prompts into chunks piggybacked on decode steps
+        """
+        if max_num_batched_tokens is not None and max_num_batched_tokens < 1:
+            raise ValueError(
+                f"max_num_batched_tokens must be positive: {max_num_batched_tokens}"
+            )
+        self.max_num_batched_tokens = max_num_batched_tokens
+        self.chunked_prefill = chunked_prefill
+        self._queue: List[tuple] = []
+        self._counter = itertools.count()
+
+    @abstractmethod
+    def get_priority(self, seq: SequenceState) -> tuple:
+        """Queue key of a waiting sequence (lower keys are admitted first)"""
+        pass
+
+    def get_description(self) -> str:
+        """Short description of the policy and its options"""
+        options = []
+        if self.max_num_batched_tokens is not None:
+            options.append(f"max {self.max_num_batched_tokens} tokens/step")
+        if self.chunked_prefill:
+            options.append("chunked prefill")
+        return f"{self.name} ({', '.join(options)})" if options else self.name
+
+    def reset(self) -> None:
+        """Empty the waiting queue"""
+        self._queue = []
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def add(self, seq: SequenceState) -> None:
+        """Queue a new or preempted sequence"""
+        heapq.heappush(self._queue, (self.get_priority(seq), next(self._counter), seq))
+
+    def peek(self) -> Optional[SequenceState]:
+        """Next sequence to admit (None if the queue is empty)"""
+        return self._queue[0][2] if self._queue else None
+
+    def pop(self) -> SequenceState:
+        """Remove the next sequence to admit"""
+        return heapq.heappop(self._queue)[2]
+
+    def select_victim(self, engine: EngineState) -> SequenceState:
+        """Running sequence to preempt (default: the one that started decoding last)"""
+        return engine.running[next(reversed(engine.running))]
+
+    def schedule(self, engine: EngineState, max_batch_size: int) -> Optional[StepPlan]:
+        """
+        Compose the next step of an engine
+
+        Args:
+            engine: Engine state (admissions and preemptions are applied to it)
+            max_batch_size: Maximum number of sequences holding a batch slot
+
+        Returns:
+            Step plan (None if the engine has nothing to do)
+        """
+        budget = self.max_num_batched_tokens or math.inf
+        if not self.chunked_prefill:
+            prefill = []
+            tokens = 0
+            while self._queue and engine.get_num_sequences() < max_batch_size:
+                seq = self.peek()
+                length = seq.prefill_tokens
+                if prefill and tokens + length > budget:
+                    break
+                if length > engine.get_free_kv_tokens():
+                    break
+                engine.admit(self.pop())
+                prefill.append((seq, length))
+                tokens += length
+            if prefill:
+                return StepPlan(prefill, False)
+            if not engine.running:
+                return None
+            if engine.kv_capacity is not None:
+                self._preempt_for_decode(engine)
+            return StepPlan([], True)
+
+        preempted = self._preempt_for_decode(engine)
+        budget -= len(engine.running)
+        prefill = []
+        for seq in engine.prefilling:
+            if budget <= 0:
+                break
+            chunk = min(seq.prefill_tokens - seq.computed, budget)
+            prefill.append((seq, chunk))
+            budget -= chunk
+        # No admissions in a step that preempts, to avoid readmitting the victims
+        while (
+            not preempted
+            and self._queue
+            and budget > 0
+            and engine.get_num_sequences() < max_batch_size
+        ):
+            seq = self.peek()
+            if seq.prefill_tokens > engine.get_free_kv_tokens():
+                break
+            engine.admit(self.pop())
+            chunk = min(seq.prefill_tokens, budget)
+            prefill.append((seq, chunk))
+            budget -= chunk
+        if not prefill and not engine.running:
+            return None
+        return StepPlan(prefill, bool(engine.running))
+
+    def _preempt_for_decode(self, engine: EngineState) -> bool:
+        """Preempt until every running sequence can store one more token"""
+        preempted = False
+        while engine.running and engine.get_free_kv_tokens() < len(engine.running):
+            seq = self.select_victim(engine)
+            engine.preempt(seq)
+            self.add(seq)
+            preempted = True
+        return preempted
+
+
+class FCFSScheduler(Scheduler):
+    """First come, first served: sequences are admitted in arrival order"""
+
+    name = "fcfs"
+
+    def get_priority(self, seq: SequenceState) -> tuple:
+        return (seq.order,)
+
+
+class ShortestPromptFirstScheduler(Scheduler):
+    """
+    Shortest prompt first: the waiting sequence with the fewest tokens to prefill
+    is admitted first (arrival order among equal lengths), which cuts the queueing
+    delay of short requests at the expense of long ones
+    """
+
+    name = "spf"
+
+    def get_priority(self, seq: SequenceState) -> tuple:
+        return (seq.prefill_tokens, seq.order)
+
+
+def create_scheduler(
+    name: str,
+    max_num_batched_tokens: Optional[int] = None,
+    chunked_prefill: bool = False,
+) -> Scheduler:
+    """
+    Factory function to create a scheduler
+
+    Args:
+        name: "fcfs" or "spf" (shortest prompt first)
+        max_num_batched_tokens: Token budget of a step (None for no limit)
+        chunked_prefill: Split prompts into chunks piggybacked on decode steps
+
+    Returns:
+        Scheduler
+    """
+    if name == "fcfs":
+        return FCFSScheduler(max_num_batched_tokens, chunked_prefill)
+    if name == "spf":
+        return ShortestPromptFirstScheduler(max_num_batched_tokens, chunked_prefill)
+    raise ValueError(f"Unknown scheduler: {name}")
@@ -0,0 +1,244 @@
+"""
+Serving simulator - discrete-event simulation of continuous-batching inference engines
+"""
+
+import heapq
+import itertools
+import time
+from typing import Iterable, List, Optional
+
+from src.serving.results import RequestRecorder, ServingResult
+from src.serving.scheduler import (
+    EngineState,
+    FCFSScheduler,
+    Scheduler,
+    SequenceState,
+)
+from src.serving.step_cost import StepCostModel
+from src.serving.workload import Request
+
+# Event kinds, in processing order for events at the same time: a request arriving
+# when a step ends is visible to the step scheduled next
+_ARRIVAL = 0
+_STEP_DONE = 1
+
+
+class ServingSimulator:
+    """
+    Discrete-event simulator of continuous-batching serving
+
+    Each data-parallel rank of the instance is an engine running a step loop.
+    What a step does is decided by a Scheduler: by default (FCFS, prefill-first)
+    a step either prefills waiting requests when the engine has free batch slots,
+    emitting their first token at the end of the step, or decodes one token for
+    every running sequence. Requests wait in one queue shared by the engines and
+    are picked up by whichever engine schedules a step first. Step durations come
+    from a StepCostModel at the shape of every step the scheduler composes.
+
+    Arrivals and step completions are kept in a heap ordered by time, and requests
+    are pulled from the workload one at a time; completed requests go to a
+    RequestRecorder, so without keep_requests memory is bounded by the requests in
+    flight. Per-sequence progress is not tracked step by step: every engine keeps a
+    heap of the decode step at which each sequence finishes, so a decode step costs
+    O(1) plus O(log n) per finishing sequence.
+    """
+
+    def __init__(
+        self,
+        cost_model: StepCostModel,
+        max_batch_size: Optional[int] = None,
+        num_engines: Optional[int] = None,
+        scheduler: Optional[Scheduler] = None,
+        kv_cache_tokens: Optional[int] = None,
+    ):
+        """
+        Args:
+            cost_model: Step cost model of the instance
+            max_batch_size: Maximum number of running sequences per engine (default
+                the base configuration's batch_size)
+            num_engines: Number of engines (default the base configuration's dp_size)
+            scheduler: Scheduling policy (default FCFSScheduler without token budget)
+            kv_cache_tokens: KV cache capacity of an engine in tokens, beyond which
+                sequences are preempted (None for unlimited, see
+                StepCostModel.get_kv_cache_capacity)
+        """
+        base_config = cost_model.base_config
+        self.cost_model = cost_model
+        self.max_batch_size = max_batch_size or base_config.batch_size
+        self.num_engines = num_engines or base_config.dp_size
+        self.scheduler = scheduler if scheduler is not None else FCFSScheduler()
+        self.kv_cache_tokens = kv_cache_tokens
+        if self.max_batch_size < 1 or self.num_engines < 1:
+            raise ValueError(
+                "Batch size and number of engines must be positive: "
+                f"{self.max_batch_size}, {self.num_engines}"
+            )
+        if kv_cache_tokens is not None and kv_cache_tokens < 1:
+            raise ValueError(f"KV cache capacity must be positive: {kv_cache_tokens}")
+
+    def run(
+        self,
+        requests: Iterable[Request],
+        ttft_slo_ms: Optional[float] = None,
+        tpot_slo_ms: Optional[float] = None,
+        keep_requests: bool = True,
+        request_log: Optional[str] = None,
+    ) -> ServingResult:
+        """
+        Simulate serving a stream of requests
+
+        Args:
+            requests: Requests in arrival order
+            ttft_slo_ms: TTFT objective used for goodput (None for no limit)
+            tpot_slo_ms: TPOT objective used for goodput (None for no limit)
+            keep_requests: Keep per-request results in memory; otherwise only latency
+                histograms are kept, so memory stays flat for arbitrarily long workloads
+            request_log: CSV file (.gz for compression) receiving every request's
+                latencies as it completes
+
+        Returns:
+            Serving result
+
+        Raises:
+            ValueError: If a request cannot fit in the KV cache of an engine
+        """
+        wall_start = time.time()
+        cost_model = self.cost_model
+        scheduler = self.scheduler
+        max_batch_size = self.max_batch_size
+        kv_cache_tokens = self.kv_cache_tokens
+        recorder = RequestRecorder(
+            ttft_slo_ms=ttft_slo_ms,
+            tpot_slo_ms=tpot_slo_ms,
+            keep_requests=keep_requests,
+            log_path=request_log,
+        )
+
+        scheduler.reset()
+        engines = [
+            EngineState(index, kv_cache_tokens) for index in range(self.num_engines)
+        ]
+        idle = list(reversed(range(self.num_engines)))
+        events: List[tuple] = []
+        sequence = itertools.count()
+        stats = {
+            "arrivals": 0,
+            "prefill_steps": 0,
+            "decode_steps": 0,
+            "decode_batch": 0,
+        }
+
+        def push_next_arrival() -> None:
+            request = next(request_iter, None)
+            if request is None:
+                return
+            if (
+                kv_cache_tokens is not None
+                and request.prompt_tokens + request.output_tokens > kv_cache_tokens
+            ):
+                raise ValueError(
+                    f"Request {request.request_id} needs "
+                    f"{request.prompt_tokens + request.output_tokens} KV cache tokens, "
+                    f"more than the {kv_cache_tokens} of an engine"
+                )
+            heapq.heappush(
+                events,
+                (request.arrival_time, _ARRIVAL, next(sequence), request),
+            )
+
+        def start_step(engine: EngineState, now: float) -> bool:
+            """Schedule the engine's next step, returning False if it has no work"""
+            plan = scheduler.schedule(engine, max_batch_size)
+            if plan is None:
+                return False
+            decode_batch = len(engine.running) if plan.decode else 0
+            context_tokens = engine.context_offset + decode_batch * engine.decode_steps
+            if plan.prefill:
+                chunks = []
+                for seq, tokens in plan.prefill:
+                    if seq.start is None:
+                        seq.start = now
+                    chunks.append((seq.computed, tokens))
+                duration = cost_model.step_time(chunks, decode_batch, context_tokens)
+                stats["prefill_steps"] += 1
+            else:
+                duration = cost_model.decode_time(decode_batch, context_tokens)
+            if decode_batch:
+                stats["decode_steps"] += 1
+                stats["decode_batch"] += decode_batch
+            engine.plan = plan
+            engine.busy_time += duration
+            heapq.heappush(
+                events, (now + duration / 1000.0, _STEP_DONE, next(sequence), engine)
+            )
+            return True
+
+        def complete_step(engine: EngineState, now: float) -> None:
+            plan = engine.plan
+            engine.plan = None
+            if plan.decode:
+                engine.decode_steps += 1
+                if engine.finish_heap[0][0] <= engine.decode_steps:
+                    for seq in engine.pop_finished():
+                        recorder.add(
+                            seq.order, seq.request, seq.start, seq.first_token, now
+                        )
+            if not plan.prefill:
+                return
+            for seq, tokens in plan.prefill:
+                seq.computed += tokens
+            for seq in engine.pop_prefilled():
+                if not seq.generated:
+                    seq.first_token = now
+                seq.generated += 1
+                if seq.generated >= seq.request.output_tokens:
+                    recorder.add(
+                        seq.order, seq.request, seq.start, seq.first_token, now
+                    )
+                else:
+                    engine.start_decoding(seq)
+
+        def wake_idle(now: float) -> None:
+            while idle and len(scheduler):
+                engine = engines[idle.pop()]
+                if not start_step(engine, now):
+                    idle.append(engine.index)
+                    return
+
+        request_iter = iter(requests)
+        try:
+            push_next_arrival()
+            while events:
+                now, kind, _, payload = heapq.heappop(events)
+                if kind == _ARRIVAL:
+                    scheduler.add(SequenceState(stats["arrivals"], payload))
+                    stats["arrivals"] += 1
+                    push_next_arrival()
+                else:
+                    complete_step(payload, now)
+                    if not start_step(payload, now):
+                        idle.append(payload.index)
+                # Arrivals, and sequences preempted by the step just scheduled
+                wake_idle(now)
+        finally:
+            recorder.close()
+
+        decode_steps = stats["decode_steps"]
+        duration = max(0.0, recorder.last_finish - recorder.first_arrival)
+        busy_time = sum(engine.busy_time for engine in engines) / 1000.0
+        return recorder.get_result(
+            num_engines=self.num_engines,
+            num_gpus=cost_model.base_config.tp_size * self.num_engines,
+            scheduler=scheduler.get_description(),
+            prefill_steps=stats["prefill_steps"],
+            decode_steps=decode_steps,
+            mean_decode_batch=(
+                stats["decode_batch"] / decode_steps if decode_steps else 0.0
+            ),
+            preemptions=sum(engine.preemptions for engine in engines),
+            engine_utilization=(
+                busy_time / (self.num_engines * duration) if duration > 0 else 0.0
+            ),
+            wall_time_seconds=time.time() - wall_start,
+            step_cache_stats=cost_model.get_cache_stats(),
+        )
@@ -0,0 +1,289 @@
+"""
+Step cost model - engine step times from the performance calculator, memoized by step shape
+"""
+
+import dataclasses
+from typing import Dict, Optional, Sequence, Tuple
+
+from src.arch.config import ModelConfig, ScheduleConfig
+from src.arch.model_type import ForwardMode
+from src.arch.models_arch.model_arch import create_model_arch
+from src.arch.perf.model_perf import ModelPerformance
+from src.arch.perf_calculator import PerformanceCalculator
+from src.hardware.hardware_config import HardwareConfig
+
+# Framework overhead factor, the same as ModelPerformance.get_ttft_or_tpot
+_OVERHEAD = 1.02
+
+
+def round_up_to_bucket(value: int, resolution: int) -> int:
+    """
+    Round a token or sequence count up to its shape bucket
+
+    Values up to resolution are kept; larger values are rounded up to a multiple of
+    2**k chosen so that every power-of-two octave holds resolution buckets, which
+    bounds the relative rounding error by 1 / resolution.
+
+    Args:
+        value: Count to round (at least 1)
+        resolution: Buckets per octave (a power of two)
+
+    Returns:
+        Bucketed count (>= value)
+    """
+    if value <= resolution:
+        return max(value, 1)
+    step = 1 << (value.bit_length() - resolution.bit_length())
+    return -(-value // step) * step
+
+
+class StepCostModel:
+    """
+    Duration of continuous-batching engine steps
+
+    A prefill step is costed as the dense (non-attention) operators at the total
+    number of prompt tokens in the step, plus the attention operators of every
+    prompt at its own length (attention does not mix sequences). A decode step
+    generates one token for each running sequence and is costed as a DECODE
+    forward pass at the batch size and the mean context length. Mixed steps
+    (chunked prefill) combine both, see step_time.
+
+    Step shapes are rounded up to buckets (see round_up_to_bucket) and the
+    performance of every bucket is computed once. Shapes the model architecture
+    rejects (e.g. token counts not divisible across expert ranks) are padded to
+    the next shape it accepts, as an engine pads its batches.
+    """
+
+    def __init__(
+        self,
+        model_config: ModelConfig,
+        hardware_config: HardwareConfig,
+        base_config: ScheduleConfig,
+        resolution: int = 16,
+    ):
+        """
+        Args:
+            model_config: Model configuration
+            hardware_config: Hardware configuration
+            base_config: Parallel layout and feature flags of the serving instance
+                (batch_size, max_seqlen and mode are replaced per step)
+            resolution: Shape buckets per power-of-two octave (a power of two)
+
+        Raises:
+            ValueError: If the layout cannot be evaluated at all
+        """
+        if resolution < 1 or resolution & (resolution - 1):
+            raise ValueError(f"Resolution must be a power of two: {resolution}")
+        self.model_config = model_config
+        self.hardware_config = hardware_config
+        self.base_config = base_config
+        self.resolution = resolution
+        self.calculator = PerformanceCalculator(hardware_config)
+        # tokens -> (dense ms, attention ms) of a single-sequence prefill
+        self._prefill_cache: Dict[int, Tuple[float, float]] = {}
+        # (batch size, context length) -> (dense ms, attention ms, step ms) of a
+        # decode step
+        self._decode_cache: Dict[Tuple[int, int], Tuple[float, float, float]] = {}
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._get_prefill_parts(1)
+
+    def _evaluate(
+        self, mode: ForwardMode, batch_size: int, max_seqlen: int
+    ) -> Optional[ModelPerformance]:
+        """Evaluate one forward pass, returning None if the shape is rejected"""
+        config = dataclasses.replace(
+            self.base_config, mode=mode, batch_size=batch_size, max_seqlen=max_seqlen
+        )
+        try:
+            model_arch = create_model_arch(self.model_config, config)
+            return self.calculator.calculate_model_performance(model_arch)
+        except Exception:
+            return None
+
+    def _evaluate_padded(
+        self, mode: ForwardMode, batch_size: int, max_seqlen: int
+    ) -> ModelPerformance:
+        """Evaluate a step shape, padding the token dimension until it is accepted"""
+        padded = max_seqlen if mode == ForwardMode.EXTEND else batch_size
+        for value in range(padded, 2 * padded + 64):
+            if mode == ForwardMode.EXTEND:
+                perf = self._evaluate(mode, batch_size, value)
+            else:
+                perf = self._evaluate(mode, value, max_seqlen)
+            if perf is not None:
+                return perf
+        raise ValueError(
+            f"{mode.name} step with batch_size={batch_size}, max_seqlen={max_seqlen} "
+            f"cannot be evaluated for {self.model_config.model_type} with "
+            f"TP={self.base_config.tp_size}, EP={self.base_config.ep_size}"
+        )
+
+    def _get_prefill_parts(self, tokens: int) -> Tuple[float, float]:
+        """(dense ms, attention ms) of prefilling one sequence of tokens"""
+        tokens = round_up_to_bucket(tokens, self.resolution)
+        parts = self._prefill_cache.get(tokens)
+        if parts is not None:
+            self.cache_hits += 1
+            return parts
+        self.cache_misses += 1
+        parts = _split_attention(self._evaluate_padded(ForwardMode.EXTEND, 1, tokens))
+        self._prefill_cache[tokens] = parts
+        return parts
+
+    def _get_decode_parts(
+        self, batch_size: int, context_tokens: int
+    ) -> Tuple[float, float, float]:
+        """(dense ms, attention ms, step ms with overhead) of a decode step"""
+        key = (
+            round_up_to_bucket(batch_size, self.resolution),
+            round_up_to_bucket(-(-context_tokens // batch_size), self.resolution),
+        )
+        parts = self._decode_cache.get(key)
+        if parts is not None:
+            self.cache_hits += 1
+            return parts
+        self.cache_misses += 1
+        dense, attention = _split_attention(
+            self._evaluate_padded(ForwardMode.DECODE, *key)
+        )
+        parts = (dense, attention, (dense + attention) * _OVERHEAD)
+        self._decode_cache[key] = parts
+        return parts
+
+    def prefill_time(self, prompt_lengths: Sequence[int]) -> float:
+        """
+        Duration of a step prefilling several prompts together
+
+        Args:
+            prompt_lengths: Token count of every prompt in the step
+
+        Returns:
+            Step time in milliseconds
+        """
+        return self.step_time([(0, length) for length in prompt_lengths])
+
+    def decode_time(self, batch_size: int, context_tokens: int) -> float:
+        """
+        Duration of a decode step
+
+        Args:
+            batch_size: Number of sequences generating a token
+            context_tokens: Total context (KV cache) length of those sequences
+
+        Returns:
+            Step time in milliseconds
+        """
+        if batch_size <= 0:
+            return 0.0
+        return self._get_decode_parts(batch_size, context_tokens)[2]
+
+    def step_time(
+        self,
+        prefill_chunks: Sequence[Tuple[int, int]],
+        decode_batch: int = 0,
+        context_tokens: int = 0,
+    ) -> float:
+        """
+        Duration of a step prefilling prompt chunks and decoding together
+
+        The dense operators run once over every token of the step (the prompt
+        chunks plus one token per decoding sequence). A chunk of c tokens following
+        p already prefilled tokens is charged the share of the causal attention of
+        the first p + c tokens computed by its rows, ((p + c)^2 - p^2) / (p + c)^2;
+        the decoding sequences are charged the attention of a decode step at their
+        batch size and context length. Without chunks this is a decode step.
+
+        Args:
+            prefill_chunks: (tokens prefilled before, chunk tokens) of every chunk
+            decode_batch: Number of sequences generating a token
+            context_tokens: Total context (KV cache) length of those sequences
+
+        Returns:
+            Step time in milliseconds
+        """
+        if not prefill_chunks:
+            return self.decode_time(decode_batch, context_tokens)
+        tokens = decode_batch
+        attention = 0.0
+        for computed, chunk in prefill_chunks:
+            tokens += chunk
+            end = computed + chunk
+            share = 1.0 - (computed / end) ** 2
+            attention += self._get_prefill_parts(end)[1] * share
+        if decode_batch > 0:
+            attention += self._get_decode_parts(decode_batch, context_tokens)[1]
+        dense, _ = self._get_prefill_parts(tokens)
+        return (dense + attention) * _OVERHEAD
+
+    def get_kv_cache_capacity(
+        self, gpu_memory_utilization: float = 0.9
+    ) -> Optional[int]:
+        """
+        KV cache capacity of one engine in tokens
+
+        The fraction gpu_memory_utilization of each GPU's HBM, minus the weights,
+        divided by the KV cache size of one token on one GPU.
+
+        Args:
+            gpu_memory_utilization: Fraction of HBM usable for weights and KV cache
+
+        Returns:
+            Capacity in tokens (None if the model architecture has no KV cache model)
+
+        Raises:
+            ValueError: If the weights leave no memory for the KV cache
+        """
+        if not 0 < gpu_memory_utilization <= 1:
+            raise ValueError(
+                f"GPU memory utilization must be in (0, 1]: {gpu_memory_utilization}"
+            )
+        kv_bytes = create_model_arch(
+            self.model_config, self.base_config
+        ).get_kv_cache_per_gpu()
+        if not kv_bytes:
+            return None
+        weight_bytes = self._evaluate_padded(
+            ForwardMode.DECODE, 1, 1
+        ).model_total_mem_occupy
+        usable = self.hardware_config.memory.hbm_size_gb * gpu_memory_utilization
+        capacity = int((usable * 1024**3 - weight_bytes) // kv_bytes)
+        if capacity < 1:
+            raise ValueError(
+                f"Weights ({weight_bytes / 1024**3:.1f} GB per GPU) leave no room for "
+                f"the KV cache in {usable:.1f} GB with TP={self.base_config.tp_size}, "
+                f"EP={self.base_config.ep_size}"
+            )
+        return capacity
+
+    def get_cache_stats(self) -> dict:
+        """
+        Get step shape cache statistics
+
+        The operator_* entries are those of the calculator's operator cache: step
+        shapes evaluated for new batch sizes and context lengths mostly share their
+        weight GEMMs and communication operators with earlier shapes.
+        """
+        lookups = self.cache_hits + self.cache_misses
+        operator_stats = self.calculator.get_cache_stats()
+        return {
+            "prefill_shapes": len(self._prefill_cache),
+            "decode_shapes": len(self._decode_cache),
+            "hits": self.cache_hits,
+            "misses": self.cache_misses,
+            "hit_rate": self.cache_hits / lookups if lookups else 0.0,
+            "operator_hits": operator_stats["hits"],
+            "operator_misses": operator_stats["misses"],
+            "operator_hit_rate": operator_stats["hit_rate"],
+        }
+
+
+def _split_attention(perf: ModelPerformance) -> Tuple[float, float]:
+    """(dense ms, attention ms) of a forward pass, without framework overhead"""
+    attention = sum(
+        op_perf.total_time
+        for layer_perf in perf.layer_performances
+        if layer_perf.layer_type == "attention"
+        for op_perf in layer_perf.operators
+    )
+    return perf.ttft - attention, attention
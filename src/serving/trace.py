@@ -0,0 +1,210 @@
+"""
+Trace replay - streaming readers of production request logs
+"""
+
+import csv
+import gzip
+import heapq
+import itertools
+import json
+import mmap
+import os
+from typing import Dict, Iterable, Iterator, Optional
+
+from src.serving.workload import Request
+
+# Columns of a request trace; prefix_id is optional
+TRACE_COLUMNS = ("arrival_ts", "prompt_tokens", "output_tokens", "prefix_id")
+
+# Seconds per unit of arrival_ts
+TIMESTAMP_UNITS = {"s": 1.0, "ms": 1e-3, "us": 1e-6}
+
+
+def get_trace_format(path: str) -> str:
+    """
+    Detect the format of a trace file from its extension
+
+    Args:
+        path: Trace file path (.csv, .jsonl, .ndjson or .json, optionally .gz)
+
+    Returns:
+        "csv" or "jsonl"
+    """
+    name = path[:-3] if path.endswith(".gz") else path
+    extension = os.path.splitext(name)[1].lower()
+    if extension == ".csv":
+        return "csv"
+    if extension in (".jsonl", ".ndjson", ".json"):
+        return "jsonl"
+    raise ValueError(f"Cannot detect the trace format of {path}, use csv or jsonl")
+
+
+def iter_trace_lines(path: str) -> Iterator[str]:
+    """
+    Stream the lines of a trace file
+
+    Gzip-compressed files (.gz) are decompressed on the fly; other files are
+    memory-mapped, so the OS pages multi-GB traces in and out as they are read.
+
+    Args:
+        path: Trace file path
+
+    Yields:
+        Lines (with line terminators)
+    """
+    if path.endswith(".gz"):
+        with gzip.open(path, "rt", newline="") as f:
+            yield from f
+        return
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b""):
+                yield line.decode()
+
+
+def iter_trace_records(lines: Iterable[str], trace_format: str) -> Iterator[Dict]:
+    """
+    Parse trace lines into records
+
+    Args:
+        lines: Lines of a trace file
+        trace_format: "csv" (with a header row) or "jsonl" (one object per line)
+
+    Yields:
+        Records as dictionaries of column name -> raw value
+    """
+    if trace_format == "csv":
+        reader = csv.reader(lines)
+        header = next(reader, None)
+        if header is None:
+            return
+        header = [name.strip() for name in header]
+        for row in reader:
+            if row:
+                yield dict(zip(header, row))
+    elif trace_format == "jsonl":
+        for line in lines:
+            if line.strip():
+                yield json.loads(line)
+    else:
+        raise ValueError(f"Unknown trace format: {trace_format}")
+
+
+def iter_trace_requests(
+    records: Iterable[Dict],
+    timestamp_unit: str = "s",
+    speedup: float = 1.0,
+    reorder_buffer: int = 4096,
+) -> Iterator[Request]:
+    """
+    Convert trace records into requests in arrival order
+
+    Arrival times are made relative to the first request. Logs merged from several
+    frontends are often slightly out of order, so records pass through a bounded
+    reordering heap; a record that is out of order by more than reorder_buffer
+    records raises an error (sort the trace first).
+
+    Args:
+        records: Trace records (see TRACE_COLUMNS)
+        timestamp_unit: Unit of arrival_ts ("s", "ms" or "us")
+        speedup: Replay speed factor (2.0 halves every inter-arrival time)
+        reorder_buffer: Number of records held back for reordering
+
+    Yields:
+        Requests, numbered by their position in the trace (token counts below one
+        are replayed as one)
+    """
+    if timestamp_unit not in TIMESTAMP_UNITS:
+        raise ValueError(f"Unknown timestamp unit: {timestamp_unit}")
+    if speedup <= 0:
+        raise ValueError(f"Speedup must be positive: {speedup}")
+    scale = TIMESTAMP_UNITS[timestamp_unit] / speedup
+
+    def parse(index: int, record: Dict) -> tuple:
+        try:
+            arrival = float(record["arrival_ts"]) * scale
+            prompt_tokens = int(record["prompt_tokens"])
+            output_tokens = int(record["output_tokens"])
+        except (KeyError, TypeError, ValueError) as e:
+            raise ValueError(f"Invalid trace record {index}: {record} ({e})")
+        prefix_id = record.get("prefix_id")
+        prefix_id = str(prefix_id) if prefix_id not in (None, "") else None
+        return arrival, index, prompt_tokens, output_tokens, prefix_id
+
+    pending = []
+    origin = None
+    last_arrival = float("-inf")
+
+    def emit(item: tuple) -> Request:
+        nonlocal origin, last_arrival
+        arrival, index, prompt_tokens, output_tokens, prefix_id = item
+        if arrival < last_arrival:
+            raise ValueError(
+                f"Trace record {index} is out of order by more than "
+                f"{reorder_buffer} records, sort the trace by arrival_ts"
+            )
+        last_arrival = arrival
+        if origin is None:
+            origin = arrival
+        return Request(
+            index,
+            arrival - origin,
+            max(prompt_tokens, 1),
+            max(output_tokens, 1),
+            prefix_id,
+        )
+
+    for index, record in enumerate(records):
+        heapq.heappush(pending, parse(index, record))
+        if len(pending) > reorder_buffer:
+            yield emit(heapq.heappop(pending))
+    while pending:
+        yield emit(heapq.heappop(pending))
+
+
+class TraceWorkload:
+    """
+    Stream of requests replayed from a trace file
+
+    The trace is read as a generator pipeline (lines -> records -> requests), so
+    memory stays flat regardless of the trace size. Each line holds one request
+    with arrival_ts, prompt_tokens, output_tokens and optionally prefix_id; CSV
+    files need a header row.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        trace_format: Optional[str] = None,
+        timestamp_unit: str = "s",
+        speedup: float = 1.0,
+        limit: Optional[int] = None,
+        reorder_buffer: int = 4096,
+    ):
+        """
+        Args:
+            path: Trace file (.csv or .jsonl, optionally gzip-compressed)
+            trace_format: "csv" or "jsonl" (None to detect from the extension)
+            timestamp_unit: Unit of arrival_ts ("s", "ms" or "us")
+            speedup: Replay speed factor (2.0 doubles the request rate)
+            limit: Replay only the first limit requests (None for all)
+            reorder_buffer: Records held back to fix slightly unordered traces
+        """
+        self.path = path
+        self.trace_format = trace_format or get_trace_format(path)
+        self.timestamp_unit = timestamp_unit
+        self.speedup = speedup
+        self.limit = limit
+        self.reorder_buffer = reorder_buffer
+
+    def __iter__(self) -> Iterator[Request]:
+        records = iter_trace_records(iter_trace_lines(self.path), self.trace_format)
+        requests = iter_trace_requests(
+            records,
+            timestamp_unit=self.timestamp_unit,
+            speedup=self.speedup,
+            reorder_buffer=self.reorder_buffer,
+        )
+        return itertools.islice(requests, self.limit)
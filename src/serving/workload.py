@@ -0,0 +1,232 @@
+"""
+Serving workloads - request arrival processes and prompt/output length distributions
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+import numpy as np
+
+# Requests generated per NumPy sampling call
+_CHUNK_SIZE = 65536
+
+
+@dataclass
+class Request:
+    """One inference request"""
+
+    request_id: int
+    arrival_time: float  # seconds
+    prompt_tokens: int
+    output_tokens: int
+    # Requests sharing a prompt prefix (e.g. a system prompt) carry the same id
+    prefix_id: Optional[str] = None
+
+
+class ArrivalProcess(ABC):
+    """Inter-arrival time distribution of requests"""
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Mean arrival rate (requests per second)
+        """
+        if rate <= 0:
+            raise ValueError(f"Arrival rate must be positive: {rate}")
+        self.rate = rate
+
+    @abstractmethod
+    def sample_intervals(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Sample inter-arrival times in seconds"""
+        pass
+
+
+class PoissonArrivals(ArrivalProcess):
+    """Poisson process (exponential inter-arrival times)"""
+
+    def sample_intervals(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.exponential(1.0 / self.rate, size)
+
+
+class GammaArrivals(ArrivalProcess):
+    """
+    Bursty arrivals with gamma-distributed inter-arrival times
+
+    The coefficient of variation sets the burstiness: 1 is a Poisson process,
+    larger values cluster requests into bursts.
+    """
+
+    def __init__(self, rate: float, cv: float = 2.0):
+        """
+        Args:
+            rate: Mean arrival rate (requests per second)
+            cv: Coefficient of variation of the inter-arrival times
+        """
+        super().__init__(rate)
+        if cv <= 0:
+            raise ValueError(f"Coefficient of variation must be positive: {cv}")
+        self.cv = cv
+
+    def sample_intervals(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        shape = 1.0 / self.cv**2
+        return rng.gamma(shape, 1.0 / (self.rate * shape), size)
+
+
+class ConstantArrivals(ArrivalProcess):
+    """Evenly spaced arrivals"""
+
+    def sample_intervals(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return np.full(size, 1.0 / self.rate)
+
+
+class LengthDistribution(ABC):
+    """Token count distribution of prompts or outputs"""
+
+    @abstractmethod
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        """Sample token counts (at least 1)"""
+        pass
+
+
+class FixedLength(LengthDistribution):
+    """Every request has the same length"""
+
+    def __init__(self, value: int):
+        if value < 1:
+            raise ValueError(f"Length must be positive: {value}")
+        self.value = value
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return np.full(size, self.value, dtype=np.int64)
+
+
+class UniformLength(LengthDistribution):
+    """Lengths drawn uniformly from [low, high]"""
+
+    def __init__(self, low: int, high: int):
+        if not 1 <= low <= high:
+            raise ValueError(f"Invalid length range: {low}-{high}")
+        self.low = low
+        self.high = high
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        return rng.integers(self.low, self.high + 1, size)
+
+
+class LogNormalLength(LengthDistribution):
+    """Long-tailed lengths with a given mean and coefficient of variation"""
+
+    def __init__(self, mean: float, cv: float = 1.0, max_value: Optional[int] = None):
+        """
+        Args:
+            mean: Mean length in tokens
+            cv: Coefficient of variation
+            max_value: Lengths above this are clipped (None for no limit)
+        """
+        if mean < 1 or cv <= 0:
+            raise ValueError(f"Invalid log-normal length: mean={mean}, cv={cv}")
+        self.mean = mean
+        self.cv = cv
+        self.max_value = max_value
+
+    def sample(self, rng: np.random.Generator, size: int) -> np.ndarray:
+        sigma = np.sqrt(np.log1p(self.cv**2))
+        mu = np.log(self.mean) - sigma**2 / 2
+        values = np.rint(rng.lognormal(mu, sigma, size)).astype(np.int64)
+        return np.clip(values, 1, self.max_value)
+
+
+def parse_length_distribution(value: str) -> LengthDistribution:
+    """
+    Parse a length distribution specification
+
+    Args:
+        value: "N" (fixed), "LOW-HIGH" (uniform) or "lognormal:MEAN[,CV[,MAX]]"
+
+    Returns:
+        Length distribution
+    """
+    value = value.strip()
+    if value.startswith("lognormal:"):
+        parts = [float(part) for part in value[len("lognormal:") :].split(",")]
+        if not 1 <= len(parts) <= 3:
+            raise ValueError(f"Invalid log-normal length: {value}")
+        max_value = int(parts[2]) if len(parts) == 3 else None
+        return LogNormalLength(parts[0], *parts[1:2], max_value=max_value)
+    if "-" in value:
+        low, high = value.split("-")
+        return UniformLength(int(low), int(high))
+    return FixedLength(int(value))
+
+
+def create_arrival_process(kind: str, rate: float, cv: float = 2.0) -> ArrivalProcess:
+    """
+    Factory function to create an arrival process
+
+    Args:
+        kind: "poisson", "gamma" or "constant"
+        rate: Mean arrival rate (requests per second)
+        cv: Coefficient of variation (gamma only)
+
+    Returns:
+        Arrival process
+    """
+    if kind == "poisson":
+        return PoissonArrivals(rate)
+    if kind == "gamma":
+        return GammaArrivals(rate, cv)
+    if kind == "constant":
+        return ConstantArrivals(rate)
+    raise ValueError(f"Unknown arrival process: {kind}")
+
+
+class SyntheticWorkload:
+    """
+    Stream of generated requests
+
+    Requests are sampled in NumPy chunks and yielded one at a time, so memory stays
+    constant however many requests are generated. Iterating twice yields the same
+    requests (the generator is re-seeded).
+    """
+
+    def __init__(
+        self,
+        arrivals: ArrivalProcess,
+        prompt_lengths: LengthDistribution,
+        output_lengths: LengthDistribution,
+        num_requests: int,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            arrivals: Arrival process
+            prompt_lengths: Prompt token count distribution
+            output_lengths: Output token count distribution
+            num_requests: Number of requests to generate
+            seed: Random seed
+        """
+        self.arrivals = arrivals
+        self.prompt_lengths = prompt_lengths
+        self.output_lengths = output_lengths
+        self.num_requests = num_requests
+        self.seed = seed
+
+    def __len__(self) -> int:
+        return self.num_requests
+
+    def __iter__(self) -> Iterator[Request]:
+        rng = np.random.default_rng(self.seed)
+        clock = 0.0
+        generated = 0
+        while generated < self.num_requests:
+            size = min(_CHUNK_SIZE, self.num_requests - generated)
+            arrival_times = clock + np.cumsum(self.arrivals.sample_intervals(rng, size))
+            prompts = self.prompt_lengths.sample(rng, size)
+            outputs = self.output_lengths.sample(rng, size)
+            clock = float(arrival_times[-1])
+            for arrival_time, prompt, output in zip(
+                arrival_times.tolist(), prompts.tolist(), outputs.tolist()
+            ):
+                yield Request(generated, arrival_time, prompt, output)
+                generated += 1
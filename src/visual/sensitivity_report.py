@@ -0,0 +1,152 @@
+"""
+Sensitivity report - Excel workbook with one heatmap sheet per metric
+"""
+
+from dataclasses import fields
+from enum import Enum
+from typing import Any, Optional
+
+import numpy as np
+
+from src.optimization.results import SensitivityGrid
+
+# Metrics where larger values are better (colored green at the high end)
+HIGHER_IS_BETTER = ("throughput_tps", "throughput_per_gpu")
+
+
+def _label(value: Any) -> Any:
+    """Cell value of a parameter value"""
+    return value.name if isinstance(value, Enum) else value
+
+
+class SensitivityExcelFormatter:
+    """Excel output of a SensitivityGrid"""
+
+    def format(self, grid: SensitivityGrid) -> Any:
+        """
+        Format a sensitivity grid as an Excel workbook
+
+        The first sheet describes the base configuration and the best grid point;
+        every metric then gets a sheet with its grid (rows: first parameter, columns:
+        second parameter) colored by a red-yellow-green scale.
+
+        Args:
+            grid: Sensitivity grid
+
+        Returns:
+            openpyxl.Workbook object
+        """
+        try:
+            import openpyxl
+            from openpyxl.formatting.rule import ColorScaleRule
+            from openpyxl.styles import Alignment, Font, PatternFill
+            from openpyxl.utils import get_column_letter
+        except ImportError:
+            raise ImportError(
+                "openpyxl library is required for Excel output."
+                "Please run: pip install openpyxl"
+            )
+
+        header_fill = PatternFill(
+            start_color="4472C4", end_color="4472C4", fill_type="solid"
+        )
+        header_font = Font(bold=True, color="FFFFFF", size=11)
+        title_font = Font(bold=True, size=12)
+        center_align = Alignment(horizontal="center", vertical="center")
+
+        wb = openpyxl.Workbook()
+        ws = wb.active
+        ws.title = "Summary"
+        ws.column_dimensions["A"].width = 28
+        ws.column_dimensions["B"].width = 16
+        ws["A1"] = f"Sensitivity Analysis: {' x '.join(grid.param_names)}"
+        ws["A1"].font = title_font
+
+        row = 3
+        ws.cell(row=row, column=1, value="Base Configuration").font = Font(bold=True)
+        for field in fields(grid.base_config):
+            row += 1
+            ws.cell(row=row, column=1, value=field.name)
+            ws.cell(
+                row=row, column=2, value=_label(getattr(grid.base_config, field.name))
+            )
+
+        row += 2
+        ws.cell(row=row, column=1, value="Best Grid Point").font = Font(bold=True)
+        best = grid.get_best()
+        if best is None:
+            ws.cell(row=row + 1, column=1, value="All configurations failed")
+        else:
+            values, score = best
+            for name, value in zip(grid.param_names, values):
+                row += 1
+                ws.cell(row=row, column=1, value=name)
+                ws.cell(row=row, column=2, value=_label(value))
+            ws.cell(row=row + 1, column=1, value="score")
+            ws.cell(row=row + 1, column=2, value=round(score, 4))
+
+        row_labels = [_label(value) for value in grid.param_values[0]]
+        for metric, values in grid.metrics.items():
+            ws = wb.create_sheet(title=metric[:31])
+            ws["A1"] = metric
+            ws["A1"].font = title_font
+            ws.column_dimensions["A"].width = 22
+
+            # Header row: the second parameter's values, or the metric name (1-D)
+            if len(grid.param_names) == 2:
+                headers = [f"{grid.param_names[0]} \\ {grid.param_names[1]}"]
+                headers += [_label(value) for value in grid.param_values[1]]
+            else:
+                headers = [grid.param_names[0], metric]
+            for col, header in enumerate(headers, start=1):
+                cell = ws.cell(row=3, column=col, value=header)
+                cell.font = header_font
+                cell.fill = header_fill
+                cell.alignment = center_align
+
+            table = values.reshape(len(row_labels), -1)
+            for i, label in enumerate(row_labels):
+                cell = ws.cell(row=4 + i, column=1, value=label)
+                cell.font = Font(bold=True)
+                for j, value in enumerate(table[i]):
+                    cell = ws.cell(row=4 + i, column=2 + j)
+                    # Failed configurations stay empty
+                    if not np.isnan(value):
+                        cell.value = round(float(value), 4)
+                        cell.number_format = "0.000"
+
+            low, high = ("F8696B", "63BE7B")
+            if metric not in HIGHER_IS_BETTER:
+                low, high = high, low
+            cell_range = (
+                f"B4:{get_column_letter(1 + table.shape[1])}{3 + table.shape[0]}"
+            )
+            ws.conditional_formatting.add(
+                cell_range,
+                ColorScaleRule(
+                    start_type="min",
+                    start_color=low,
+                    mid_type="percentile",
+                    mid_value=50,
+                    mid_color="FFEB84",
+                    end_type="max",
+                    end_color=high,
+                ),
+            )
+
+        return wb
+
+    def save(self, grid: SensitivityGrid, output_path: Optional[str] = None) -> None:
+        """
+        Save a sensitivity grid to an Excel file
+
+        Args:
+            grid: Sensitivity grid
+            output_path: Output Excel file path
+        """
+        if not output_path:
+            output_path = "Sensitivity_Report.xlsx"
+
+        wb = self.format(grid)
+        wb.save(output_path)
+        print(f"Excel report saved to: {output_path}")